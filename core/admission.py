@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Iterable, Mapping
+import heapq
+import itertools
+import time
+
+from core.task import Task
+from utils.logger import get_logger
+
+logger = get_logger("CronBoss")
+
+
+def parse_caps(raw: str) -> dict[str, int]:
+    """
+    Parse des plafonds par projet au format "projet1=2,projet2=1".
+
+    Les entrées invalides sont ignorées (avec warning).
+    """
+    caps: dict[str, int] = {}
+    for item in raw.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        name, sep, value = item.partition("=")
+        if not sep or not value.strip().isdigit():
+            logger.warning("⚠️ Plafond projet invalide ignoré : %r", item)
+            continue
+        caps[name.strip()] = int(value)
+    return caps
+
+
+class AdmissionQueue:
+    """
+    File d'admission des tâches dues : priorité (YAML `priority`, la plus haute d'abord) puis FIFO.
+
+    Une tâche est admise si le plafond global (max_parallel) et le plafond de son projet sont respectés.
+    Une tâche bloquée par le plafond de son projet ne bloque pas les tâches des autres projets.
+    Un plafond à 0 signifie "illimité".
+    """
+
+    def __init__(
+        self,
+        max_parallel: int = 0,
+        per_project: int = 0,
+        project_caps: Mapping[str, int] | None = None,
+        group_by: str = "source_file",
+    ) -> None:
+        """
+        :param max_parallel: Nombre max de tâches simultanées (0 = illimité).
+        :param per_project: Plafond par défaut par projet (0 = illimité).
+        :param project_caps: Plafonds spécifiques par projet (prioritaires sur per_project).
+        :param group_by: Clé de projet : "source_file" (YAML) ou "interpreter" (interpréteur résolu).
+        """
+        self.max_parallel = max_parallel
+        self.per_project = per_project
+        self.project_caps = dict(project_caps or {})
+        self.group_by = group_by
+        self._heap: list[tuple[int, int, Task]] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __contains__(self, task: object) -> bool:
+        return any(entry[2] is task for entry in self._heap)
+
+    def project_of(self, task: Task) -> str:
+        """
+        Clé de regroupement d'une tâche pour les plafonds par projet.
+        """
+        if self.group_by == "interpreter":
+            return task.interpreter or task.type
+        return task.source_file
+
+    def push(self, task: Task) -> None:
+        """
+        Met une tâche en file (horodate son entrée pour mesurer l'attente).
+        """
+        task.queued_at = time.time()
+        heapq.heappush(self._heap, (-task.priority, next(self._seq), task))
+
+    def pop_admissible(self, running: Iterable[Task]) -> list[Task]:
+        """
+        Retire de la file les tâches admissibles compte tenu des tâches en cours.
+
+        :param running: Tâches actuellement en cours (occupent un slot).
+        :return: Tâches à lancer, dans l'ordre de priorité.
+        """
+        counts = Counter(self.project_of(task) for task in running)
+        in_flight = sum(counts.values())
+        admitted: list[Task] = []
+        blocked: list[tuple[int, int, Task]] = []
+
+        while self._heap:
+            if self.max_parallel and in_flight >= self.max_parallel:
+                break
+            entry = heapq.heappop(self._heap)
+            task = entry[2]
+            project = self.project_of(task)
+            cap = self.project_caps.get(project, self.per_project)
+            if cap and counts[project] >= cap:
+                blocked.append(entry)
+                continue
+            counts[project] += 1
+            in_flight += 1
+            admitted.append(task)
+
+        for entry in blocked:
+            heapq.heappush(self._heap, entry)
+        return admitted
+
+    def clear(self) -> list[Task]:
+        """
+        Vide la file et retourne les tâches qui n'ont pas été lancées.
+        """
+        dropped = [entry[2] for entry in sorted(self._heap)]
+        self._heap = []
+        return dropped
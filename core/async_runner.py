@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Mapping
+import os
+from pathlib import Path
+import signal
+import subprocess
+import threading
+from typing import IO, Any
+
+from core.output import OutputCapture
+from core.runner import build_bash_command, build_python_command
+from utils.logger import get_logger
+from utils.types import RunHandle
+
+logger = get_logger("CronBoss")
+
+STREAM_LIMIT = 1 << 20  # taille max d'une ligne avant découpage (octets)
+DRAIN_TIMEOUT = 5.0  # secondes max pour vider stdout/stderr après la fin du process
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """
+    Retourne la boucle asyncio partagée (démarrée à la demande dans un unique thread daemon).
+    """
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="cronboss-asyncio", daemon=True).start()
+            _loop = loop
+        return _loop
+
+
+class AsyncProcess:
+    """
+    Process lancé via asyncio.create_subprocess_exec, exposé avec l'API Popen utilisée par Task/Supervisor.
+
+    stdout/stderr sont lus dans la boucle partagée et versés dans stdout_capture/stderr_capture
+    (voir utils.types.StreamSource) : Task n'a pas besoin de threads lecteurs.
+    """
+
+    stdout: IO[str] | None = None
+    stderr: IO[str] | None = None
+
+    def __init__(
+        self,
+        process: asyncio.subprocess.Process,
+        exited: asyncio.Future[None],
+        cmd: list[str],
+        captures: tuple[OutputCapture, OutputCapture],
+    ) -> None:
+        self.args = cmd
+        self.pid: int = process.pid
+        self.returncode: int | None = None
+        self.stdout_capture, self.stderr_capture = captures
+        self._process = process
+        self._exited = exited
+        self._done = threading.Event()  # process terminé ET flux vidés
+        self._supervisor: asyncio.Future[None] | None = None  # référence forte (sinon la tâche peut être GC)
+
+    async def _supervise(self) -> None:
+        pumps = [
+            asyncio.ensure_future(_pump(self._process.stdout, self.stdout_capture)),
+            asyncio.ensure_future(_pump(self._process.stderr, self.stderr_capture)),
+        ]
+        # Process.wait() attend aussi la fermeture des pipes : on suit la fin du process lui-même
+        await self._exited
+        self.returncode = self._process.returncode
+        try:
+            # Un petit-enfant peut garder le pipe ouvert : vidage borné
+            await asyncio.wait_for(asyncio.gather(*pumps), DRAIN_TIMEOUT)
+        except TimeoutError:
+            for pump in pumps:
+                pump.cancel()
+        finally:
+            self._done.set()
+
+    def poll(self) -> int | None:
+        if self.returncode is None:
+            # Renseigné par la boucle dès que le process est réapé (avant la fin du vidage des flux)
+            self.returncode = self._process.returncode
+        return self.returncode
+
+    def wait(self, timeout: float | None = None) -> int:
+        if not self._done.wait(timeout):
+            raise subprocess.TimeoutExpired(self.args, timeout or 0)
+        assert self.returncode is not None
+        return self.returncode
+
+    def communicate(self, input: Any = None, timeout: float | None = None) -> tuple[str, str]:
+        self.wait(timeout)
+        return self.stdout_capture.text(), self.stderr_capture.text()
+
+    def send_signal(self, sig: int) -> None:
+        if self.returncode is None:
+            try:
+                os.kill(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(signal.SIGKILL)
+
+
+async def _pump(stream: asyncio.StreamReader | None, capture: OutputCapture) -> None:
+    """
+    Lit un flux ligne à ligne jusqu'à EOF (les lignes > STREAM_LIMIT sont découpées).
+    """
+    if stream is None:
+        return
+    while True:
+        try:
+            raw = await stream.readline()
+        except ValueError:
+            # Ligne plus longue que la limite : on prend ce qui est disponible
+            raw = await stream.read(STREAM_LIMIT)
+        if not raw:
+            break
+        capture.append(raw.decode("utf-8", errors="replace").strip())
+
+
+class _ExitAwareProtocol(asyncio.subprocess.SubprocessStreamProtocol):
+    """
+    Protocole de asyncio.create_subprocess_exec, qui signale en plus la fin du process (hors pipes).
+    """
+
+    def __init__(self, exited: asyncio.Future[None], loop: asyncio.AbstractEventLoop) -> None:
+        super().__init__(limit=STREAM_LIMIT, loop=loop)
+        self._exited = exited
+
+    def process_exited(self) -> None:
+        super().process_exited()
+        if not self._exited.done():
+            self._exited.set_result(None)
+
+
+async def _spawn(
+    cmd: list[str],
+    workdir: Path,
+    env: Mapping[str, str] | None,
+    captures: tuple[OutputCapture, OutputCapture],
+    preexec_fn: Callable[[], None] | None,
+) -> AsyncProcess:
+    # Même construction que asyncio.create_subprocess_exec, avec un protocole qui expose la fin du process
+    loop = asyncio.get_running_loop()
+    exited: asyncio.Future[None] = loop.create_future()
+    transport, protocol = await loop.subprocess_exec(
+        lambda: _ExitAwareProtocol(exited, loop),
+        *cmd,
+        cwd=str(workdir),
+        env=env,
+        stdin=None,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        close_fds=True,
+        start_new_session=True,  # groupe de process dédié : timeout = tout l'arbre
+        preexec_fn=preexec_fn,  # limites de ressources (core.limits)
+    )
+    process = asyncio.subprocess.Process(transport, protocol, loop)
+    aproc = AsyncProcess(process, exited, cmd, captures)
+    aproc._supervisor = asyncio.ensure_future(aproc._supervise())
+    return aproc
+
+
+def _start(
+    cmd: list[str],
+    workdir: Path,
+    env: Mapping[str, str] | None,
+    captures: tuple[OutputCapture, OutputCapture] | None,
+    preexec_fn: Callable[[], None] | None,
+) -> RunHandle:
+    if captures is None:
+        captures = (OutputCapture(), OutputCapture())
+    spawned = _spawn(cmd, workdir, env, captures, preexec_fn)
+    aproc = asyncio.run_coroutine_threadsafe(spawned, _get_loop()).result()
+    return {"proc": aproc, "cmd": cmd, "script": cmd[1], "streams": aproc}
+
+
+def run_python_script_async(
+    script_path: str | Path,
+    cwd: str | Path,
+    args: str = "",
+    interpreter: str | None = None,
+    captures: tuple[OutputCapture, OutputCapture] | None = None,
+    preexec_fn: Callable[[], None] | None = None,
+) -> RunHandle:
+    """
+    Équivalent de core.runner.run_python_script sur le moteur asyncio.
+
+    :param script_path: chemin du script .py
+    :param cwd: répertoire de travail
+    :param args: arguments CLI (string, sera parsé via shlex.split)
+    :param interpreter: chemin d'interpréteur Python (venv) sinon sys.executable
+    :param captures: captures (stdout, stderr) à alimenter (défaut : mémoire uniquement)
+    :param preexec_fn: exécutée dans l'enfant avant exec (limites, voir core.limits)
+    :return: RunHandle dont 'proc' est un AsyncProcess et 'streams' ses buffers de lignes
+    """
+    try:
+        cmd, workdir, env = build_python_command(script_path, cwd, args, interpreter)
+        return _start(cmd, workdir, env, captures, preexec_fn)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("🚨 Erreur Python pour %s : %s", script_path, exc)
+        raise
+
+
+def run_bash_script_async(
+    script_path: str | Path,
+    cwd: str | Path,
+    args: str = "",
+    captures: tuple[OutputCapture, OutputCapture] | None = None,
+    preexec_fn: Callable[[], None] | None = None,
+) -> RunHandle:
+    """
+    Équivalent de core.runner.run_bash_script sur le moteur asyncio.
+
+    :param script_path: chemin du script .sh
+    :param cwd: répertoire de travail
+    :param args: arguments CLI (string, sera parsé via shlex.split)
+    :param captures: captures (stdout, stderr) à alimenter (défaut : mémoire uniquement)
+    :param preexec_fn: exécutée dans l'enfant avant exec (limites, voir core.limits)
+    """
+    try:
+        cmd, workdir = build_bash_command(script_path, cwd, args)
+        return _start(cmd, workdir, None, captures, preexec_fn)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.exception("🚨 Erreur Bash %s : %s", script_path, exc)
+        raise
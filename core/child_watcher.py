@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import os
+import selectors
+import socket
+import time
+from typing import Any
+
+from utils.logger import get_logger
+
+logger = get_logger("CronBoss")
+
+FALLBACK_POLL_INTERVAL = 2.0  # secondes, si pidfd indisponible (noyau < 5.3, hors Linux)
+
+
+class ChildWatcher:
+    """
+    Attente événementielle de la fin des process enfants.
+
+    Chaque enfant est suivi via un pidfd (os.pidfd_open) enregistré dans un selector : le pidfd devient
+    lisible dès que le process se termine, sans le réaper (Popen.poll() reste la source de vérité).
+    Des sockets de réveil externes (ex: signaux du daemon) peuvent être ajoutées au même selector.
+    Sans pidfd, on retombe sur un polling à intervalle fixe.
+    """
+
+    def __init__(self) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._pidfds: dict[int, int] = {}  # pid -> pidfd
+        self._unwatched = 0  # enfants suivis sans pidfd (polling)
+
+    def watch(self, pid: int, data: Any = None) -> None:
+        """
+        Commence à surveiller un process enfant.
+
+        :param pid: PID du process.
+        :param data: Objet renvoyé par wait() quand le process se termine.
+        """
+        try:
+            fd = os.pidfd_open(pid)
+        except (AttributeError, OSError) as exc:
+            logger.debug("pidfd indisponible pour %s (%s) → polling", pid, exc)
+            self._unwatched += 1
+            return
+        self._pidfds[pid] = fd
+        self._selector.register(fd, selectors.EVENT_READ, data)
+
+    def unwatch(self, pid: int) -> None:
+        """
+        Arrête la surveillance d'un process (à appeler quand il est réapé).
+        """
+        fd = self._pidfds.pop(pid, None)
+        if fd is None:
+            self._unwatched = max(0, self._unwatched - 1)
+            return
+        self._selector.unregister(fd)
+        os.close(fd)
+
+    def add_wakeup(self, fileobj: socket.socket | int) -> None:
+        """
+        Ajoute une source de réveil : wait() retourne dès qu'elle est lisible.
+
+        Une socket (non bloquante) est vidée ici ; un autre descripteur (ex: inotify) doit être lu par son
+        propriétaire avant le wait() suivant.
+        """
+        self._selector.register(fileobj, selectors.EVENT_READ, None)
+
+    def wait(self, timeout: float | None) -> list[Any]:
+        """
+        Bloque jusqu'à la fin d'un enfant, un réveil externe, ou l'expiration de `timeout`.
+
+        :param timeout: Délai max en secondes (None = illimité).
+        :return: Les `data` des enfants terminés (peut être vide).
+        """
+        if self._unwatched:
+            timeout = FALLBACK_POLL_INTERVAL if timeout is None else min(timeout, FALLBACK_POLL_INTERVAL)
+        if not self._selector.get_map():
+            # Rien à surveiller : simple attente
+            if timeout:
+                time.sleep(timeout)
+            return []
+
+        exited: list[Any] = []
+        for key, _ in self._selector.select(timeout):
+            if key.data is not None:
+                exited.append(key.data)
+            elif isinstance(key.fileobj, socket.socket):
+                _drain(key.fileobj)
+        return exited
+
+
+def _drain(sock: socket.socket) -> None:
+    try:
+        while sock.recv(512):
+            pass
+    except (BlockingIOError, InterruptedError):
+        pass
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import datetime as dt
+from pathlib import Path
+import signal
+import socket
+import time
+from types import FrameType
+
+from core.durations import apply_history
+from core.file_watcher import FileWatcher
+from core.output import rotate_outputs
+from core.scheduler import ScheduleIndex
+from core.supervisor import Supervisor, report_summary
+from core.task import Task
+from core.task_loader import load_task_file, task_files
+from handlers.cleanup_logs import CleanupPool
+from handlers.get_interpreter import Resolver, detect_project_name, load_interpreters_map
+from notifiers.manager import NotifierManager
+from utils.audit import audit_flush_timeout, close_audit_writers, flush_audit
+from utils.config import INTERPRETERS_PATH, TASKS_WATCH_INTERVAL
+from utils.logger import get_logger, roll_daily_file
+from utils.metrics import metrics
+from utils.types import InterpretersMap
+
+logger = get_logger("CronBoss")
+
+IDLE_WAIT = 300.0  # réveil de sécurité quand aucune échéance n'est planifiée
+
+
+class Daemon:
+    """
+    Mode service (systemd) : les tâches compilées restent en mémoire et le process se réveille
+    exactement à chaque minute où une tâche est due (pas de fenêtre CRON_INTERVAL_MINUTES).
+
+    Signaux :
+      - SIGTERM / SIGINT : plus aucun lancement, attente des tâches en cours puis sortie
+      - SIGHUP : rechargement du dossier des tâches et de venvs.yaml
+
+    Hors SIGHUP, seuls les YAML modifiés (et venvs.yaml) sont rechargés, dès leur modification
+    (voir core.file_watcher, TASKS_WATCH_INTERVAL).
+
+    Les cleanups suivent leur propre planification (cleanup.schedule, sinon celle de la tâche) et
+    tournent dans un pool de threads (CleanupPool) : ils ne retardent jamais un lancement.
+    """
+
+    def __init__(self, tasks_dir: str | Path, notifier_manager: NotifierManager) -> None:
+        self.tasks_dir = tasks_dir
+        self.notifier_manager = notifier_manager
+        self.supervisor = Supervisor(notifier_manager)
+        self.tasks: list[Task] = []
+        self.interpreters: InterpretersMap = {}
+        self.resolver = Resolver({}, persist=False)
+        self._tasks_by_file: dict[Path, list[Task]] = {}  # YAML -> ses tâches compilées
+        self.file_watcher: FileWatcher | None = None
+        self.index = ScheduleIndex([], interval=0)
+        self.cleanup_tasks: list[Task] = []  # tâches ayant un cleanup, ids de cleanup_index
+        self.cleanup_index = ScheduleIndex([], interval=0)
+        self.cleanup_pool = CleanupPool()
+        self._stopping = False
+        self._reload_requested = False
+        # Réveil immédiat sur signal : le handler C écrit dans la socket (signal.set_wakeup_fd)
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._wakeup_w.setblocking(False)
+        self.supervisor.watcher.add_wakeup(self._wakeup_r)
+
+    def reload(self) -> None:
+        """
+        (Re)charge les YAML, résout les interpréteurs et reconstruit l'index de planification.
+
+        Les exécutions en cours ne sont pas touchées (ce sont des copies via Task.new_run).
+        """
+        self.interpreters = load_interpreters_map()
+        self.resolver = Resolver(self.interpreters)
+        self._tasks_by_file = {file: self._build_file(file) or [] for file in task_files(self.tasks_dir)}
+        self._rebuild_index()
+        self.resolver.save()
+        logger.info("🔁 %s tâches chargées depuis %s", len(self.tasks), self.tasks_dir)
+
+    def reload_changed(self, changed: set[Path]) -> None:
+        """
+        Recharge uniquement les fichiers modifiés : YAML de tâches et/ou venvs.yaml.
+
+        Seules les Task des YAML touchés (et, si venvs.yaml change, les tâches Python dont l'interpréteur
+        dépend d'une entrée modifiée) sont reconstruites. Un YAML devenu invalide garde ses tâches précédentes.
+        """
+        interpreters_path = Path(INTERPRETERS_PATH)
+        if interpreters_path in changed:
+            self._reload_interpreters()
+
+        for file in sorted(changed - {interpreters_path}):
+            if not file.exists():
+                if self._tasks_by_file.pop(file, None) is not None:
+                    logger.info("🔁 %s supprimé : tâches retirées", file.name)
+                continue
+            tasks = self._build_file(file)
+            if tasks is None:
+                logger.warning("⚠️ %s invalide : tâches précédentes conservées", file.name)
+                continue
+            self._tasks_by_file[file] = tasks
+            logger.info("🔁 %s rechargé : %s tâche(s)", file.name, len(tasks))
+        self._rebuild_index()
+        self.resolver.save()
+
+    def _reload_interpreters(self) -> None:
+        previous, self.interpreters = self.interpreters, load_interpreters_map()
+        modified = {
+            key for key in previous.keys() | self.interpreters.keys() if previous.get(key) != self.interpreters.get(key)
+        }
+        if not modified:
+            return
+        self.resolver = Resolver(self.interpreters)  # nouveau mtime de venvs.yaml : résolutions recalculées
+        rebuilt = 0
+        for tasks in self._tasks_by_file.values():
+            for i, task in enumerate(tasks):
+                if task.type != "python" or task.config.get("interpreter"):
+                    continue
+                if task.source_file in modified or detect_project_name(str(task.script)) in modified:
+                    tasks[i] = Task(task.config, task.source_file, resolver=self.resolver)
+                    rebuilt += 1
+        logger.info(
+            "🔁 venvs.yaml rechargé : %s entrée(s) modifiée(s), %s tâche(s) reconstruite(s)", len(modified), rebuilt
+        )
+
+    def _build_file(self, file: Path) -> list[Task] | None:
+        configs = load_task_file(file)
+        if configs is None:
+            return None
+        return [Task(cfg, cfg.get("source_file", file.stem), resolver=self.resolver) for cfg in configs]
+
+    def _rebuild_index(self) -> None:
+        # Les ids de l'index sont des positions dans self.tasks : on recompose la liste dans l'ordre des fichiers
+        self.tasks = [task for file in sorted(self._tasks_by_file) for task in self._tasks_by_file[file]]
+        self.index = ScheduleIndex([task.schedule for task in self.tasks], interval=0)
+        self.cleanup_tasks = [task for task in self.tasks if task.cleanup_schedule is not None]
+        self.cleanup_index = ScheduleIndex(
+            [task.cleanup_schedule for task in self.cleanup_tasks if task.cleanup_schedule is not None], interval=0
+        )
+
+    def _next_due(self, after: dt.datetime) -> dt.datetime | None:
+        # Prochaine minute où une tâche ou un cleanup est dû
+        candidates = [due for due in (self.index.next_due(after), self.cleanup_index.next_due(after)) if due]
+        return min(candidates, default=None)
+
+    def run(self) -> None:
+        """
+        Boucle principale du daemon (bloquante jusqu'à SIGTERM/SIGINT).
+        """
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        signal.set_wakeup_fd(self._wakeup_w.fileno())
+
+        logger.info("🚀 CRONBOSS daemon démarré")
+        self.reload()
+        metrics.serve()
+        if TASKS_WATCH_INTERVAL > 0:
+            self.file_watcher = FileWatcher(self.tasks_dir, [INTERPRETERS_PATH], TASKS_WATCH_INTERVAL)
+            fd = self.file_watcher.fileno()
+            if fd is not None:
+                self.supervisor.watcher.add_wakeup(fd)
+        now = dt.datetime.now()
+        next_due = self._next_due(now)
+        current_day = now.date()
+
+        while not self._stopping:
+            if self._reload_requested:
+                self._reload_requested = False
+                self.reload()
+                next_due = self._next_due(dt.datetime.now())
+            elif self.file_watcher is not None:
+                changed = self.file_watcher.changes()
+                if changed:
+                    self.reload_changed(changed)
+                    next_due = self._next_due(dt.datetime.now())
+
+            self._poll()
+
+            now = dt.datetime.now()
+            wait = IDLE_WAIT if next_due is None else (next_due - now).total_seconds()
+            if wait > 0:
+                # Réveil : échéance, fin d'un enfant, timeout d'une tâche, signal ou YAML modifié
+                watch = self.file_watcher.timeout() if self.file_watcher is not None else None
+                audit = audit_flush_timeout()
+                self.supervisor.wait(
+                    min(wait, IDLE_WAIT, IDLE_WAIT if watch is None else watch, IDLE_WAIT if audit is None else audit)
+                )
+                continue
+
+            assert next_due is not None
+            if now.date() != current_day:
+                current_day = now.date()
+                roll_daily_file("CronBoss")
+                roll_daily_file("Croboss")
+                rotate_outputs()
+
+            if -wait >= 60:
+                # Réveil tardif (suspension, horloge ajustée...) : on ne rattrape pas les minutes manquées
+                logger.warning("⏭️ Échéance %s manquée (retard %.0fs) — ignorée", next_due.strftime("%H:%M"), -wait)
+                next_due = self._next_due(now)
+                continue
+
+            self._tick(next_due)
+            next_due = self._next_due(next_due)
+
+        self.supervisor.abandon_pending()
+        logger.info("🛑 Arrêt demandé : attente de %s tâche(s) en cours", len(self.supervisor.running))
+        self.cleanup_pool.shutdown(wait=False, cancel_pending=True)
+        self.supervisor.wait_all()
+        self._poll()
+        self.cleanup_pool.shutdown()
+        close_audit_writers()
+        metrics.write_textfile()
+        metrics.shutdown()
+        if self.file_watcher is not None:
+            self.file_watcher.close()
+        logger.info("🏁 CRONBOSS daemon : TERMINE ✅\n")
+
+    def _tick(self, when: dt.datetime) -> None:
+        """
+        Lance les tâches dues à la minute `when`, puis soumet les cleanups dus au pool (sans attendre).
+        """
+        started = time.perf_counter()
+        logger.info("📅 CRONBOSS %s", when.strftime("%A %d-%m-%Y %H:%M"))
+        runs = [
+            self.tasks[task_id].new_run()
+            for task_id in self.index.due(when.weekday(), when.day, when.hour, when.minute)
+        ]
+        for position in apply_history(range(len(runs)), runs):
+            self.supervisor.launch(runs[position], when.timestamp())
+        metrics.observe("cronboss_tick_duration_seconds", time.perf_counter() - started)
+        self._cleanup(when)
+
+    def _poll(self) -> None:
+        """
+        Suivi des tâches en cours ; résumé envoyé dès que la vague en cours est terminée.
+        """
+        self.supervisor.poll()
+        if not self.supervisor.running and self.supervisor.finished:
+            flush_audit()  # vague terminée : l'audit est à jour sur disque
+            report_summary(self.supervisor.finished, self.notifier_manager)
+            metrics.write_textfile()
+            self.supervisor.finished = []
+        else:
+            flush_audit(due_only=True)
+
+    def _cleanup(self, when: dt.datetime) -> None:
+        """
+        Soumet au pool les nettoyages dus à la minute `when` (paires dossier/règle identiques fusionnées).
+        """
+        due = self.cleanup_index.due(when.weekday(), when.day, when.hour, when.minute)
+        self.cleanup_pool.submit(cleanup for i in due if (cleanup := self.cleanup_tasks[i].cleanup))
+
+    def _on_stop(self, signum: int, _frame: FrameType | None) -> None:
+        logger.info("📴 Signal %s reçu", signal.Signals(signum).name)
+        self._stopping = True
+
+    def _on_reload(self, _signum: int, _frame: FrameType | None) -> None:
+        logger.info("🔁 SIGHUP reçu : rechargement des tâches demandé")
+        self._reload_requested = True
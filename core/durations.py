@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+import math
+
+from core.task import Task
+from utils.config import (
+    DURATION_HISTORY_DAYS,
+    LAUNCH_ORDER,
+    TIMEOUT_AUTO_DEFAULT,
+    TIMEOUT_AUTO_MARGIN_PERCENT,
+    TIMEOUT_AUTO_MIN_RUNS,
+    TIMEOUT_AUTO_MIN_SECONDS,
+    TIMEOUT_AUTO_PERCENTILE,
+)
+from utils.history import DurationProfile
+from utils.logger import get_logger
+
+logger = get_logger("CronBoss")
+
+
+def auto_timeout(profile: DurationProfile | None) -> int:
+    """
+    Timeout dérivé des durées réussies : quantile haut (TIMEOUT_AUTO_PERCENTILE) + marge, au moins
+    TIMEOUT_AUTO_MIN_SECONDS ; TIMEOUT_AUTO_DEFAULT si l'historique est trop court.
+    """
+    if profile is None or profile["runs"] < TIMEOUT_AUTO_MIN_RUNS:
+        return TIMEOUT_AUTO_DEFAULT
+    return max(TIMEOUT_AUTO_MIN_SECONDS, math.ceil(profile["high"] * (1 + TIMEOUT_AUTO_MARGIN_PERCENT / 100)))
+
+
+def longest_first(
+    task_ids: Sequence[int], tasks: Sequence[Task], profiles: dict[tuple[str, str], DurationProfile]
+) -> list[int]:
+    """
+    Trie les tâches dues par durée attendue (p50 des succès) décroissante : sous un plafond de concurrence,
+    les longues démarrent d'abord et les courtes comblent les slots libérés (makespan réduit).
+
+    Les tâches sans historique passent en tête (durée inconnue, supposée longue) ; à durée égale,
+    l'ordre YAML est conservé.
+    """
+
+    def expected(task_id: int) -> float:
+        task = tasks[task_id]
+        profile = profiles.get((str(task.script), task.source_file))
+        return profile["p50"] if profile is not None else float("inf")
+
+    return sorted(task_ids, key=expected, reverse=True)
+
+
+def apply_history(task_ids: Sequence[int], tasks: Sequence[Task]) -> list[int]:
+    """
+    Applique l'historique des durées aux tâches dues : timeout des tâches `timeout: auto` et, avec
+    LAUNCH_ORDER=longest_first, ordre de lancement. L'historique n'est lu que si l'un des deux est utilisé.
+
+    :param task_ids: Tâches dues, dans l'ordre YAML.
+    :param tasks: Tâches chargées (indexées par task_ids).
+    :return: Tâches dues dans l'ordre de lancement.
+    """
+    auto = [tasks[task_id] for task_id in task_ids if tasks[task_id].timeout_auto]
+    ordered = LAUNCH_ORDER == "longest_first" and len(task_ids) > 1
+    if not auto and not ordered:
+        return list(task_ids)
+
+    from utils.audit_aggregator import open_history
+
+    try:
+        profiles = open_history().duration_profiles(DURATION_HISTORY_DAYS, TIMEOUT_AUTO_PERCENTILE / 100)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("⚠️ Historique des durées indisponible : %s", exc)
+        profiles = {}
+
+    for task in auto:
+        profile = profiles.get((str(task.script), task.source_file))
+        task.timeout = auto_timeout(profile)
+        logger.debug(
+            "⏱️ %s : timeout auto %ss (%s succès connus)", task.script, task.timeout, profile["runs"] if profile else 0
+        )
+    return longest_first(task_ids, tasks, profiles) if ordered else list(task_ids)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from collections.abc import Iterable
+import ctypes
+import os
+from pathlib import Path
+import struct
+import time
+
+from utils.logger import get_logger
+
+logger = get_logger("CronBoss")
+
+# inotify(7) : fichiers écrits puis fermés, renommés (éditeurs : écriture atomique), supprimés, touchés
+_IN_ATTRIB = 0x004
+_IN_CLOSE_WRITE = 0x008
+_IN_MOVED_FROM = 0x040
+_IN_MOVED_TO = 0x080
+_IN_DELETE = 0x200
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+_IN_Q_OVERFLOW = 0x4000
+_IN_IGNORED = 0x8000
+_WATCH_MASK = (
+    _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+)
+_RESCAN_MASK = _IN_Q_OVERFLOW | _IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF  # événements perdus / dossier remplacé
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len (+ nom sur `len` octets)
+
+Snapshot = dict[Path, tuple[int, int]]  # fichier -> (mtime_ns, taille)
+
+
+class FileWatcher:
+    """
+    Détecte les fichiers modifiés parmi les YAML d'un dossier de tâches et quelques fichiers isolés (venvs.yaml).
+
+    inotify (Linux, via ctypes) réveille le daemon dès qu'un fichier surveillé change ; sans inotify, on compare
+    mtime/taille toutes les `poll_interval` secondes. Dans les deux cas, la liste des fichiers modifiés vient
+    d'une comparaison d'instantanés (mtime_ns, taille) : un événement perdu ou en double ne fausse rien.
+    """
+
+    def __init__(self, tasks_dir: str | Path, files: Iterable[str | Path] = (), poll_interval: float = 5.0) -> None:
+        """
+        :param tasks_dir: Dossier des tâches (fichiers *.yaml).
+        :param files: Fichiers isolés à surveiller aussi (ex: INTERPRETERS_PATH).
+        :param poll_interval: Intervalle de polling (s) si inotify est indisponible.
+        """
+        self.tasks_dir = Path(tasks_dir)
+        self.files = [Path(f) for f in files]
+        self.poll_interval = poll_interval
+        self._snapshot = self._scan()
+        self._next_poll = time.monotonic() + poll_interval
+        self._wds: dict[int, tuple[bool, set[str]]] = {}  # wd -> (tous les *.yaml ?, noms surveillés)
+        self._fd = self._init_inotify()
+
+    def fileno(self) -> int | None:
+        """
+        Descripteur inotify à ajouter au selector du daemon (None = polling).
+        """
+        return self._fd
+
+    def timeout(self) -> float | None:
+        """
+        Délai max avant le prochain appel utile à changes() (None = réveil par inotify uniquement).
+        """
+        if self._fd is not None:
+            return None
+        return max(0.0, self._next_poll - time.monotonic())
+
+    def changes(self) -> set[Path]:
+        """
+        Fichiers créés, modifiés ou supprimés depuis l'appel précédent (ensemble vide si rien de neuf).
+        """
+        if self._fd is not None:
+            if not self._read_events():
+                return set()
+        else:
+            now = time.monotonic()
+            if now < self._next_poll:
+                return set()
+            self._next_poll = now + self.poll_interval
+
+        previous, self._snapshot = self._snapshot, self._scan()
+        return {
+            path for path in previous.keys() | self._snapshot.keys() if previous.get(path) != self._snapshot.get(path)
+        }
+
+    def close(self) -> None:
+        """
+        Libère le descripteur inotify.
+        """
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _scan(self) -> Snapshot:
+        snapshot: Snapshot = {}
+        for path in [*self.tasks_dir.glob("*.yaml"), *self.files]:
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # supprimé entre-temps (ou fichier isolé absent)
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def _init_inotify(self) -> int | None:
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (AttributeError, OSError) as exc:
+            logger.info("👀 inotify indisponible (%s) → polling toutes les %ss", exc, self.poll_interval)
+            return None
+        if fd < 0:
+            logger.info(
+                "👀 inotify indisponible (%s) → polling toutes les %ss",
+                os.strerror(ctypes.get_errno()),
+                self.poll_interval,
+            )
+            return None
+
+        # On surveille les dossiers (pas les fichiers) : un éditeur remplace souvent le fichier par un autre inode
+        targets: dict[Path, tuple[bool, set[str]]] = {self.tasks_dir: (True, set())}
+        for path in self.files:
+            targets.setdefault(path.parent, (False, set()))[1].add(path.name)
+        for directory, spec in targets.items():
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), _WATCH_MASK)
+            if wd < 0:
+                logger.warning(
+                    "⚠️ inotify : %s non surveillé (%s) → polling", directory, os.strerror(ctypes.get_errno())
+                )
+                os.close(fd)
+                return None
+            self._wds[wd] = spec
+        return fd
+
+    def _read_events(self) -> bool:
+        # Vide la file d'événements ; True si l'un d'eux concerne un fichier surveillé
+        assert self._fd is not None
+        relevant = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, size = _EVENT.unpack_from(data, offset)
+                name = data[offset + _EVENT.size : offset + _EVENT.size + size].rstrip(b"\0").decode(errors="replace")
+                offset += _EVENT.size + size
+                if mask & _RESCAN_MASK:
+                    relevant = True
+                    continue
+                all_yaml, names = self._wds.get(wd, (False, set()))
+                if (all_yaml and name.endswith(".yaml")) or name in names:
+                    relevant = True
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from collections.abc import Callable
+import os
+import resource
+import signal
+
+from utils.logger import get_logger
+from utils.types import LimitsCfg
+
+logger = get_logger("CronBoss")
+
+CPU_HARD_MARGIN = 5  # secondes entre SIGXCPU (limite douce) et SIGKILL (limite dure)
+IONICE_CLASSES = {"realtime": 1, "best-effort": 2, "idle": 3}
+IONICE_LEVEL = 4  # niveau par défaut du noyau pour realtime / best-effort
+_IOPRIO_CLASS_SHIFT = 13
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_SET_SYSCALL = {
+    "x86_64": 251,
+    "i686": 289,
+    "aarch64": 30,
+    "riscv64": 30,
+    "armv7l": 314,
+    "ppc64le": 273,
+    "s390x": 282,
+}
+_MEMORY_ERRORS = ("memoryerror", "cannot allocate memory", "bad_alloc", "out of memory", "xmalloc")
+
+
+def make_preexec(limits: LimitsCfg, script: str) -> Callable[[], None] | None:
+    """
+    Prépare la fonction exécutée dans l'enfant juste avant exec (preexec_fn) pour appliquer les limites.
+
+    Tout est résolu ici, dans le parent : l'enfant (fork d'un process multi-thread) n'exécute que des
+    appels système (setrlimit, setpriority, ioprio_set) et ignore leurs erreurs.
+
+    :param limits: Limites validées (voir utils.normalizer._normalize_limits).
+    :param script: Script de la tâche (pour les logs).
+    :return: Callable pour Popen(preexec_fn=...), ou None si aucune limite.
+    """
+    if not limits:
+        return None
+
+    rlimits: list[tuple[int, tuple[int, int]]] = []
+    if "memory_mb" in limits:
+        size = limits["memory_mb"] * 1024 * 1024
+        rlimits.append((resource.RLIMIT_AS, (size, size)))
+    if "cpu_seconds" in limits:
+        seconds = limits["cpu_seconds"]
+        rlimits.append((resource.RLIMIT_CPU, (seconds, seconds + CPU_HARD_MARGIN)))
+    if "nofile" in limits:
+        _, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        count = limits["nofile"] if hard == resource.RLIM_INFINITY else min(limits["nofile"], hard)
+        rlimits.append((resource.RLIMIT_NOFILE, (count, count)))
+
+    nice = limits.get("nice")
+    if nice is not None and nice < os.getpriority(os.PRIO_PROCESS, 0) and os.geteuid() != 0:
+        logger.warning("⚠️ %s : nice=%s demande des privilèges (ignoré si refusé)", script, nice)
+
+    ioprio_args: tuple[int, int, int, int] | None = None
+    syscall: Callable[..., int] | None = None
+    ionice_class = limits.get("ionice_class")
+    if ionice_class is not None:
+        ioprio_args = _ioprio_args(ionice_class, script)
+        if ioprio_args is not None:
+            import ctypes
+
+            syscall = ctypes.CDLL(None, use_errno=True).syscall
+
+    def apply_limits() -> None:
+        for res, values in rlimits:
+            try:
+                resource.setrlimit(res, values)
+            except (OSError, ValueError):
+                pass
+        if nice is not None:
+            try:
+                os.setpriority(os.PRIO_PROCESS, 0, nice)
+            except OSError:
+                pass
+        if syscall is not None and ioprio_args is not None:
+            syscall(*ioprio_args)
+
+    return apply_limits
+
+
+def _ioprio_args(ionice_class: str, label: str) -> tuple[int, int, int, int] | None:
+    # (n° syscall ioprio_set, who, pid, ioprio) ; pid 0 = thread appelant
+    machine = os.uname().machine
+    number = _IOPRIO_SET_SYSCALL.get(machine)
+    if number is None:
+        logger.warning("⚠️ %s : ionice non supporté sur %s (ignoré)", label, machine)
+        return None
+    level = 0 if ionice_class == "idle" else IONICE_LEVEL
+    return (number, _IOPRIO_WHO_PROCESS, 0, IONICE_CLASSES[ionice_class] << _IOPRIO_CLASS_SHIFT | level)
+
+
+def set_io_priority(ionice_class: str, label: str) -> bool:
+    """
+    Applique une classe de priorité I/O (ioprio_set) au thread appelant.
+
+    :param ionice_class: "realtime", "best-effort" ou "idle".
+    :param label: Contexte pour les logs.
+    :return: True si la priorité est appliquée.
+    """
+    if ionice_class not in IONICE_CLASSES:
+        logger.warning("⚠️ %s : classe ionice inconnue %r (ignorée)", label, ionice_class)
+        return False
+    args = _ioprio_args(ionice_class, label)
+    if args is None:
+        return False
+    import ctypes
+
+    libc = ctypes.CDLL(None, use_errno=True)
+    if libc.syscall(*args) != 0:
+        logger.warning("⚠️ %s : ionice %s refusé (%s)", label, ionice_class, os.strerror(ctypes.get_errno()))
+        return False
+    return True
+
+
+def detect_limit(limits: LimitsCfg, returncode: int | None, stderr: str, cpu_used: float) -> str | None:
+    """
+    Identifie la limite responsable de l'échec d'une exécution.
+
+    :param limits: Limites de la tâche.
+    :param returncode: Code de retour (signal négatif si tué).
+    :param stderr: Fin de stderr (MemoryError, EMFILE…).
+    :param cpu_used: Temps CPU consommé (s), pour attribuer un SIGKILL à la limite CPU dure.
+    :return: "cpu", "memory", "nofile" ou None.
+    """
+    if not limits or returncode in (None, 0):
+        return None
+    if "cpu_seconds" in limits and (
+        returncode == -signal.SIGXCPU or (returncode == -signal.SIGKILL and cpu_used >= limits["cpu_seconds"])
+    ):
+        return "cpu"
+    lowered = stderr.lower()
+    if "memory_mb" in limits and any(marker in lowered for marker in _MEMORY_ERRORS):
+        return "memory"
+    if "nofile" in limits and "too many open files" in lowered:
+        return "nofile"
+    return None
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+import fcntl
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+import shutil
+import threading
+import time
+from typing import IO
+
+from utils.config import (
+    LOG_ROTATION_DAYS,
+    OUTPUT_COMPRESSION,
+    OUTPUT_DIR,
+    OUTPUT_SPILL_MAX_MB,
+    OUTPUT_TAIL_KB,
+    OUTPUT_TAIL_LINES,
+)
+from utils.log_rotation import rotate_logs_daily
+from utils.logger import get_logger
+from utils.types import OutputIndexEntry, StreamSpan
+
+try:
+    import zstandard
+except ImportError:  # optionnel : gzip sinon
+    zstandard = None  # type: ignore[assignment]  # module absent : chaque usage teste `zstandard is None`
+
+logger = get_logger("CronBoss")
+
+INDEX_FILE = "index.jsonl"
+STREAMS = ("stdout", "stderr")
+_EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def _resolve_codec() -> str:
+    if OUTPUT_COMPRESSION in {"auto", "zstd"} and zstandard is not None:
+        return "zstd"
+    if OUTPUT_COMPRESSION == "zstd":
+        logger.warning("⚠️ OUTPUT_COMPRESSION=zstd mais le module zstandard est absent → gzip")
+    return "gzip"
+
+
+CODEC = _resolve_codec()
+
+
+def _open_writer(path: Path, codec: str) -> IO[str]:
+    if codec == "zstd":
+        assert zstandard is not None
+        raw = zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"), closefd=True)
+        return io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+    return gzip.open(path, "wt", encoding="utf-8", errors="replace", compresslevel=6)
+
+
+def _open_reader(data: bytes, codec: str) -> IO[str]:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("archive zstd illisible : module zstandard absent")
+        return io.TextIOWrapper(
+            zstandard.ZstdDecompressor().stream_reader(io.BytesIO(data)), encoding="utf-8", errors="replace"
+        )
+    return gzip.open(io.BytesIO(data), "rt", encoding="utf-8", errors="replace")
+
+
+class OutputCapture:
+    """
+    Capture bornée d'un flux de sortie (stdout ou stderr) d'une exécution.
+
+    - En mémoire : uniquement la fin du flux (max_lines lignes et max_bytes octets au plus).
+    - Sur disque : la sortie complète, compressée dans spill_path, jusqu'à spill_max_bytes
+      (taille non compressée, puis marque de troncature).
+
+    La mémoire du superviseur reste constante quel que soit le volume écrit par la tâche.
+    Un seul producteur (thread lecteur ou boucle asyncio) ; la lecture peut se faire depuis un autre thread.
+    """
+
+    def __init__(
+        self,
+        spill_path: Path | None = None,
+        max_lines: int = OUTPUT_TAIL_LINES,
+        max_bytes: int = OUTPUT_TAIL_KB * 1024,
+        spill_max_bytes: int = OUTPUT_SPILL_MAX_MB * 1024 * 1024,
+    ) -> None:
+        """
+        :param spill_path: Fichier recevant la sortie complète (None = mémoire uniquement).
+        :param max_lines: Nombre de lignes gardées en mémoire.
+        :param max_bytes: Taille max (octets) des lignes gardées en mémoire.
+        :param spill_max_bytes: Taille max de la sortie copiée (0 = pas de copie disque).
+        """
+        self.spill_path = spill_path if spill_max_bytes > 0 else None
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.spill_max_bytes = spill_max_bytes
+        self.total_lines = 0
+        self.total_bytes = 0
+        self.truncated = False  # copie plafonnée : la fin de la sortie n'y figure pas
+        self._tail: deque[tuple[str, int]] = deque()
+        self._tail_bytes = 0
+        self._spilled = 0
+        self._fh: IO[str] | None = None
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def append(self, line: str) -> None:
+        """
+        Ajoute une ligne (sans retour à la ligne final).
+        """
+        raw = line.encode("utf-8", errors="replace")
+        size = len(raw) + 1
+        with self._lock:
+            self.total_lines += 1
+            self.total_bytes += size
+            self._spill(line, size)
+
+            if size > self.max_bytes:
+                # Ligne géante : on n'en garde que la fin
+                line = raw[-(self.max_bytes - 1) :].decode("utf-8", errors="ignore")
+                size = self.max_bytes
+            self._tail.append((line, size))
+            self._tail_bytes += size
+            while len(self._tail) > self.max_lines or self._tail_bytes > self.max_bytes:
+                _, dropped = self._tail.popleft()
+                self._tail_bytes -= dropped
+
+    def _spill(self, line: str, size: int) -> None:
+        if self.spill_path is None or self._closed:
+            return
+        if self._spilled + size > self.spill_max_bytes:
+            if not self.truncated and self._fh is not None:
+                self._fh.write(f"[CronBoss] … sortie tronquée : plafond de {self.spill_max_bytes} octets atteint\n")
+            self.truncated = True
+            return
+        if self._fh is None:
+            # Ouvert au premier write : pas de fichier vide pour les scripts silencieux
+            try:
+                self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+                self._fh = _open_writer(self.spill_path, CODEC)
+            except OSError as exc:
+                logger.warning("⚠️ Sortie non copiée sur disque (%s) : %s", self.spill_path, exc)
+                self.spill_path = None
+                return
+        self._fh.write(f"{line}\n")
+        self._spilled += size
+
+    def lines(self) -> list[str]:
+        """
+        Dernières lignes gardées en mémoire.
+        """
+        with self._lock:
+            return [line for line, _ in self._tail]
+
+    def text(self) -> str:
+        """
+        Dernières lignes gardées en mémoire, jointes par des retours à la ligne.
+        """
+        return "\n".join(self.lines())
+
+    def close(self) -> None:
+        """
+        Ferme le fichier de sortie (les lignes arrivant ensuite ne vont plus qu'en mémoire).
+        """
+        with self._lock:
+            self._closed = True
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+
+
+def output_path(name: str, stream: str) -> Path:
+    """
+    Fichier temporaire (compressé) d'un flux, le temps de l'exécution.
+
+    :param name: Identifiant de l'exécution (script, run, tentative).
+    :param stream: "stdout" ou "stderr".
+    """
+    return Path(OUTPUT_DIR) / f"{name}.{stream}.part"
+
+
+def archive_output(
+    name: str,
+    run_id: str,
+    attempt: int,
+    script: str,
+    source_file: str,
+    started: float | None,
+    returncode: int | None,
+    stdout: OutputCapture,
+    stderr: OutputCapture,
+) -> OutputIndexEntry:
+    """
+    Regroupe stdout puis stderr (déjà compressés) dans l'archive de l'exécution et l'ajoute à l'index.
+
+    Chaque flux reste un membre gzip (ou frame zstd) autonome : l'index donne sa position dans l'archive,
+    ce qui permet de le relire sans décompresser le reste.
+    """
+    spans: dict[str, StreamSpan] = {}
+    archive = Path(OUTPUT_DIR) / f"{name}.log{_EXTENSIONS[CODEC]}"
+    parts = [(stream, capture) for stream, capture in zip(STREAMS, (stdout, stderr), strict=True)]
+    has_output = any(capture.spill_path is not None and capture.spill_path.exists() for _, capture in parts)
+
+    offset = 0
+    out = archive.open("wb") if has_output else None
+    try:
+        for stream, capture in parts:
+            length = 0
+            part = capture.spill_path
+            if out is not None and part is not None and part.exists():
+                with part.open("rb") as src:
+                    shutil.copyfileobj(src, out)
+                length = out.tell() - offset
+                part.unlink()
+            spans[stream] = {
+                "offset": offset,
+                "length": length,
+                "lines": capture.total_lines,
+                "truncated": capture.truncated,
+            }
+            offset += length
+    finally:
+        if out is not None:
+            out.close()
+
+    entry: OutputIndexEntry = {
+        "run_id": run_id,
+        "attempt": attempt,
+        "script": script,
+        "source_file": source_file,
+        "ts": started or time.time(),
+        "returncode": returncode,
+        "file": archive.name if has_output else None,
+        "codec": CODEC,
+        "stdout": spans["stdout"],
+        "stderr": spans["stderr"],
+    }
+    index = Path(OUTPUT_DIR) / INDEX_FILE
+    index.parent.mkdir(parents=True, exist_ok=True)
+    with index.open("a", encoding="utf-8") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        fh.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return entry
+
+
+def read_index() -> list[OutputIndexEntry]:
+    """
+    Entrées de l'index des sorties, de la plus ancienne à la plus récente.
+    """
+    index = Path(OUTPUT_DIR) / INDEX_FILE
+    if not index.exists():
+        return []
+    entries: list[OutputIndexEntry] = []
+    with index.open(encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue  # ligne partielle (écriture concurrente interrompue)
+    return entries
+
+
+def iter_output(entry: OutputIndexEntry, stream: str) -> Iterator[str]:
+    """
+    Relit un flux d'une exécution archivée, en se positionnant directement sur son membre compressé.
+
+    :param entry: Entrée d'index de l'exécution.
+    :param stream: "stdout" ou "stderr".
+    """
+    span: StreamSpan = entry["stdout"] if stream == "stdout" else entry["stderr"]
+    if entry["file"] is None or span["length"] == 0:
+        return
+    with (Path(OUTPUT_DIR) / entry["file"]).open("rb") as fh:
+        fh.seek(span["offset"])
+        data = fh.read(span["length"])
+    with _open_reader(data, entry["codec"]) as reader:
+        for line in reader:
+            yield line.rstrip("\n")
+
+
+def rotate_outputs() -> None:
+    """
+    Supprime les archives de sortie plus vieilles que LOG_ROTATION_DAYS et les retire de l'index.
+
+    Au plus une fois par jour (marqueur dans OUTPUT_DIR) : appelé à chaque tick.
+    """
+    if not os.path.isdir(OUTPUT_DIR):
+        return
+    if not rotate_logs_daily(OUTPUT_DIR, int(LOG_ROTATION_DAYS)):
+        return
+
+    index = Path(OUTPUT_DIR) / INDEX_FILE
+    if not index.exists():
+        return
+    cutoff = time.time() - int(LOG_ROTATION_DAYS) * 86400
+    with index.open("r+", encoding="utf-8") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        kept: list[str] = []
+        for line in fh:
+            try:
+                entry: OutputIndexEntry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if entry["file"] is None:
+                if entry["ts"] >= cutoff:
+                    kept.append(line)
+            elif (Path(OUTPUT_DIR) / entry["file"]).exists():
+                kept.append(line)
+        fh.seek(0)
+        fh.writelines(kept)
+        fh.truncate()
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+from pathlib import Path
+import statistics
+from typing import TypedDict
+import zlib
+
+from utils.config import (
+    REGRESSION_MAD_FACTOR,
+    REGRESSION_MIN_INCREASE_PERCENT,
+    REGRESSION_MIN_RUNS,
+    REGRESSION_MIN_SECONDS,
+    REGRESSION_STATE_DIR,
+    REGRESSION_WINDOW,
+)
+from utils.logger import get_logger
+
+logger = get_logger("CronBoss")
+
+MAD_TO_SIGMA = 1.4826  # MAD -> écart-type équivalent (loi normale)
+SECONDS_METRICS = ("duration", "cpu")  # métriques en secondes : écart minimal REGRESSION_MIN_SECONDS
+
+
+class Regression(TypedDict):
+    metric: str  # "duration" | "cpu" (user + sys, s) | "rss" (max_rss_kb)
+    value: float
+    baseline: float  # médiane de la fenêtre
+    threshold: float
+
+
+def regression_threshold(samples: list[float], metric: str) -> float | None:
+    """
+    Seuil de régression d'une métrique : médiane + REGRESSION_MAD_FACTOR × MAD (mise à l'échelle d'un écart-type),
+    et au moins médiane + REGRESSION_MIN_INCREASE_PERCENT (une fenêtre très stable ne lève pas d'alerte pour
+    quelques pourcents). None tant que la fenêtre compte moins de REGRESSION_MIN_RUNS valeurs.
+    """
+    if len(samples) < REGRESSION_MIN_RUNS:
+        return None
+    median = statistics.median(samples)
+    mad = statistics.median(abs(x - median) for x in samples) * MAD_TO_SIGMA
+    threshold = max(median + REGRESSION_MAD_FACTOR * mad, median * (1 + REGRESSION_MIN_INCREASE_PERCENT / 100))
+    if metric in SECONDS_METRICS:
+        threshold = max(threshold, median + REGRESSION_MIN_SECONDS)
+    return threshold
+
+
+class BaselineStore:
+    """
+    Référence glissante des exécutions réussies de chaque tâche : les REGRESSION_WINDOW dernières valeurs de
+    durée, CPU et RSS, dans un petit fichier JSON par tâche (REGRESSION_STATE_DIR), lu et réécrit sous flock
+    (plusieurs process CronBoss peuvent terminer la même tâche).
+    """
+
+    def __init__(self, state_dir: str | Path = REGRESSION_STATE_DIR, window: int = REGRESSION_WINDOW) -> None:
+        """
+        :param state_dir: Dossier des références (REGRESSION_STATE_DIR).
+        :param window: Nombre d'exécutions conservées par tâche (REGRESSION_WINDOW).
+        """
+        self.state_dir = Path(state_dir)
+        self.window = max(REGRESSION_MIN_RUNS, window)
+
+    def observe(self, script: str, source_file: str, sample: dict[str, float]) -> list[Regression]:
+        """
+        Compare une exécution réussie à la référence de sa tâche, puis l'ajoute à la fenêtre.
+
+        :param script: Script de la tâche.
+        :param source_file: YAML source.
+        :param sample: Métriques de l'exécution ("duration", et "cpu"/"rss" si mesurés).
+        :return: Métriques en régression (vide si aucune ou référence encore trop courte).
+        """
+        path = self._path(script, source_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644), "r+", encoding="utf-8") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                raw = fh.read()
+                state: dict[str, list[float]] = json.loads(raw) if raw else {}
+            except ValueError as exc:
+                logger.warning("⚠️ Référence de durées illisible (%s), réinitialisée : %s", path, exc)
+                state = {}
+
+            regressions: list[Regression] = []
+            for metric, value in sample.items():
+                samples = state.get(metric, [])
+                threshold = regression_threshold(samples, metric)
+                if threshold is not None and value > threshold:
+                    regressions.append(
+                        {
+                            "metric": metric,
+                            "value": value,
+                            "baseline": statistics.median(samples),
+                            "threshold": threshold,
+                        }
+                    )
+                state[metric] = [*samples, value][-self.window :]
+
+            fh.seek(0)
+            fh.truncate()
+            json.dump(state, fh)
+        return regressions
+
+    def _path(self, script: str, source_file: str) -> Path:
+        digest = zlib.crc32(f"{script}\0{source_file}".encode())
+        return self.state_dir / f"{Path(script).name}.{digest:08x}.json"
+
+
+def describe(regression: Regression) -> str:
+    """
+    Description lisible d'une régression (logs et notification).
+    """
+    metric = regression["metric"]
+    if metric == "rss":
+        value, baseline = f"{regression['value'] / 1024:.0f} Mo", f"{regression['baseline'] / 1024:.0f} Mo"
+    else:
+        value, baseline = f"{regression['value']:.2f}s", f"{regression['baseline']:.2f}s"
+    ratio = regression["value"] / regression["baseline"] if regression["baseline"] > 0 else float("inf")
+    label = {"duration": "durée", "cpu": "CPU"}.get(metric, "mémoire")
+    return f"{label} {value} (médiane {baseline}, x{ratio:.1f})"
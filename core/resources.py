@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import resource
+import time
+
+from utils.config import RUSAGE_SAMPLE_INTERVAL
+from utils.types import ResourceUsage
+
+BLOCK_SIZE = 512  # ru_inblock / ru_oublock sont comptés en blocs de 512 octets
+
+
+def usage_from_rusage(rusage: resource.struct_rusage) -> ResourceUsage:
+    """
+    Convertit la rusage d'un enfant réapé par os.wait4 (inclut ses descendants qu'il a lui-même attendus).
+
+    Sans RSS crête : ru_maxrss compte aussi la mémoire du superviseur copiée au fork (avant exec), elle
+    vient de l'échantillonnage de l'arbre (TreeSampler, rss_only).
+    """
+    return {
+        "cpu_user": round(rusage.ru_utime, 3),
+        "cpu_sys": round(rusage.ru_stime, 3),
+        "max_rss_kb": 0,
+        "io_read_bytes": int(rusage.ru_inblock) * BLOCK_SIZE,
+        "io_write_bytes": int(rusage.ru_oublock) * BLOCK_SIZE,
+    }
+
+
+def merge_usage(total: ResourceUsage | None, usage: ResourceUsage) -> ResourceUsage:
+    """
+    Cumule les ressources de plusieurs tentatives (CPU et I/O additionnés, RSS crête = max).
+    """
+    if total is None:
+        return usage
+    return {
+        "cpu_user": round(total["cpu_user"] + usage["cpu_user"], 3),
+        "cpu_sys": round(total["cpu_sys"] + usage["cpu_sys"], 3),
+        "max_rss_kb": max(total["max_rss_kb"], usage["max_rss_kb"]),
+        "io_read_bytes": total["io_read_bytes"] + usage["io_read_bytes"],
+        "io_write_bytes": total["io_write_bytes"] + usage["io_write_bytes"],
+    }
+
+
+class TreeSampler:
+    """
+    Échantillonne via psutil l'arbre de process d'une tâche (process racine + descendants).
+
+    Utilisé pour tout le relevé quand la rusage de os.wait4 n'est pas disponible (moteur asyncio, qui réape
+    lui-même ses enfants), et pour la seule RSS crête sinon (`rss_only`). La RSS d'un process est sa crête
+    depuis l'exec (VmHWM) quand /proc la donne. Valeurs approchées : un descendant né et mort entre deux
+    échantillons n'est pas vu, ni une crête atteinte juste avant la fin du process.
+    """
+
+    def __init__(self, pid: int, interval: float = RUSAGE_SAMPLE_INTERVAL, rss_only: bool = False) -> None:
+        """
+        :param pid: Process racine de la tâche.
+        :param interval: Intervalle minimal entre deux échantillons (RUSAGE_SAMPLE_INTERVAL).
+        :param rss_only: Ne relever que la RSS (CPU et I/O exacts via os.wait4).
+        """
+        self.pid = pid
+        self.interval = interval
+        self.rss_only = rss_only
+        self._cpu: dict[int, tuple[float, float]] = {}  # pid -> dernier (user, sys) vu
+        self._io: dict[int, tuple[int, int]] = {}  # pid -> dernier (read, write) vu
+        self._peak_rss = 0
+        self._last = 0.0
+
+    def sample(self, force: bool = False) -> None:
+        """
+        Relève CPU, RSS et I/O de l'arbre (au plus une fois par `interval`, sauf `force`).
+        """
+        now = time.monotonic()
+        if not force and now - self._last < self.interval:
+            return
+        self._last = now
+        import psutil  # import différé : seulement quand une tâche tourne
+
+        try:
+            root = psutil.Process(self.pid)
+            procs = [root, *root.children(recursive=True)]
+        except psutil.Error:
+            return
+
+        rss = 0
+        for proc in procs:
+            try:
+                with proc.oneshot():
+                    rss += _peak_rss(proc.pid) or proc.memory_info().rss
+                    if self.rss_only:
+                        continue
+                    cpu = proc.cpu_times()
+                    self._cpu[proc.pid] = (cpu.user, cpu.system)
+                    io = proc.io_counters()
+                    self._io[proc.pid] = (io.read_bytes, io.write_bytes)
+            except (psutil.Error, AttributeError):  # process disparu, accès refusé, io_counters absent
+                continue
+        self._peak_rss = max(self._peak_rss, rss)
+
+    def usage(self) -> ResourceUsage:
+        """
+        Ressources cumulées de l'arbre depuis le lancement (dernières valeurs vues par process).
+        """
+        return {
+            "cpu_user": round(sum(user for user, _ in self._cpu.values()), 3),
+            "cpu_sys": round(sum(sys for _, sys in self._cpu.values()), 3),
+            "max_rss_kb": self._peak_rss // 1024,
+            "io_read_bytes": sum(read for read, _ in self._io.values()),
+            "io_write_bytes": sum(write for _, write in self._io.values()),
+        }
+
+
+def _peak_rss(pid: int) -> int | None:
+    # Crête RSS du process depuis son exec (VmHWM, Linux), en octets ; None si indisponible
+    try:
+        with open(f"/proc/{pid}/status", "rb") as fh:
+            for line in fh:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
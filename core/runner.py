@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-from collections.abc import Mapping
+from collections.abc import Callable, Mapping
 import os
 from pathlib import Path
 import shlex
@@ -14,11 +14,60 @@ from utils.types import RunHandle
 logger = get_logger("CronBoss")
 
 
+def _absolute(path: str | Path) -> Path:
+    # Chemins déjà résolus par Task (handlers.get_interpreter.Resolver) : pas de realpath à chaque lancement
+    p = Path(path)
+    return p if p.is_absolute() else p.resolve()
+
+
+def build_python_command(
+    script_path: str | Path,
+    cwd: str | Path,
+    args: str = "",
+    interpreter: str | None = None,
+) -> tuple[list[str], Path, Mapping[str, str]]:
+    """
+    Construit la commande, le répertoire de travail et l'environnement d'un script Python.
+
+    :return: (cmd, workdir, env) — PYTHONPATH préfixé par le workdir.
+    """
+    full_path = _absolute(script_path)
+    workdir = _absolute(cwd)
+
+    # Construire l'env proprement
+    env: Mapping[str, str] = os.environ.copy()
+    # logger.debug(f"env: {env}")
+    logger.debug("⏰ [Python] %s cmd=%s cwd=%s", full_path, args, workdir)
+    current_pp = env.get("PYTHONPATH", "")
+    env = {
+        **env,
+        "PYTHONPATH": f"{workdir}{os.pathsep}{current_pp}" if current_pp else str(workdir),
+    }
+    cmd: list[str] = [interpreter or sys.executable, str(full_path), *shlex.split(args)]
+    logger.info("⏰ [Python] %s cmd=%s cwd=%s", full_path, cmd, workdir)
+    return cmd, workdir, env
+
+
+def build_bash_command(script_path: str | Path, cwd: str | Path, args: str = "") -> tuple[list[str], Path]:
+    """
+    Construit la commande et le répertoire de travail d'un script Bash.
+
+    :return: (cmd, workdir)
+    """
+    full_path = _absolute(script_path)
+    workdir = _absolute(cwd)
+    cmd: list[str] = ["bash", str(full_path), *shlex.split(args)]
+
+    logger.info("⏰ [Bash] %s cmd=%s cwd=%s", full_path, cmd, workdir)
+    return cmd, workdir
+
+
 def run_python_script(
     script_path: str | Path,
     cwd: str | Path,
     args: str = "",
     interpreter: str | None = None,
+    preexec_fn: Callable[[], None] | None = None,
 ) -> RunHandle:
     """
     Lance un script Python et retourne un handle de suivi (proc + cmd + script).
@@ -27,23 +76,11 @@ def run_python_script(
     :param cwd: répertoire de travail (sera passé à Popen)
     :param args: arguments CLI (string, sera parsé via shlex.split)
     :param interpreter: chemin d'interpréteur Python (venv) sinon sys.executable
+    :param preexec_fn: exécutée dans l'enfant avant exec (limites, voir core.limits)
     :return: RunHandle (TypedDict) contenant au minimum 'proc'
     """
     try:
-        full_path = Path(script_path).resolve()
-        workdir = Path(cwd).resolve()
-
-        # Construire l'env proprement
-        env: Mapping[str, str] = os.environ.copy()
-        # logger.debug(f"env: {env}")
-        logger.debug("⏰ [Python] %s cmd=%s cwd=%s", full_path, args, workdir)
-        current_pp = env.get("PYTHONPATH", "")
-        env = {
-            **env,
-            "PYTHONPATH": f"{workdir}{os.pathsep}{current_pp}" if current_pp else str(workdir),
-        }
-        cmd: list[str] = [interpreter or sys.executable, str(full_path), *shlex.split(args)]
-        logger.info("⏰ [Python] %s cmd=%s cwd=%s", full_path, cmd, workdir)
+        cmd, workdir, env = build_python_command(script_path, cwd, args, interpreter)
 
         proc: subprocess.Popen[str] = subprocess.Popen(
             cmd,
@@ -53,8 +90,10 @@ def run_python_script(
             stderr=subprocess.PIPE,
             text=True,
             close_fds=True,
+            start_new_session=True,  # groupe de process dédié : timeout = tout l'arbre
+            preexec_fn=preexec_fn,  # limites de ressources (core.limits)
         )
-        return {"proc": proc, "cmd": cmd, "script": str(full_path)}
+        return {"proc": proc, "cmd": cmd, "script": cmd[1]}
     except Exception as exc:  # pylint: disable=broad-except
         logger.exception("🚨 Erreur Python pour %s : %s", script_path, exc)
         raise
@@ -64,6 +103,7 @@ def run_bash_script(
     script_path: str | Path,
     cwd: str | Path,
     args: str = "",
+    preexec_fn: Callable[[], None] | None = None,
 ) -> RunHandle:
     """
     Lance un script Bash et retourne un handle de suivi (proc + cmd + script).
@@ -71,13 +111,10 @@ def run_bash_script(
     :param script_path: chemin du script .sh
     :param cwd: répertoire de travail
     :param args: arguments CLI (string, sera parsé via shlex.split)
+    :param preexec_fn: exécutée dans l'enfant avant exec (limites, voir core.limits)
     """
     try:
-        full_path = Path(script_path).resolve()
-        workdir = Path(cwd).resolve()
-        cmd: list[str] = ["bash", str(full_path), *shlex.split(args)]
-
-        logger.info("⏰ [Bash] %s cmd=%s cwd=%s", full_path, cmd, workdir)
+        cmd, workdir = build_bash_command(script_path, cwd, args)
 
         proc: subprocess.Popen[str] = subprocess.Popen(
             cmd,
@@ -86,8 +123,10 @@ def run_bash_script(
             stderr=subprocess.PIPE,
             text=True,
             close_fds=True,
+            start_new_session=True,  # groupe de process dédié : timeout = tout l'arbre
+            preexec_fn=preexec_fn,  # limites de ressources (core.limits)
         )
-        return {"proc": proc, "cmd": cmd, "script": str(full_path)}
+        return {"proc": proc, "cmd": cmd, "script": cmd[1]}
     except Exception as exc:  # pylint: disable=broad-except
         logger.exception("🚨 Erreur Bash %s : %s", script_path, exc)
         raise
@@ -1,24 +1,59 @@
 from __future__ import annotations
 
+from collections.abc import Iterator, Sequence
+import datetime as dt
+from functools import lru_cache
 from pathlib import Path
 
-import psutil
-
 from utils.config import CRON_INTERVAL_MINUTES
 from utils.logger import get_logger
-from utils.types import DaysField, HoursField, MinutesField, TaskConfig  # TypedDict & unions
+from utils.normalizer import ALL_DAYS, ALL_HOURS, ALL_MINUTES, ALL_WEEKDAYS, compile_schedule
+from utils.types import ScheduleMasks, TaskConfig  # TypedDict & unions
 
 logger = get_logger("CronBoss")
 
 
+@lru_cache(maxsize=256)
+def _minute_window_mask(minute: int, interval: int = CRON_INTERVAL_MINUTES) -> int:
+    """
+    Masque des minutes couvertes par le tick courant.
+
+    Sans intervalle (0) : uniquement `minute`.
+    Avec : la fenêtre [minute - (intervalle - 1), minute] (modulo 60).
+    """
+    if interval <= 0:
+        return 1 << minute
+    mask = 0
+    for offset in range(min(interval, 60)):
+        mask |= 1 << ((minute - offset) % 60)
+    return mask
+
+
+def _iter_bits(value: int) -> Iterator[int]:
+    """
+    Itère sur les positions des bits à 1 (ordre croissant), en O(nb de bits à 1).
+    """
+    while value:
+        low = value & -value
+        yield low.bit_length() - 1
+        value ^= low
+
+
+def get_schedule(task: TaskConfig) -> ScheduleMasks:
+    """
+    Retourne les masques compilés de la tâche (compilés à la volée si absents).
+    """
+    masks = task.get("schedule")
+    if masks is None:
+        masks = compile_schedule(task.get("hours", "any"), task.get("minutes", []), task.get("days", "any"))
+    return masks
+
+
 def should_run(task: TaskConfig, hour: int, minute: int, weekday: int, day: int) -> bool:
     """
     Détermine si une tâche doit s'exécuter au tick courant.
 
-    Hypothèses (via normalizer):
-      - task["hours"] ∈ {"any", list[int]}
-      - task["minutes"] ∈ list[int] (liste vide = pas de contrainte → "any")
-      - task["days"] ∈ {"any", list[int] (jours du mois), {"weekday": list[int]}}
+    S'appuie sur les masques de bits compilés par le normalizer (task["schedule"]).
 
     :param task: Config de la tâche (normalisée).
     :param hour: Heure courante (0..23).
@@ -27,34 +62,125 @@ def should_run(task: TaskConfig, hour: int, minute: int, weekday: int, day: int)
     :param day: Jour du mois courant (1..31).
     :return: True si la tâche doit s'exécuter, False sinon.
     """
-    # Heures
-    hours: HoursField = task.get("hours", "any")
-    match_hour = True if hours == "any" else hour in hours
-
-    # Jours
-    days: DaysField = task.get("days", "any")
-    if days == "any":
-        match_day = True
-    elif isinstance(days, list):
-        # liste => jours du mois
-        match_day = day in days
-    elif isinstance(days, dict) and "weekday" in days:
-        # spécification par jour de semaine
-        match_day = weekday in days.get("weekday", [])
-    else:
-        match_day = False
-
-    # Minutes (rappel: [] = any)
-    minutes: MinutesField = task.get("minutes", [])
-    if not minutes:
-        match_minute = True
-    elif CRON_INTERVAL_MINUTES > 0:
-        lower = (minute - (CRON_INTERVAL_MINUTES - 1)) % 60
-        match_minute = any(((m - lower) % 60) < CRON_INTERVAL_MINUTES for m in minutes)
-    else:
-        match_minute = minute in minutes
-
-    return match_hour and match_day and match_minute
+    return schedule_matches(get_schedule(task), hour, minute, weekday, day)
+
+
+def schedule_matches(
+    masks: ScheduleMasks, hour: int, minute: int, weekday: int, day: int, interval: int = CRON_INTERVAL_MINUTES
+) -> bool:
+    """
+    Teste des masques compilés (tâche ou cleanup) contre un tick.
+
+    :param interval: Fenêtre de tolérance en minutes (CRON_INTERVAL_MINUTES, 0 = minute exacte).
+    """
+    return bool(
+        (masks["hours"] >> hour) & 1
+        and (masks["days"] >> (day - 1)) & 1
+        and (masks["weekdays"] >> weekday) & 1
+        and masks["minutes"] & _minute_window_mask(minute, interval)
+    )
+
+
+class ScheduleIndex:
+    """
+    Index (jour de semaine, jour, heure, minute) → ids de tâches.
+
+    Chaque dimension stocke, pour chaque valeur, l'ensemble des ids de tâches (bitset sur un int).
+    Les tâches "any" sur une dimension sont rangées à part pour ne pas remplir 60/24/31/7 cases.
+    Une requête = 4 AND d'entiers + itération sur les seuls ids dus.
+    """
+
+    def __init__(self, schedules: Sequence[ScheduleMasks], interval: int = CRON_INTERVAL_MINUTES) -> None:
+        """
+        :param schedules: Masques compilés ; l'id d'une tâche est sa position dans la séquence.
+        :param interval: Fenêtre de tolérance en minutes (CRON_INTERVAL_MINUTES, 0 = minute exacte).
+        """
+        self._interval = interval
+        self._minutes = _Dimension(60, ALL_MINUTES)
+        self._hours = _Dimension(24, ALL_HOURS)
+        self._days = _Dimension(31, ALL_DAYS)
+        self._weekdays = _Dimension(7, ALL_WEEKDAYS)
+        for task_id, masks in enumerate(schedules):
+            bit = 1 << task_id
+            self._minutes.add(masks["minutes"], bit)
+            self._hours.add(masks["hours"], bit)
+            self._days.add(masks["days"], bit)
+            self._weekdays.add(masks["weekdays"], bit)
+
+    def due(self, weekday: int, day: int, hour: int, minute: int) -> list[int]:
+        """
+        Retourne les ids (positions) des tâches dues au tick donné, par ordre croissant.
+
+        :param weekday: Jour de semaine (0=Mon .. 6=Sun).
+        :param day: Jour du mois (1..31).
+        :param hour: Heure (0..23).
+        :param minute: Minute (0..59).
+        """
+        candidates = self._weekdays.get(weekday) & self._days.get(day - 1) & self._hours.get(hour)
+        if candidates:
+            candidates &= self._minute_bits(minute)
+        return list(_iter_bits(candidates))
+
+    def next_due(self, after: dt.datetime, horizon_days: int = 366) -> dt.datetime | None:
+        """
+        Retourne la prochaine minute (strictement après `after`) où au moins une tâche est due.
+
+        Parcours hiérarchique jour → heure → minute : un jour (ou une heure) sans aucune tâche
+        est sauté d'un bloc, sans tester ses minutes.
+
+        :param after: Instant de référence (heure locale naïve).
+        :param horizon_days: Nombre de jours explorés au maximum.
+        :return: datetime de la prochaine échéance, ou None si aucune dans l'horizon.
+        """
+        start = after.replace(second=0, microsecond=0) + dt.timedelta(minutes=1)
+        first_day = start.replace(hour=0, minute=0)
+        for offset in range(horizon_days + 1):
+            day = first_day + dt.timedelta(days=offset)
+            day_bits = self._weekdays.get(day.weekday()) & self._days.get(day.day - 1)
+            if not day_bits:
+                continue
+            first_hour = start.hour if offset == 0 else 0
+            for hour in range(first_hour, 24):
+                hour_bits = day_bits & self._hours.get(hour)
+                if not hour_bits:
+                    continue
+                first_minute = start.minute if offset == 0 and hour == start.hour else 0
+                for minute in range(first_minute, 60):
+                    if hour_bits & self._minute_bits(minute):
+                        return day.replace(hour=hour, minute=minute)
+        return None
+
+    def _minute_bits(self, minute: int) -> int:
+        """
+        Bitset des tâches dont une minute tombe dans la fenêtre du tick `minute`.
+        """
+        bits = 0
+        for m in _iter_bits(_minute_window_mask(minute, self._interval)):
+            bits |= self._minutes.get(m)
+        return bits
+
+
+class _Dimension:
+    """
+    Une dimension de l'index : valeur → bitset des ids de tâches.
+    """
+
+    __slots__ = ("_any", "_full", "_slots")
+
+    def __init__(self, size: int, full_mask: int) -> None:
+        self._full = full_mask
+        self._any = 0
+        self._slots = [0] * size
+
+    def add(self, mask: int, bit: int) -> None:
+        if mask == self._full:
+            self._any |= bit
+            return
+        for value in _iter_bits(mask):
+            self._slots[value] |= bit
+
+    def get(self, value: int) -> int:
+        return self._any | self._slots[value]
 
 
 def is_script_running(script_path: str) -> bool:
@@ -63,6 +189,8 @@ def is_script_running(script_path: str) -> bool:
 
     :param script_path: Chemin du script recherché.
     """
+    import psutil
+
     for proc in psutil.process_iter(["cmdline"]):
         try:
             cmdline: list[str] | None = proc.info.get("cmdline")
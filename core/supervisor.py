@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from collections.abc import Iterable
+import heapq
+import itertools
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING
+
+from core.admission import AdmissionQueue, parse_caps
+from core.child_watcher import ChildWatcher
+from core.output import rotate_outputs
+from core.runner import run_bash_script, run_python_script
+from core.task import Task
+from notifiers.manager import NotifierManager
+from utils.audit import RunRecord, append_run_record
+from utils.config import (
+    AUDIT_JSON,
+    AUDIT_TREND_DAYS,
+    EXECUTION_ENGINE,
+    MAX_PARALLEL,
+    MAX_PARALLEL_PER_PROJECT,
+    PARALLEL_GROUP_BY,
+    PROJECT_MAX_PARALLEL,
+    REGRESSION_DETECTION,
+    RUSAGE_SAMPLE_INTERVAL,
+)
+from utils.lock import release_task_lock
+from utils.logger import get_logger
+from utils.metrics import metrics
+from utils.types import RunHandle, SummaryPayload
+
+if TYPE_CHECKING:
+    from utils.history import TaskStats
+
+logger = get_logger("CronBoss")
+
+
+def spawn(task: Task) -> RunHandle | None:
+    """
+    Lance le process d'une tâche selon son type, via le moteur choisi (EXECUTION_ENGINE).
+
+    :return: RunHandle, ou None si le type est inconnu.
+    """
+    use_asyncio = EXECUTION_ENGINE == "asyncio"
+    if task.type not in {"python", "bash"}:
+        logger.warning("❓ Type inconnu : %s pour %s", task.type, task.script)
+        return None
+    captures = task.open_output()
+    if use_asyncio:
+        # import différé : asyncio n'est chargé qu'avec EXECUTION_ENGINE=asyncio
+        from core.async_runner import run_bash_script_async, run_python_script_async
+    if task.type == "python":
+        logger.info("🐍 Lancement de %s avec l'interpréteur %s", task.script, task.interpreter)
+        if use_asyncio:
+            return run_python_script_async(
+                task.script_path, task.cwd, task.args, task.interpreter, captures, task.preexec_fn
+            )
+        return run_python_script(task.script_path, task.cwd, task.args, task.interpreter, task.preexec_fn)
+    if use_asyncio:
+        return run_bash_script_async(task.script_path, task.cwd, task.args, captures, task.preexec_fn)
+    return run_bash_script(task.script_path, task.cwd, task.args, task.preexec_fn)
+
+
+class Supervisor:
+    """
+    Lance les tâches et suit leur exécution : retries, audit, notifications.
+
+    Utilisé tel quel par le mode one-shot (crontab) et par le mode daemon.
+    La fin des process est détectée par événement (ChildWatcher) : pas de polling périodique.
+    Les lancements passent par une file d'admission (MAX_PARALLEL, plafonds par projet).
+    """
+
+    def __init__(self, notifier_manager: NotifierManager) -> None:
+        self.notifier_manager = notifier_manager
+        self.running: list[Task] = []
+        self.finished: list[Task] = []
+        self.watcher = ChildWatcher()
+        self.queue = AdmissionQueue(
+            max_parallel=MAX_PARALLEL,
+            per_project=MAX_PARALLEL_PER_PROJECT,
+            project_caps=parse_caps(PROJECT_MAX_PARALLEL),
+            group_by=PARALLEL_GROUP_BY,
+        )
+        # Retries en attente : (échéance, ordre, tâche) — aucun sleep dans la boucle de suivi
+        self.pending_retries: list[tuple[float, int, Task]] = []
+        self._retry_seq = itertools.count()
+        rotate_outputs()
+
+    def launch(self, task: Task, due_at: float | None = None) -> None:
+        """
+        Soumet une tâche due : lancée tout de suite si un slot est libre, sinon mise en file.
+
+        :param due_at: Échéance planifiée (timestamp) : mesure de la latence de lancement.
+        """
+        if not task.enabled:
+            return
+        task.due_at = due_at
+        self.queue.push(task)
+        self._admit()
+        if task.proc is None and task in self.queue:
+            logger.info("⏳ %s en file d'attente (%s en cours)", task.script, len(self.running))
+
+    def _admit(self) -> None:
+        """
+        Lance les tâches de la file tant que les plafonds le permettent.
+        """
+        while True:
+            batch = self.queue.pop_admissible(self.running)
+            if not batch:
+                return
+            for task in batch:
+                self._start(task)
+
+    def _start(self, task: Task) -> bool:
+        """
+        Lance une tâche si son lock est disponible.
+
+        :return: True si un process a été démarré.
+        """
+        if task.interpreter_error:
+            # Venv cassé détecté à la résolution : échec immédiat, sans lock ni process
+            logger.error("🚨 Impossible de lancer %s : %s", task.script, task.interpreter_error)
+            self.notifier_manager.notify(task, "failure", error=task.interpreter_error)
+            return False
+        if not task.can_start():
+            return False
+        try:
+            handle = spawn(task)
+            if handle is None:
+                release_task_lock(task._task_lock_fh)
+                task._task_lock_fh = None
+                return False
+
+            task.start(handle)
+            if task.proc is None:
+                logger.info("⏭️ %s non démarrée (lock indisponible).", task.script)
+                return False
+            self.running.append(task)
+            self.watcher.watch(task.proc.pid, task)
+            if task.due_at is not None:
+                metrics.observe(
+                    "cronboss_task_launch_latency_seconds", max(0.0, time.time() - task.due_at), **task.metric_labels()
+                )
+                task.due_at = None
+            metrics.set("cronboss_running_tasks", len(self.running))
+            return True
+
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("🚨 Impossible de lancer %s : %s", task.script, exc)
+            self.notifier_manager.notify(task, "failure", error=str(exc))
+            # libère le lock acquis par can_start()
+            release_task_lock(task._task_lock_fh)
+            task._task_lock_fh = None
+            return False
+
+    def poll(self) -> None:
+        """
+        Un passage de suivi sur les tâches en cours, puis relance des retries arrivés à échéance.
+        """
+        still_running: list[Task] = []
+
+        for task in self.running:
+            pid = task.proc.pid if task.proc is not None else None
+            task.sample_resources()
+            status = task.check_status()  # None | "success" | "failure" | "retry"
+
+            if status is None:
+                # Toujours en cours
+                still_running.append(task)
+                continue
+
+            if pid is not None:
+                self.watcher.unwatch(pid)
+
+            if status == "retry":
+                delay = max(0.0, (task.retry_at or 0.0) - time.time())
+                logger.warning(
+                    "🔄 Retry %s/%s pour %s dans %.1fs (code %s)",
+                    task.attempts,
+                    task.retries,
+                    task.script,
+                    delay,
+                    task.returncode,
+                )
+                heapq.heappush(self.pending_retries, (task.retry_at or 0.0, next(self._retry_seq), task))
+                continue
+
+            # Ici: "success" ou "failure" -> on collecte proprement
+            self._complete(task)
+
+        self.running = still_running
+        metrics.set("cronboss_running_tasks", len(self.running))
+
+        # Retries échus : repassent par la file d'admission (plafonds respectés, lock conservé)
+        now = time.time()
+        while self.pending_retries and self.pending_retries[0][0] <= now:
+            _, _, task = heapq.heappop(self.pending_retries)
+            self.queue.push(task)
+        self._admit()
+
+    def wait(self, timeout: float | None = None) -> None:
+        """
+        Bloque sans consommer de CPU jusqu'à la fin d'un enfant, la prochaine échéance de timeout
+        ou de retry, un réveil externe (signal) ou `timeout`.
+
+        :param timeout: Délai max en secondes (None = illimité).
+        """
+        now = time.time()
+        for task in self.running:
+            deadline = task.next_deadline()
+            if deadline is not None:
+                # check_status() compare en strict (>) : petite marge pour tomber après l'échéance
+                remaining = max(0.0, deadline - now) + 0.05
+                timeout = remaining if timeout is None else min(timeout, remaining)
+        if self.pending_retries:
+            remaining = max(0.0, self.pending_retries[0][0] - now)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        if self.running and RUSAGE_SAMPLE_INTERVAL > 0:
+            # Échantillonnage psutil des ressources (RSS crête ; tout le relevé pour le moteur asyncio)
+            timeout = RUSAGE_SAMPLE_INTERVAL if timeout is None else min(timeout, RUSAGE_SAMPLE_INTERVAL)
+        self.watcher.wait(timeout)
+
+    def wait_all(self) -> None:
+        """
+        Suit les tâches en cours jusqu'à ce qu'elles soient toutes terminées.
+        """
+        while self.running or self.queue or self.pending_retries:
+            self.poll()
+            if self.running or self.pending_retries:
+                self.wait()
+
+    def abandon_pending(self) -> None:
+        """
+        Arrêt : vide la file d'admission et clôt les retries en attente sur leur dernier échec.
+        """
+        for task in self.queue.clear():
+            if task.attempts == 0:
+                logger.info("⏭️ %s non lancée (arrêt en cours)", task.script)
+            else:
+                self._complete(task)
+        while self.pending_retries:
+            _, _, task = heapq.heappop(self.pending_retries)
+            logger.info("⏭️ Retry de %s abandonné (arrêt en cours)", task.script)
+            self._complete(task)
+
+    def _complete(self, task: Task) -> None:
+        """
+        Finalise une tâche terminée : collecte, audit, notification.
+        """
+        task.finish()
+        self.finished.append(task)
+
+        final = task.get_status()
+
+        if task.is_success():
+            logger.info("🌞 %s OK en %.2fs", task.script, task.duration or 0.0)
+        else:
+            logger.error("🚨 %s KO (code %s)", task.script, task.returncode)
+        slow = self._regressions(task) if REGRESSION_DETECTION and task.is_success() else []
+
+        record: RunRecord = {
+            "run_id": task.run_id,
+            "script": str(task.script),
+            "status": "limit_exceeded" if task.limit_hit else final,
+            "duration": float(task.duration or 0.0),
+            "queue_wait": round(task.queue_wait, 3),
+            "returncode": task.returncode,
+            "source_file": task.source_file,
+            "stdout_tail": (task.stdout or "")[-400:] or None,
+            "stderr_tail": (task.stderr or "")[-400:] or None,
+        }
+        if task.limit_hit:
+            record["limit"] = task.limit_hit
+        if slow:
+            record["slow"] = [metric for metric, _ in slow]
+        if task.timed_out:
+            record["timed_out"] = True
+        if task.leaked_pids:
+            record["leaked_pids"] = task.leaked_pids
+        if task.resources is not None:
+            record["cpu_user"] = task.resources["cpu_user"]
+            record["cpu_sys"] = task.resources["cpu_sys"]
+            if task.resources["max_rss_kb"] > 0:  # non mesurée si l'échantillonnage est désactivé
+                record["max_rss_kb"] = task.resources["max_rss_kb"]
+            record["io_read_bytes"] = task.resources["io_read_bytes"]
+            record["io_write_bytes"] = task.resources["io_write_bytes"]
+        append_run_record(AUDIT_JSON, record)
+
+        labels = task.metric_labels()
+        metrics.observe("cronboss_task_duration_seconds", record["duration"], **labels)
+        metrics.observe("cronboss_task_queue_wait_seconds", task.queue_wait, **labels)
+        metrics.inc("cronboss_task_runs", status=record["status"], **labels)
+        metrics.set("cronboss_task_last_run_timestamp_seconds", time.time(), **labels)
+        metrics.set("cronboss_task_last_run_success", float(task.is_success()), **labels)
+
+        self.notifier_manager.notify(
+            task,
+            final,
+            stdout=task.stdout,
+            stderr=task.stderr,
+            duration=task.duration or 0.0,
+            returncode=task.returncode,
+        )
+        if slow:
+            self.notifier_manager.notify(
+                task, "slow", duration=task.duration or 0.0, regressions="\n".join(text for _, text in slow)
+            )
+
+    def _regressions(self, task: Task) -> list[tuple[str, str]]:
+        """
+        Compare une exécution réussie à la référence glissante de sa tâche (durée, CPU, RSS).
+
+        :return: (métrique, description) des régressions détectées.
+        """
+        from core.regression import BaselineStore, describe
+
+        sample = {"duration": float(task.duration or 0.0)}
+        if task.resources is not None:
+            sample["cpu"] = task.resources["cpu_user"] + task.resources["cpu_sys"]
+            if task.resources["max_rss_kb"] > 0:
+                sample["rss"] = float(task.resources["max_rss_kb"])
+        try:
+            regressions = BaselineStore().observe(str(task.script), task.source_file, sample)
+        except OSError as exc:
+            logger.warning("⚠️ Référence de durées indisponible pour %s : %s", task.script, exc)
+            return []
+        slow = [(regression["metric"], describe(regression)) for regression in regressions]
+        for _, text in slow:
+            logger.warning("🐢 %s : régression de %s", task.script, text)
+        return slow
+
+
+def report_summary(tasks: Iterable[Task], notifier_manager: NotifierManager) -> None:
+    """
+    Log + notification du résumé global des tâches exécutées.
+    """
+    summary_counts: dict[str, int] = {"success": 0, "success_with_warnings": 0, "failure": 0}
+    total_duration: float = 0.0
+    ran: list[Task] = []
+
+    for task in tasks:
+        st = task.get_status()
+        if st in summary_counts:
+            summary_counts[st] += 1
+        if task.duration is not None:
+            total_duration += task.duration
+            ran.append(task)
+
+    logger.info(
+        "📊 RÉSUMÉ : ✅ %s succès | ⚠️ %s avec warnings | ❌ %s échecs | ⏱️ Durée totale : %.2fs",
+        summary_counts["success"],
+        summary_counts["success_with_warnings"],
+        summary_counts["failure"],
+        total_duration,
+    )
+    trends = task_trends(ran) if AUDIT_TREND_DAYS > 0 and ran else []
+    for line in trends:
+        logger.info(line)
+
+    summary_payload: SummaryPayload = {
+        "success": summary_counts["success"],
+        "success_with_warnings": summary_counts["success_with_warnings"],
+        "failure": summary_counts["failure"],
+        "total_duration": total_duration,
+        "trends": trends,
+    }
+    notifier_manager.notify_summary(summary_payload)
+
+
+def task_trends(tasks: Iterable[Task], days: int = AUDIT_TREND_DAYS) -> list[str]:
+    """
+    Tendance de chaque tâche exécutée : durée de ce run face à la moyenne et au p95 des `days` derniers
+    jours, évolution de la moyenne par rapport aux `days` jours précédents, échecs sur la fenêtre.
+
+    Source : agrégats incrémentaux du journal JSONL (AuditAggregator), ou l'historique SQLite si
+    AUDIT_BACKEND=sqlite. L'audit doit être vidé sur disque avant l'appel.
+    """
+    from utils.audit_aggregator import open_history
+
+    try:
+        history = open_history()
+        current, previous = history.stats(days), history.stats(days, offset_days=days)
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.warning("⚠️ Tendances indisponibles : %s", exc)
+        return []
+
+    def by_key(rows: list[TaskStats]) -> dict[tuple[str, str], TaskStats]:
+        return {(row["script"], row["source_file"]): row for row in rows}
+
+    now, before = by_key(current), by_key(previous)
+    lines: list[str] = []
+    for task in tasks:
+        key = (str(task.script), task.source_file)
+        row = now.get(key)
+        if row is None:
+            continue
+        evolution = ""
+        prev = before.get(key)
+        if prev is not None and prev["avg"] > 0:
+            change = (row["avg"] - prev["avg"]) / prev["avg"] * 100
+            arrow = "→" if abs(change) < 5 else "↗" if change > 0 else "↘"
+            evolution = f" {arrow} {change:+.0f} % vs {days}j préc."
+        lines.append(
+            f"📈 {Path(str(task.script)).name} : {task.duration or 0.0:.2f}s | moy. {days}j {row['avg']:.2f}s"
+            f"{evolution} | p95 {row['p95']:.2f}s | échecs {row['failures']}/{row['runs']}"
+        )
+    return lines
@@ -1,28 +1,52 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+import copy
 import logging
+import os
 from pathlib import Path
+import random
+import signal
 import subprocess
 import threading
 import time
 from typing import IO, Literal
-
-from core.scheduler import should_run
-from handlers.get_interpreter import get_interpreter_from_project, load_interpreters_map
-from utils.config import DEFAULT_VENV, INTERPRETERS_PATH, WARNINGS_AS_FAILURE
+import uuid
+
+from core.limits import detect_limit, make_preexec
+from core.output import OutputCapture, archive_output, output_path
+from core.resources import TreeSampler, merge_usage, usage_from_rusage
+from core.scheduler import get_schedule, should_run
+from handlers.get_interpreter import Resolver, load_interpreters_map
+from utils.config import (
+    INTERPRETERS_PATH,
+    RUSAGE_SAMPLE_INTERVAL,
+    TIMEOUT_GRACE_SECONDS,
+    TIMEOUT_SOFT_GRACE_SECONDS,
+    WARNINGS_AS_FAILURE,
+)
 from utils.lock import release_task_lock, try_acquire_task_lock
 from utils.logger import get_logger
+from utils.metrics import metrics
 from utils.types import (
     CleanupCfg,
     InterpretersMap,
+    LimitsCfg,
     NotificationsCfg,
-    StartHandle,
+    ProcessLike,
+    ResourceUsage,
+    RunHandle,
+    ScheduleMasks,
     Status,
     TaskConfig,
 )
 
 logger: logging.Logger = get_logger("CronBoss")
 
+READER_JOIN_TIMEOUT = 5.0  # secondes max pour vider stdout/stderr après la fin du process
+LEAKED_DRAIN_TIMEOUT = 0.2  # idem si des process orphelins gardent les pipes ouverts (pas d'EOF à attendre)
+READLINE_LIMIT = 1 << 20  # taille max d'une ligne lue (au-delà : découpée)
+
 
 class Task:
     """
@@ -34,6 +58,7 @@ class Task:
         config: TaskConfig,
         source_file: str,
         interpreters: InterpretersMap | None = None,
+        resolver: Resolver | None = None,
     ) -> None:
         """
         Initialise une tâche à partir d'une configuration YAML et de son fichier source.
@@ -41,6 +66,7 @@ class Task:
         :param config: Dictionnaire typé décrivant la tâche (voir utils.types.TaskConfig).
         :param source_file: Fichier YAML d'origine (chemin).
         :param interpreters: Mapping optionnel pour la résolution des interpréteurs Python.
+        :param resolver: Cache de résolution partagé (interpréteur, cwd) ; prioritaire sur `interpreters`.
         """
         # Config issue du YAML
         self.config: TaskConfig = config
@@ -50,8 +76,16 @@ class Task:
         self.args: str = config.get("args", "")
         self.enabled: bool = bool(config.get("enabled", True))
         self.exclusive: bool = bool(config.get("exclusive", True))
+        self.priority: int = int(config.get("priority", 0))  # file d'admission : plus haut = plus tôt
         self.cleanup: CleanupCfg | None = config.get("cleanup")  # TypedDict si présent
-        self.attempts: int = 0
+        self.schedule: ScheduleMasks = get_schedule(config)
+        # Nettoyage : planification propre (cleanup.schedule) ou, à défaut, celle de la tâche
+        self.cleanup_schedule: ScheduleMasks | None = None
+        if self.cleanup and self.cleanup.get("paths") and self.cleanup.get("rule"):
+            self.cleanup_schedule = self.cleanup.get("schedule", self.schedule)
+        # Limites appliquées dans l'enfant avant exec (setrlimit / setpriority / ioprio_set)
+        self.limits: LimitsCfg = config.get("limits", {})
+        self.preexec_fn: Callable[[], None] | None = make_preexec(self.limits, str(self.script))
 
         notif_cfg: NotificationsCfg = config.get("notifications", {})  # parfaitement typé
         self.notifications: NotificationsCfg = {
@@ -59,62 +93,72 @@ class Task:
             "channels": notif_cfg.get("channels", ["discord"]),
         }
 
-        # 📌 Résolution de l'interpréteur Python
-        if self.type == "python":
-            if interpreters is None:  # fallback autonome
+        # 📌 Résolution de l'interpréteur Python et du cwd (cache partagé : aucun accès disque au lancement)
+        if resolver is None:  # fallback autonome
+            if interpreters is None and self.type == "python":
                 interpreters = load_interpreters_map(INTERPRETERS_PATH)
-            self.interpreter: str | None = (
-                config.get("interpreter")
-                or get_interpreter_from_project(str(self.script), source_file, interpreters)
-                or DEFAULT_VENV
-            )
-        else:
-            self.interpreter = None
-
-        # cwd calculé
-        self.cwd: str = self._resolve_cwd()
+            resolver = Resolver(interpreters or {}, persist=False)
+        resolution = resolver.resolve(self.type, str(self.script), source_file, config.get("interpreter"))
+        self.interpreter: str | None = resolution["interpreter"]
+        self.script_path: str = resolution["script"]  # chemin absolu résolu, passé tel quel au runner
+        self.cwd: str = resolution["cwd"]
+        self.interpreter_error: str | None = resolution["error"]  # venv cassé : tâche non lancée
 
         # Retry & timeout
         self.retries: int = int(config.get("retries", 0))
         self.retry_delay: int = int(config.get("retry_delay", 30))
+        self.retry_backoff: str = config.get("retry_backoff", "fixed")
+        self.retry_jitter: float = float(config.get("retry_jitter", 0))
+        self.retry_max_delay: int = int(config.get("retry_max_delay", 0))  # 0 = pas de plafond
+        self.retry_on_exit_codes: list[int] = list(config.get("retry_on_exit_codes", []))  # [] = tout code != 0
         self.timeout: int = int(config.get("timeout", 0))  # 0 = pas de limite
+        self.timeout_auto: bool = bool(config.get("timeout_auto", False))  # fixé au lancement (apply_history)
+        # strict : SIGTERM au groupe puis SIGKILL après timeout_grace, orphelins tués ;
+        # soft : grâce plus longue (TIMEOUT_SOFT_GRACE_SECONDS) avant le SIGKILL, orphelins laissés en place
         self.timeout_mode: str = config.get("timeout_mode", "strict")
+        default_grace = TIMEOUT_GRACE_SECONDS if self.timeout_mode == "strict" else TIMEOUT_SOFT_GRACE_SECONDS
+        self.timeout_grace: int = int(config.get("timeout_grace", default_grace))
 
-        # Runtime state
-        self.proc: subprocess.Popen[str] | None = None
+        self._reset_runtime()
+
+    def _reset_runtime(self) -> None:
+        """
+        (Ré)initialise l'état d'exécution (process, compteurs, sorties).
+        """
+        self.run_id: str = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        self.attempts: int = 0
+        self.queued_at: float | None = None
+        self.due_at: float | None = None  # échéance planifiée (latence de lancement, consommée au 1er start)
+        self.queue_wait: float = 0.0
+        self.retry_at: float | None = None
+        self.timed_out: bool = False
+        self._kill_at: float | None = None  # échéance du SIGKILL après le timeout
+        self.leaked_pids: list[int] = []  # process restés dans le groupe après la fin du process lancé
+        self.limit_hit: str | None = None  # "cpu" | "memory" | "nofile" : exécution arrêtée par une limite
+        self.proc: ProcessLike | None = None
         self.start_time: float | None = None
         self.duration: float | None = None
         self.returncode: int | None = None
         self.stdout: str | None = None
         self.stderr: str | None = None
-        self.stdout_lines: list[str] = []
-        self.stderr_lines: list[str] = []
+        self.stdout_capture: OutputCapture | None = None
+        self.stderr_capture: OutputCapture | None = None
+        self._output_name: str = ""
+        self.resources: ResourceUsage | None = None  # cumul des tentatives
+        self._sampler: TreeSampler | None = None
+        self._readers: list[threading.Thread] = []
         self._task_lock_fh: IO[str] | None = None
 
-    def _resolve_cwd(self) -> str:
+    def new_run(self) -> Task:
         """
-        Détermine le répertoire de travail correct.
+        Retourne une copie de la tâche prête pour une nouvelle exécution.
 
-        - Si Bash : dossier du script
-        - Si Python : cherche un .env en remontant jusqu'à 3 niveaux
+        La config, l'interpréteur et le cwd déjà résolus sont partagés ; seul l'état d'exécution est neuf.
+        Utilisé par le mode daemon, qui garde les tâches en mémoire d'un tick à l'autre.
         """
-        script_dir = self.script.parent.resolve()
-
-        if self.type == "bash":
-            return str(script_dir)
-
-        if self.type == "python":
-            current = script_dir
-            for _ in range(3):  # on check max 3 niveaux
-                env_file = current / ".env"
-                if env_file.exists():
-                    return str(current)
-                current = current.parent
-            # fallback : dossier du script
-            return str(script_dir)
-
-        # fallback pour types inconnus
-        return str(Path.cwd())
+        run = copy.copy(self)
+        run._reset_runtime()
+        return run
 
     def should_run(self, hour: int, minute: int, weekday: int, day: int) -> bool:
         """
@@ -128,6 +172,12 @@ class Task:
         result = should_run(self.config, hour, minute, weekday, day)
         return bool(result)
 
+    def metric_labels(self) -> dict[str, str]:
+        """
+        Étiquettes des métriques de la tâche (utils/metrics.py).
+        """
+        return {"task": str(self.script), "source_file": self.source_file}
+
     def can_start(self) -> bool:
         """
         Vérifie si la tâche peut être lancée.
@@ -149,61 +199,119 @@ class Task:
             self._task_lock_fh = try_acquire_task_lock(str(self.script))
             if self._task_lock_fh is None:
                 logger.info("⛔ Lock déjà pris pour %s — on skip.", self.script)
+                metrics.inc("cronboss_lock_skips", **self.metric_labels())
                 return False
         return True
 
     @staticmethod
-    def _stream_reader(pipe: IO[str], buffer: list[str], name: str, logger: logging.Logger) -> None:
+    def _stream_reader(pipe: IO[str], capture: OutputCapture) -> None:
         """
         Lit un flux en temps réel et stocke les lignes.
 
         :param pipe: Flux à lire (stdout/stderr).
-        :param buffer: Buffer cible où stocker les lignes.
-        :param name: Nom du flux pour le log ("stdout" / "stderr").
-        :param logger: Logger à utiliser.
-        """
-        for line in iter(pipe.readline, ""):  # '' car déjà str
-            decoded = line.strip()
-            buffer.append(decoded)
-            logger.debug("[%s] %s", name, decoded)
+        :param capture: Capture bornée cible (fin en mémoire, sortie complète archivée par exécution).
+        """
+        for line in iter(lambda: pipe.readline(READLINE_LIMIT), ""):  # '' car déjà str
+            capture.append(line.strip())
         pipe.close()
 
-    def start(self, handle: StartHandle) -> None:
+    def open_output(self) -> tuple[OutputCapture, OutputCapture]:
+        """
+        Prépare les captures stdout/stderr de la prochaine tentative (une archive par tentative).
+
+        À appeler avant de lancer le process : la tentative précédente (retry) est archivée avec son état.
+        """
+        self._close_output()
+        self._output_name = f"{self.script.stem}.{self.run_id}.{self.attempts + 1}"
+        self.stdout_capture = OutputCapture(output_path(self._output_name, "stdout"))
+        self.stderr_capture = OutputCapture(output_path(self._output_name, "stderr"))
+        return self.stdout_capture, self.stderr_capture
+
+    def _current_output(self) -> tuple[OutputCapture, OutputCapture]:
+        if self.stdout_capture is None or self.stderr_capture is None or self.stdout_capture.closed:
+            return self.open_output()
+        return self.stdout_capture, self.stderr_capture
+
+    def _close_output(self) -> None:
+        """
+        Ferme les captures de la tentative en cours et archive sa sortie complète (une seule fois).
+        """
+        out, err = self.stdout_capture, self.stderr_capture
+        if out is None or err is None or out.closed:
+            return
+        out.close()
+        err.close()
+        try:
+            archive_output(
+                self._output_name,
+                self.run_id,
+                self.attempts,
+                str(self.script),
+                self.source_file,
+                self.start_time,
+                self.returncode,
+                out,
+                err,
+            )
+        except OSError as exc:
+            logger.warning("⚠️ Archivage de la sortie impossible pour %s : %s", self.script, exc)
+
+    def start(self, handle: RunHandle) -> None:
         """
         Démarre la tâche sans bloquer.
 
-        :param handle: Dictionnaire typé contenant au moins "proc" (Popen[str]).
+        :param handle: Dictionnaire typé contenant au moins "proc" (Popen[str] ou AsyncProcess),
+            et "streams" si les flux sont déjà lus par le moteur (asyncio).
         """
         # Sécurité si start() est appelé sans passer par can_start()
         if self.exclusive and self._task_lock_fh is None:
             self._task_lock_fh = try_acquire_task_lock(str(self.script))
             if self._task_lock_fh is None:
                 logger.info("⛔ Lock indisponible pour %s — démarrage annulé.", self.script)
+                metrics.inc("cronboss_lock_skips", **self.metric_labels())
                 return
         self.proc = handle["proc"]
         self.start_time = time.time()
-        self.attempts += 1  # 🔑 incrément à chaque lancement
+        if self.attempts == 0 and self.queued_at is not None:
+            self.queue_wait = self.start_time - self.queued_at
         self.returncode = None
-        self.stdout_lines = []
-        self.stderr_lines = []
+        self._readers = []
 
         # Sécurise les pipes pour mypy : stdout/stderr ne sont pas Optional ici si créés avec PIPE+text
         assert self.proc is not None
-        if self.proc.stdout is None or self.proc.stderr is None:
+        streams = handle.get("streams")
+        if streams is not None:
+            # Flux lus par la boucle asyncio partagée (core.async_runner) : pas de threads ici
+            self.stdout_capture = streams.stdout_capture
+            self.stderr_capture = streams.stderr_capture
+        elif self.proc.stdout is None or self.proc.stderr is None:
             # Si le créateur de Popen n'a pas passé stdout/stderr=PIPE, on évite un crash.
             logger.warning("[CronHub] Process sans stdout/stderr pipe — pas de stream en temps réel")
         else:
-            # Threads pour vider stdout et stderr en continu
-            threading.Thread(
-                target=self._stream_reader,
-                args=(self.proc.stdout, self.stdout_lines, "stdout", logger),
-                daemon=True,
-            ).start()
-            threading.Thread(
-                target=self._stream_reader,
-                args=(self.proc.stderr, self.stderr_lines, "stderr", logger),
-                daemon=True,
-            ).start()
+            # Threads pour vider stdout et stderr en continu (captures préparées par open_output())
+            stdout_capture, stderr_capture = self._current_output()
+            self._readers = [
+                threading.Thread(
+                    target=self._stream_reader,
+                    args=(self.proc.stdout, stdout_capture),
+                    daemon=True,
+                ),
+                threading.Thread(
+                    target=self._stream_reader,
+                    args=(self.proc.stderr, stderr_capture),
+                    daemon=True,
+                ),
+            ]
+            for reader in self._readers:
+                reader.start()
+        self.attempts += 1  # 🔑 incrément à chaque lancement (après open_output : fichiers de la tentative)
+
+        # Ressources : CPU et I/O exacts via os.wait4 pour un Popen, sinon échantillonnage psutil de l'arbre ;
+        # RSS crête toujours échantillonnée (ru_maxrss inclut la mémoire du superviseur au fork)
+        self._sampler = None
+        if RUSAGE_SAMPLE_INTERVAL > 0:
+            self._sampler = TreeSampler(self.proc.pid, rss_only=isinstance(self.proc, subprocess.Popen))
+            self._sampler.sample(force=True)
 
         if self.attempts > 1:
             logger.info("[CronHub] 🔄 Retry %s/%s pour %s", self.attempts, self.retries, self.script)
@@ -219,24 +327,29 @@ class Task:
         if self.proc is None:
             logger.warning("[CronHub] finish() appelé sans process")
             return
+        drain_timeout = LEAKED_DRAIN_TIMEOUT if self.leaked_pids else READER_JOIN_TIMEOUT
         try:
-            if timeout:
+            if self._readers:
+                # Les pipes appartiennent aux threads lecteurs : on attend seulement le process
+                if not timeout:
+                    self._reap(block=True)
+                self.proc.wait(timeout=timeout or None)
+            elif self.leaked_pids and not timeout:
+                # Flux lus par le moteur (asyncio) : vidage borné, les orphelins ne fermeront pas les pipes
+                try:
+                    self.proc.wait(timeout=drain_timeout)
+                except subprocess.TimeoutExpired:
+                    pass
+            elif timeout:
                 self.stdout, self.stderr = self.proc.communicate(timeout=timeout)
             else:
                 self.stdout, self.stderr = self.proc.communicate()
         except subprocess.TimeoutExpired:
-            import os
-            import signal
-
-            # On tue le groupe puis le proc
-            try:
-                os.killpg(os.getpgid(self.proc.pid), signal.SIGTERM)
-            except Exception:  # pragma: no cover - garde de sécurité
-                logger.debug("[CronHub] killpg non disponible/nécessaire")
-
-            self.proc.kill()
+            # On tue le groupe (process lancé + descendants)
+            self._signal_group(signal.SIGKILL)
             self.stderr = f"⏱️ Timeout dépassé ({timeout}s)"
             self.returncode = -1
+            self._close_output()
             self.duration = time.time() - (self.start_time or time.time())
             # 🔑 Ajout du log explicite
             logger.info("[CronHub] 🚨 Timeout : %s interrompu après %ss", self.script, timeout)
@@ -244,11 +357,24 @@ class Task:
 
         self.duration = time.time() - (self.start_time or time.time())
         self.returncode = self.proc.returncode
-        # 🔑 Concatène les lignes récupérées
-        self.stdout = "\n".join(self.stdout_lines[-20:])
-        self.stderr = "\n".join(self.stderr_lines[-20:])
-
-        if self.returncode != 0:
+        self._collect_samples()
+        # Fin détectée dès la sortie du process : on laisse les lecteurs vider les pipes
+        # (borné, un petit-enfant peut garder le pipe ouvert)
+        join_deadline = time.monotonic() + drain_timeout
+        for reader in self._readers:
+            reader.join(timeout=max(0.0, join_deadline - time.monotonic()))
+        self._close_output()
+        # 🔑 Fin des flux gardée en mémoire (OUTPUT_TAIL_LINES / OUTPUT_TAIL_KB)
+        self.stdout = self.stdout_capture.text() if self.stdout_capture else ""
+        self.stderr = self.stderr_capture.text() if self.stderr_capture else ""
+        if self.timed_out:
+            self.stderr = f"⏱️ Timeout dépassé ({self.timeout}s)\n{self.stderr}".rstrip()
+        cpu_used = self.resources["cpu_user"] + self.resources["cpu_sys"] if self.resources else 0.0
+        self.limit_hit = detect_limit(self.limits, self.returncode, self.stderr, cpu_used)
+        if self.limit_hit:
+            logger.warning("[CronHub] 🧱 %s arrêté par sa limite %s", self.script, self.limit_hit)
+
+        if self.returncode != 0 or self.timed_out:
             logger.error("[CronHub] ❌ Erreur sur %s: %s", self.script, self.stderr)
         else:
             logger.info("[CronHub] ✅ Succès %s", self.script)
@@ -260,53 +386,176 @@ class Task:
         """
         Vérifie l'état sans bloquer, gère timeout & retry sans appeler communicate().
 
+        Au timeout, le groupe de process reçoit SIGTERM, puis SIGKILL après timeout_grace s'il est toujours
+        actif, quel que soit le mode : une tâche qui ignore SIGTERM finit toujours (le Supervisor rappelle
+        check_status à chaque échéance, voir next_deadline()).
+
         Retour:
         - "success": terminé avec code 0
         - "failure": terminé avec code != 0 ou timeout
-        - "retry": terminé avec code != 0 ET retry encore possible
+        - "retry": terminé avec code != 0 ET retry encore possible (retry_at renseigné)
         - None: toujours en cours
         """
         if self.proc is None:
             return None
 
         now = time.time()
-
-        # Timeout strict (sans communicate)
-        if self.timeout > 0 and (now - (self.start_time or now)) > self.timeout:
-            try:
-                self.proc.kill()
-            except Exception:  # pragma: no cover - garde
-                pass
-            self.returncode = -1
-            self.stderr = f"⏱️ Timeout dépassé ({self.timeout}s)"
-            self.duration = now - (self.start_time or now)
-            return "failure"
-
-        rc = self.proc.poll()
+        rc = self._reap()
         if rc is None:
+            if self.timeout > 0 and (now - (self.start_time or now)) > self.timeout:
+                self._escalate_timeout(now)
             return None
+        self._collect_samples()
 
         # Terminé (ne pas lire stdout/stderr ici)
         self.returncode = rc
         self.duration = now - (self.start_time or now)
 
+        self.leaked_pids = self._group_leftovers()
+        if self.leaked_pids:
+            if self.timed_out and (self.timeout_mode == "strict" or self._kill_at is None):  # soft : après SIGKILL
+                logger.warning("🧟 %s : %s process restants tués (timeout)", self.script, len(self.leaked_pids))
+                self._signal_group(signal.SIGKILL)
+            else:
+                logger.warning("🧟 %s : process orphelins toujours actifs %s", self.script, self.leaked_pids)
+
+        if self.timed_out:
+            return "failure"
         if rc == 0:
             return "success"
 
-        # Échec → retry possible ?
-        if self.attempts <= self.retries:
-            time.sleep(self.retry_delay)
+        # Échec → retry possible ? (l'attente est gérée par le Supervisor, pas de sleep ici)
+        if self.attempts <= self.retries and (not self.retry_on_exit_codes or rc in self.retry_on_exit_codes):
+            self.retry_at = now + self.next_retry_delay()
             return "retry"
 
         return "failure"
 
+    def next_deadline(self) -> float | None:
+        """
+        Prochain instant où check_status() doit être rappelé même sans fin de process (timeout, SIGKILL).
+        """
+        if self.start_time is None or self.timeout <= 0:
+            return None
+        if not self.timed_out:
+            return self.start_time + self.timeout
+        return self._kill_at
+
+    def _escalate_timeout(self, now: float) -> None:
+        if not self.timed_out:
+            self.timed_out = True
+            self._kill_at = now + self.timeout_grace
+            logger.warning(
+                "[CronHub] ⏱️ Timeout (%ss) : SIGTERM au groupe de %s (mode %s)",
+                self.timeout,
+                self.script,
+                self.timeout_mode,
+            )
+            self._signal_group(signal.SIGTERM)
+        elif self._kill_at is not None and now >= self._kill_at:
+            self._kill_at = None
+            logger.warning(
+                "[CronHub] 🚨 %s actif après %ss de grâce : SIGKILL (mode %s)",
+                self.script,
+                self.timeout_grace,
+                self.timeout_mode,
+            )
+            self._signal_group(signal.SIGKILL)
+
+    def _signal_group(self, sig: int) -> None:
+        """
+        Envoie un signal à tout le groupe de process de la tâche (lancée avec start_new_session : pgid = pid).
+        """
+        assert self.proc is not None
+        try:
+            os.killpg(self.proc.pid, sig)
+        except ProcessLookupError:
+            # Pas de groupe (process lancé hors session dédiée) : au moins le process lui-même
+            if self.proc.returncode is None:
+                try:
+                    os.kill(self.proc.pid, sig)
+                except ProcessLookupError:
+                    pass
+        except PermissionError:
+            logger.warning("⚠️ Signal %s refusé pour le groupe de %s", sig, self.script)
+
+    def _group_leftovers(self) -> list[int]:
+        """
+        PIDs encore présents dans le groupe de process après la fin du process lancé (enfants orphelins).
+        """
+        assert self.proc is not None
+        pgid = self.proc.pid
+        try:
+            os.killpg(pgid, 0)
+        except (ProcessLookupError, PermissionError):
+            return []  # cas normal : groupe vide
+        import psutil
+
+        leftovers: list[int] = []
+        for pid in psutil.pids():
+            try:
+                if os.getpgid(pid) == pgid:
+                    leftovers.append(pid)
+            except ProcessLookupError:
+                continue
+        return leftovers
+
+    def _reap(self, block: bool = False) -> int | None:
+        """
+        Code de retour du process (None s'il tourne encore).
+
+        Un Popen est réapé via os.wait4 pour récupérer sa rusage (CPU, I/O bloc), qui inclut
+        les descendants qu'il a lui-même attendus ; Popen.returncode est alors renseigné à la main.
+        """
+        assert self.proc is not None
+        if self.proc.returncode is not None or not isinstance(self.proc, subprocess.Popen):
+            return self.proc.poll()
+        try:
+            pid, status, rusage = os.wait4(self.proc.pid, 0 if block else os.WNOHANG)
+        except ChildProcessError:  # déjà réapé (ex: Popen.wait) : pas de rusage
+            return self.proc.poll()
+        if pid == 0:
+            return None
+        self.proc.returncode = os.waitstatus_to_exitcode(status)
+        self.resources = merge_usage(self.resources, usage_from_rusage(rusage))
+        return self.proc.returncode
+
+    def sample_resources(self) -> None:
+        """
+        Échantillonne les ressources de la tentative en cours (au plus 1x/RUSAGE_SAMPLE_INTERVAL).
+        """
+        if self._sampler is not None:
+            self._sampler.sample()
+
+    def _collect_samples(self) -> None:
+        if self._sampler is not None:
+            self.resources = merge_usage(self.resources, self._sampler.usage())
+            self._sampler = None
+
+    def next_retry_delay(self) -> float:
+        """
+        Délai avant le prochain retry (après `attempts` exécutions).
+
+        - fixed : retry_delay
+        - exponential : retry_delay * 2^(attempts-1)
+        puis plafond retry_max_delay (si > 0) et ajout d'un jitter aléatoire dans [0, retry_jitter].
+        """
+        delay = float(self.retry_delay)
+        if self.retry_backoff == "exponential":
+            delay *= 2 ** max(0, self.attempts - 1)
+        if self.retry_max_delay > 0:
+            delay = min(delay, float(self.retry_max_delay))
+        if self.retry_jitter > 0:
+            delay += random.uniform(0, self.retry_jitter)
+        return delay
+
     def get_status(self) -> Status:
         """
         Retourne le statut de la tâche : "success", "failure", "success_with_warnings" ou "Non".
         """
         if self.returncode is None:
             return "Non"
-        if self.returncode != 0:
+        if self.returncode != 0 or self.timed_out:
             return "failure"
 
         if self.stderr and ("warning" in self.stderr.lower() or "error" in self.stderr.lower()):
@@ -320,7 +569,7 @@ class Task:
         """
         Retourne True si le job est OK.
         """
-        return self.returncode == 0
+        return self.returncode == 0 and not self.timed_out
 
     def __repr__(self) -> str:
         """
@@ -2,48 +2,70 @@
 from __future__ import annotations
 
 from pathlib import Path
-
-import yaml
+from typing import Any
 
 from utils.logger import get_logger
 from utils.normalizer import normalize_task_dict
 from utils.types import TaskWithSource
+from utils.yaml_cache import load_compiled
 
 logger = get_logger("CronBoss")
 
 
+def _compile_tasks(loaded: Any, file: Path) -> list[TaskWithSource] | None:
+    """
+    Normalise le contenu d'un YAML de tâches (None si le fichier est invalide).
+    """
+    if loaded is None:
+        return []
+
+    if not isinstance(loaded, list):
+        logger.warning("⚠️ %s : contenu YAML non liste, ignoré (type: %s)", file.name, type(loaded).__name__)
+        return None
+
+    tasks: list[TaskWithSource] = []
+    for raw in loaded:
+        task = normalize_task_dict(raw, file.stem)
+        if task is None:
+            # message déjà loggé dans normalizer
+            continue
+        tasks.append(task)
+    return tasks
+
+
+def load_task_file(file: Path) -> list[TaskWithSource] | None:
+    """
+    Charge les tâches d'un fichier YAML, via le cache compilé (TASKS_CACHE_DIR) s'il est à jour.
+
+    Les entrées invalides ne sont signalées qu'au parsing (pas à chaque lecture du cache).
+
+    :param file: Fichier YAML de tâches.
+    :return: Tâches normalisées, ou None si le fichier est illisible/invalide.
+    """
+    try:
+        return load_compiled(file, _compile_tasks, depends=("utils.normalizer",))
+    except OSError as exc:
+        logger.error("❌ Erreur d'ouverture du fichier %s : %s", file, exc)
+        return None
+
+
+def task_files(task_dir: str | Path) -> list[Path]:
+    """
+    Fichiers YAML de tâches d'un répertoire, dans l'ordre de chargement.
+    """
+    return sorted(Path(task_dir).glob("*.yaml"))
+
+
 def load_tasks_from_directory(task_dir: str | Path) -> list[TaskWithSource]:
     """
     Charge tous les fichiers YAML d'un répertoire, normalise chaque entrée et retourne une liste de tâches prêtes à
     l'emploi (TaskWithSource).
     """
     tasks_out: list[TaskWithSource] = []
-    task_dir_path = Path(task_dir)
-
-    for file in sorted(task_dir_path.glob("*.yaml")):
-        file_id = file.stem
-        try:
-            with file.open("r", encoding="utf-8") as handle:
-                loaded = yaml.safe_load(handle)
-        except yaml.YAMLError as exc:
-            logger.error("❌ Erreur YAML dans %s : %s", file.name, exc)
-            continue
-        except OSError as exc:
-            logger.error("❌ Erreur d'ouverture du fichier %s : %s", file, exc)
-            continue
-
-        if loaded is None:
-            continue
-
-        if not isinstance(loaded, list):
-            logger.warning("⚠️ %s : contenu YAML non liste, ignoré (type: %s)", file.name, type(loaded).__name__)
-            continue
 
-        for raw in loaded:
-            task = normalize_task_dict(raw, file_id)
-            if task is None:
-                # message déjà loggé dans normalizer
-                continue
-            tasks_out.append(task)
+    for file in task_files(task_dir):
+        tasks = load_task_file(file)
+        if tasks:
+            tasks_out.extend(tasks)
 
     return tasks_out
@@ -1,19 +1,29 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+from collections.abc import Sequence
 import datetime as dt
+import json
+from pathlib import Path
+import re
+import sys
 import time
 
-from core.runner import run_bash_script, run_python_script
+from core.durations import apply_history
+from core.output import STREAMS, iter_output, read_index
+from core.scheduler import ScheduleIndex, schedule_matches
+from core.supervisor import Supervisor, report_summary
 from core.task import Task
 from core.task_loader import load_tasks_from_directory
-from handlers.cleanup_logs import cleanup_multiple
-from handlers.get_interpreter import load_interpreters_map
+from handlers.cleanup_logs import CleanupPool
+from handlers.get_interpreter import Resolver, load_interpreters_map
 from notifiers.manager import NotifierManager
-from utils.audit import append_run_record
-from utils.config import AUDIT_JSON, TASKS_DIR
+from utils.audit import audit_files, close_audit_writers
+from utils.config import AUDIT_AGGREGATE_DAYS, AUDIT_BACKEND, AUDIT_DB, AUDIT_JSON, TASKS_DIR
 from utils.logger import get_logger
-from utils.types import SummaryPayload, TaskWithSource
+from utils.metrics import metrics
+from utils.types import OutputIndexEntry, TaskWithSource
 
 logger = get_logger("CronBoss")
 notifier_manager = NotifierManager()
@@ -28,15 +38,17 @@ def format_duration(seconds: float) -> str:
     return f"{minutes} min {secs} sec"
 
 
-def main() -> None:
+def run_once() -> None:
     """
-    Boucle principale :
+    Un tick (mode crontab) :
     - charge les tâches YAML
     - résout les interpréteurs
     - planifie/lanche selon l'heure courante
     - suit l'exécution, gère retries/timeout
+    - nettoie en arrière-plan les dossiers dont le cleanup est dû
     - envoie les notifications et un résumé final
     """
+    started = time.perf_counter()
     now = dt.datetime.now()
     hour = now.hour
     minute = now.minute
@@ -47,140 +59,221 @@ def main() -> None:
 
     # Chargement & préparation
     raw_tasks: list[TaskWithSource] = load_tasks_from_directory(TASKS_DIR)
-    interpreters = load_interpreters_map()
-    tasks: list[Task] = [Task(cfg, cfg.get("source_file", "unknown"), interpreters) for cfg in raw_tasks]
-
-    running_tasks: list[Task] = []
-    for task in tasks:
-        # Planif
-        if task.enabled and task.should_run(hour, minute, weekday, day) and task.can_start():
-            try:
-                if task.type == "python":
-                    logger.info("🐍 Lancement de %s avec l'interpréteur %s", task.script, task.interpreter)
-                    handle = run_python_script(str(task.script), task.cwd, task.args, task.interpreter)
-                elif task.type == "bash":
-                    handle = run_bash_script(str(task.script), task.cwd, task.args)
-                else:
-                    logger.warning("❓ Type inconnu : %s pour %s", task.type, task.script)
-                    continue
-
-                task.start(handle)
-                if task.proc is not None:
-                    running_tasks.append(task)
-                else:
-                    logger.info("⏭️ %s non démarrée (lock indisponible).", task.script)
-
-            except Exception as exc:  # pylint: disable=broad-except
-                logger.error("🚨 Impossible de lancer %s : %s", task.script, exc)
-                notifier_manager.notify(task, "failure", error=str(exc))
-                # libère le lock acquis par can_start()
-                if getattr(task, "_task_lock_fh", None) is not None:
-                    from utils.lock import release_task_lock
-
-                    release_task_lock(task._task_lock_fh)
-                    task._task_lock_fh = None
-
-        # Cleanup éventuel (indépendant du lancement)
-        if task.cleanup:
-            paths = task.cleanup.get("paths")
-            rule = task.cleanup.get("rule")
-            if paths and rule:
-                cleanup_multiple(paths, rule)
+    resolver = Resolver(load_interpreters_map())
+    tasks: list[Task] = [Task(cfg, cfg.get("source_file", "unknown"), resolver=resolver) for cfg in raw_tasks]
+    resolver.save()
+
+    index = ScheduleIndex([task.schedule for task in tasks])
+
+    supervisor = Supervisor(notifier_manager)
+    # Planif (index déjà filtré sur l'horaire) ; ordre et timeouts auto selon l'historique des durées
+    due_at = now.replace(second=0, microsecond=0).timestamp()
+    for task_id in apply_history(index.due(weekday, day, hour, minute), tasks):
+        supervisor.launch(tasks[task_id], due_at)
+    metrics.observe("cronboss_tick_duration_seconds", time.perf_counter() - started)
+
+    # Cleanups dus à ce tick : en arrière-plan, pendant le suivi des tâches
+    cleanup_pool = CleanupPool()
+    cleanup_pool.submit(
+        task.cleanup
+        for task in tasks
+        if task.cleanup
+        and task.cleanup_schedule is not None
+        and schedule_matches(task.cleanup_schedule, hour, minute, weekday, day)
+    )
 
     # Suivi des tâches en cours
-    while running_tasks:
-        still_running: list[Task] = []
-
-        for task in running_tasks:
-            status = task.check_status()  # None | "success" | "failure" | "retry"
-
-            if status is None:
-                # Toujours en cours
-                still_running.append(task)
-                continue
-
-            if status == "retry":
-                logger.warning("🔄 Retry %s/%s pour %s", task.attempts, task.retries, task.script)
-                try:
-                    handle = (
-                        run_python_script(str(task.script), task.cwd, task.args, task.interpreter)
-                        if task.type == "python"
-                        else run_bash_script(str(task.script), task.cwd, task.args)
-                    )
-                    task.start(handle)
-                    if task.proc is not None:  # lock par tâche : peut refuser
-                        still_running.append(task)
-                    else:
-                        logger.info("⏭️ Retry annulé (lock indisponible) pour %s", task.script)
-                except Exception as exc:  # pylint: disable=broad-except
-                    logger.error("🚨 Échec retry %s : %s", task.script, exc)
-                    notifier_manager.notify(task, "failure", stderr=str(exc))
-                continue
-
-            # Ici: "success" ou "failure" -> on collecte proprement
-            task.finish()
-
-            final = task.get_status()
-
-            if task.is_success():
-                logger.info("🌞 %s OK en %.2fs", task.script, task.duration or 0.0)
-            else:
-                logger.error("🚨 %s KO (code %s)", task.script, task.returncode)
-
-            append_run_record(
-                AUDIT_JSON,
-                {
-                    "script": str(task.script),
-                    "status": final,
-                    "duration": float(task.duration or 0.0),
-                    "returncode": task.returncode,
-                    "source_file": task.source_file,
-                    "stdout_tail": (task.stdout or "")[-400:] or None,
-                    "stderr_tail": (task.stderr or "")[-400:] or None,
-                },
-            )
-
-            notifier_manager.notify(
-                task,
-                final,
-                stdout=task.stdout,
-                stderr=task.stderr,
-                duration=task.duration or 0.0,
-                returncode=task.returncode,
-            )
-
-        running_tasks = still_running
-        time.sleep(2)
+    supervisor.wait_all()
+    close_audit_writers()
+    cleanup_pool.shutdown()
 
     # === Résumé global des tâches ===
     if tasks:
-        summary_counts: dict[str, int] = {"success": 0, "success_with_warnings": 0, "failure": 0}
-        total_duration: float = 0.0
-
-        for task in tasks:
-            st = task.get_status()
-            if st in summary_counts:
-                summary_counts[st] += 1
-            if task.duration is not None:
-                total_duration += task.duration
-
-        logger.info(
-            "📊 RÉSUMÉ : ✅ %s succès | ⚠️ %s avec warnings | ❌ %s échecs | ⏱️ Durée totale : %.2fs",
-            summary_counts["success"],
-            summary_counts["success_with_warnings"],
-            summary_counts["failure"],
-            total_duration,
+        report_summary(tasks, notifier_manager)
+    metrics.write_textfile()
+
+    logger.info("🏁 CRONBOSS : TERMINE ✅\n")
+
+
+def parse_since(value: str) -> float:
+    """
+    Convertit "30m", "2h", "3d" (relatif) ou une date ISO ("2025-01-31", "2025-01-31 08:00") en timestamp.
+    """
+    match = re.fullmatch(r"(\d+)([smhd])", value.strip())
+    if match:
+        seconds = int(match.group(1)) * {"s": 1, "m": 60, "h": 3600, "d": 86400}[match.group(2)]
+        return time.time() - seconds
+    try:
+        return dt.datetime.fromisoformat(value).timestamp()
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(f"--since invalide : {value!r}") from exc
+
+
+def show_logs(task: str, run: str, since: float | None, stream: str) -> int:
+    """
+    `cronboss logs` : affiche la sortie archivée des exécutions d'une tâche.
+
+    :param task: Script (chemin, nom ou nom sans extension).
+    :param run: N-ième exécution la plus récente (1 = dernière) ou run_id.
+    :param since: Timestamp : toutes les exécutions depuis cette date (ignore `run`).
+    :param stream: "stdout", "stderr" ou "all".
+    :return: Code de sortie du CLI.
+    """
+    entries = [
+        entry
+        for entry in read_index()
+        if task in {entry["script"], Path(entry["script"]).name, Path(entry["script"]).stem}
+    ]
+    run_ids = list(dict.fromkeys(entry["run_id"] for entry in reversed(entries)))  # plus récent d'abord
+    if since is not None:
+        selected = [entry for entry in entries if entry["ts"] >= since]
+    else:
+        if run.isdigit():
+            wanted = run_ids[int(run) - 1] if 0 < int(run) <= len(run_ids) else None
+        else:
+            wanted = next((run_id for run_id in run_ids if run_id.startswith(run)), None)
+        selected = [entry for entry in entries if entry["run_id"] == wanted]
+    if not selected:
+        print(f"Aucune exécution archivée pour {task!r}", file=sys.stderr)
+        return 1
+
+    streams = STREAMS if stream == "all" else (stream,)
+    for entry in selected:
+        _print_run(entry, streams)
+    return 0
+
+
+def _print_run(entry: OutputIndexEntry, streams: Sequence[str]) -> None:
+    started = dt.datetime.fromtimestamp(entry["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+    print(
+        f"=== {entry['script']} | run {entry['run_id']} | tentative {entry['attempt']}"
+        f" | {started} | code {entry['returncode']} ==="
+    )
+    for name in streams:
+        span = entry["stdout"] if name == "stdout" else entry["stderr"]
+        print(f"--- {name} ({span['lines']} lignes{', tronqué' if span['truncated'] else ''}) ---")
+        for line in iter_output(entry, name):
+            print(line)
+
+
+def show_stats(days: int, task: str | None, source_file: str | None, as_json: bool) -> int:
+    """
+    `cronboss stats` : par tâche, nombre d'exécutions, taux d'échec, durées p50/p95/max et dernière exécution.
+
+    Lit les agrégats journaliers de l'historique SQLite (AUDIT_DB) ; à défaut, avec AUDIT_BACKEND=jsonl, les
+    agrégats incrémentaux du journal JSONL (AuditAggregator, AUDIT_AGGREGATE_DAYS jours au plus).
+
+    :param days: Fenêtre en jours (aujourd'hui inclus).
+    :param task: Filtre sur le script (chemin, nom ou nom sans extension).
+    :param source_file: Filtre sur le YAML source.
+    :param as_json: Sortie JSON (une liste d'objets).
+    :return: Code de sortie du CLI.
+    """
+    if Path(AUDIT_DB).exists():
+        from utils.history import HistoryStore
+
+        store = HistoryStore(AUDIT_DB)
+        try:
+            rows = store.stats(days, task, source_file)
+        finally:
+            store.close()
+    elif AUDIT_BACKEND == "jsonl":
+        from utils.audit_aggregator import AuditAggregator
+
+        if days > AUDIT_AGGREGATE_DAYS:
+            print(f"Agrégats JSONL limités à {AUDIT_AGGREGATE_DAYS} jour(s) (AUDIT_AGGREGATE_DAYS)", file=sys.stderr)
+        aggregator = AuditAggregator()
+        aggregator.update()
+        rows = aggregator.stats(days, task, source_file)
+    else:
+        print(
+            f"Historique SQLite absent ({AUDIT_DB}) : AUDIT_BACKEND=sqlite|both, ou `cronboss import-history`",
+            file=sys.stderr,
         )
+        return 1
+    if as_json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+    if not rows:
+        print(f"Aucune exécution sur {days} jour(s)", file=sys.stderr)
+        return 1
 
-        summary_payload: SummaryPayload = {
-            "success": summary_counts["success"],
-            "success_with_warnings": summary_counts["success_with_warnings"],
-            "failure": summary_counts["failure"],
-            "total_duration": total_duration,
-        }
-        notifier_manager.notify_summary(summary_payload)
+    print(f"{'TÂCHE':<40} {'RUNS':>6} {'ÉCHECS':>7} {'P50':>9} {'P95':>9} {'MAX':>9}  DERNIÈRE")
+    for row in sorted(rows, key=lambda r: r["script"]):
+        last = dt.datetime.fromtimestamp(row["last_ts"]).strftime("%Y-%m-%d %H:%M")
+        print(
+            f"{Path(row['script']).name:<40.40} {row['runs']:>6} {row['failure_rate']:>7.1%}"
+            f" {row['p50']:>8.2f}s {row['p95']:>8.2f}s {row['max']:>8.2f}s  {last} ({row['last_status']})"
+        )
+    return 0
 
-    logger.info("🏁 CRONBOSS : TERMINE ✅\n")
+
+def import_history(files: Sequence[str]) -> int:
+    """
+    `cronboss import-history` : importe les journaux JSONL (segments .gz compris) dans l'historique SQLite.
+
+    :param files: Fichiers à importer (défaut : AUDIT_JSON et ses segments).
+    :return: Code de sortie du CLI.
+    """
+    from utils.history import HistoryStore
+
+    paths = [Path(f) for f in files] if files else audit_files(AUDIT_JSON)
+    missing = [p for p in paths if not p.is_file()]
+    if missing or not paths:
+        print(f"Fichier(s) introuvable(s) : {', '.join(map(str, missing)) or AUDIT_JSON}", file=sys.stderr)
+        return 1
+    store = HistoryStore(AUDIT_DB)
+    started = time.perf_counter()
+    try:
+        read, inserted = store.import_jsonl(paths)
+    finally:
+        store.close()
+    print(
+        f"{inserted} exécution(s) importée(s) sur {read} lue(s) ({read - inserted} déjà présente(s))"
+        f" depuis {len(paths)} fichier(s) en {time.perf_counter() - started:.1f}s → {AUDIT_DB}"
+    )
+    return 0
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """
+    Point d'entrée CLI.
+
+    - sans option : un tick puis sortie (crontab)
+    - --daemon : process résident (systemd), réveil à chaque minute due
+    - logs <tâche> : sortie archivée d'une exécution
+    - stats : statistiques par tâche (historique SQLite)
+    - import-history : import des journaux JSONL dans l'historique SQLite
+    """
+    parser = argparse.ArgumentParser(prog="cronboss", description="Planificateur de scripts Python/Bash.")
+    parser.add_argument("--daemon", action="store_true", help="mode service : reste actif et planifie en continu")
+    commands = parser.add_subparsers(dest="command")
+    logs = commands.add_parser("logs", help="affiche la sortie archivée d'une tâche")
+    logs.add_argument("task", help="script de la tâche (chemin, nom ou nom sans extension)")
+    logs.add_argument("--run", default="1", help="N-ième exécution la plus récente (1 = dernière) ou run_id")
+    logs.add_argument("--since", type=parse_since, help="toutes les exécutions depuis (ex: 2h, 3d, 2025-01-31)")
+    logs.add_argument("--stream", choices=["stdout", "stderr", "all"], default="all")
+    stats = commands.add_parser("stats", help="statistiques par tâche (historique SQLite ou agrégats JSONL)")
+    stats.add_argument("--days", type=int, default=30, help="fenêtre en jours (défaut : 30)")
+    stats.add_argument("--task", help="script de la tâche (chemin, nom ou nom sans extension)")
+    stats.add_argument("--source-file", help="fichier YAML source")
+    stats.add_argument("--json", action="store_true", help="sortie JSON")
+    history = commands.add_parser("import-history", help="importe les journaux JSONL dans l'historique SQLite")
+    history.add_argument("files", nargs="*", help="fichiers JSONL (.gz acceptés ; défaut : AUDIT_JSON + segments)")
+    args = parser.parse_args(argv)
+
+    if args.command == "logs":
+        sys.exit(show_logs(args.task, args.run, args.since, args.stream))
+    if args.command == "stats":
+        sys.exit(show_stats(args.days, args.task, args.source_file, args.json))
+    if args.command == "import-history":
+        sys.exit(import_history(args.files))
+    if args.daemon:
+        from core.daemon import Daemon
+
+        Daemon(TASKS_DIR, notifier_manager).run()
+    else:
+        run_once()
 
 
 if __name__ == "__main__":
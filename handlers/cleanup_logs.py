@@ -1,27 +1,438 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+import contextlib
+import functools
+import heapq
+import importlib.util
+import json
+import os
 from pathlib import Path
+import threading
 import time
+import zlib
 
+from utils.config import CLEANUP_COMPRESS_WORKERS, CLEANUP_IONICE_CLASS, CLEANUP_STATE_DIR, CLEANUP_WORKERS
 from utils.logger import get_logger
-from utils.types import CleanupRule
+from utils.types import CleanupCfg, CleanupRule
 
 logger = get_logger("CronBoss")
 
+CleanupKey = tuple[str, str]  # (dossier absolu, règle sérialisée)
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+THROTTLE_MIN_SLEEP = 0.05  # en dessous, on enchaîne les suppressions (lots) plutôt que de dormir
+
+
+def _normalize_extensions(extensions: Sequence[str] | str) -> frozenset[str] | None:
+    """
+    Extensions normalisées (avec le "."), ou None pour "all" (tous fichiers).
+    """
+    if extensions == "all" or (not isinstance(extensions, str) and "all" in extensions):
+        return None
+    if isinstance(extensions, str):
+        extensions = [extensions]
+    return frozenset(ext if ext.startswith(".") else f".{ext}" for ext in extensions if ext)
+
+
+def _has_extension(name: str, extensions: frozenset[str]) -> bool:
+    # Équivaut à any(name.endswith(ext)) : chaque suffixe commençant par un "." est cherché dans le set
+    i = name.find(".")
+    while i != -1:
+        if name[i:] in extensions:
+            return True
+        i = name.find(".", i + 1)
+    return False
+
+
+def iter_files(
+    base: str | Path,
+    recursive: bool = False,
+    extensions: frozenset[str] | None = None,
+    pending: list[str] | None = None,
+) -> Iterator[os.DirEntry[str]]:
+    """
+    Parcourt un dossier en flux (os.scandir) : fichiers réguliers filtrés par extension, sans liste intermédiaire.
+
+    Les liens symboliques vers des dossiers ne sont pas suivis ; un sous-dossier illisible est signalé et ignoré.
+
+    :param base: Dossier racine.
+    :param recursive: Descendre dans les sous-dossiers.
+    :param extensions: Extensions retenues (None = tous fichiers).
+    :param pending: Pile des dossiers restant à parcourir, modifiée en place (défaut : [base]). Un dossier n'en
+        sort qu'une fois entièrement parcouru : si l'itération est interrompue, la pile permet de la reprendre.
+    """
+    stack = pending if pending is not None else [os.fspath(base)]
+    while stack:
+        directory = stack[-1]
+        subdirs: list[str] = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                subdirs.append(entry.path)
+                            continue
+                        if not entry.is_file():
+                            continue
+                    except OSError:
+                        continue  # supprimé entre-temps
+                    if extensions is None or _has_extension(entry.name, extensions):
+                        yield entry
+        except OSError as exc:
+            logger.warning("⚠️ Dossier illisible ignoré : %s (%s)", directory, exc)
+        stack.pop()
+        stack.extend(subdirs)
+
+
+def _mtime(entry: os.DirEntry[str]) -> float | None:
+    # stat() d'un DirEntry est mis en cache : un seul appel système par fichier
+    try:
+        return entry.stat().st_mtime
+    except OSError:
+        return None
+
+
+class _Pass:
+    """
+    Passe de nettoyage d'un dossier : dry-run, débit des suppressions et budget de temps.
+    """
+
+    def __init__(self, rule: CleanupRule) -> None:
+        self.dry_run = bool(rule.get("dry_run", False))
+        self.files_rate = rule.get("max_files_per_second")
+        self.bytes_rate = rule.get("max_bytes_per_second")
+        self.budget = rule.get("time_budget_seconds")
+        self.deadline = time.monotonic() + self.budget if self.budget else None
+        self._throttle_start: float | None = None
+        self._files = 0
+        self._bytes = 0
+
+    def expired(self) -> bool:
+        """
+        Budget de temps (time_budget_seconds) épuisé.
+        """
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def delete(self, path: str, size: int) -> bool:
+        """
+        Supprime un fichier (ou le logge en dry-run), au débit max_files_per_second / max_bytes_per_second.
+
+        :return: True si le fichier est (ou serait) supprimé.
+        """
+        if self.dry_run:
+            logger.info("🧪 [Dry run] Suppression prévue : %s", path)
+            return True
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            return False
+        except OSError as exc:
+            logger.warning("❌ Erreur suppression %s : %s", path, exc)
+            return False
+        logger.debug("🧹 Suppression : %s", path)
+        if self.files_rate or self.bytes_rate:
+            self._throttle(size)
+        return True
+
+    def _throttle(self, size: int) -> None:
+        # Débit moyen depuis la 1re suppression ; on ne dort qu'au-delà de THROTTLE_MIN_SLEEP (suppressions par lots)
+        now = time.monotonic()
+        if self._throttle_start is None:
+            self._throttle_start = now
+        self._files += 1
+        self._bytes += size
+        required = max(
+            self._files / self.files_rate if self.files_rate else 0.0,
+            self._bytes / self.bytes_rate if self.bytes_rate else 0.0,
+        )
+        delay = self._throttle_start + required - now
+        if self.deadline is not None:
+            delay = min(delay, self.deadline - now)
+        if delay >= THROTTLE_MIN_SLEEP:
+            time.sleep(delay)
+
+
+def _checkpoint_path(base_path: Path, rule: CleanupRule) -> Path:
+    key = f"{os.path.abspath(base_path)}\0{json.dumps(rule, sort_keys=True)}"
+    return Path(CLEANUP_STATE_DIR) / f"{base_path.name or 'root'}.{zlib.crc32(key.encode('utf-8')):08x}.json"
+
+
+def _load_checkpoint(base_path: Path, rule: CleanupRule) -> list[str] | None:
+    """
+    Dossiers restant à parcourir après une passe interrompue (None = reprise depuis la racine).
+    """
+    try:
+        with _checkpoint_path(base_path, rule).open(encoding="utf-8") as fh:
+            data = json.load(fh)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as exc:
+        logger.warning("⚠️ Point de reprise illisible pour %s : %s", base_path, exc)
+        return None
+    root = os.path.abspath(base_path)
+    pending = [d for d in data.get("pending", []) if isinstance(d, str) and (d == root or d.startswith(root + os.sep))]
+    return pending or None
+
+
+def _save_checkpoint(base_path: Path, rule: CleanupRule, pending: list[str] | None) -> None:
+    """
+    Persiste (écriture atomique) ou efface le point de reprise d'une passe.
+    """
+    path = _checkpoint_path(base_path, rule)
+    if not pending:
+        path.unlink(missing_ok=True)
+        return
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("w", encoding="utf-8") as fh:
+            json.dump({"path": str(base_path), "pending": pending, "saved_at": time.time()}, fh)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logger.warning("⚠️ Point de reprise non écrit (%s) : %s", path, exc)
+        tmp.unlink(missing_ok=True)
+
+
+def _init_worker() -> None:
+    # Threads du pool de cleanup et process de compression : priorité I/O basse (CLEANUP_IONICE_CLASS)
+    if CLEANUP_IONICE_CLASS:
+        from core.limits import set_io_priority
+
+        set_io_priority(CLEANUP_IONICE_CLASS, "cleanup")
+
+
+def compress_file(path: str, fmt: str) -> tuple[str, int, int]:
+    """
+    Compresse un fichier (gzip ou zstd) puis supprime l'original ; l'archive garde le mtime de l'original.
+
+    Exécuté dans un process de compression (voir _compress_old) : écriture dans un .tmp puis renommage,
+    aucune archive partielle n'est visible.
+
+    :param path: Fichier à compresser.
+    :param fmt: "gzip" ou "zstd" (module zstandard requis).
+    :return: (archive, taille d'origine, taille compressée).
+    :raises OSError: Lecture/écriture impossible, ou archive déjà existante.
+    """
+    st = os.stat(path)
+    target = path + COMPRESSED_SUFFIXES[fmt]
+    if os.path.exists(target):
+        raise FileExistsError(f"archive déjà présente : {target}")
+    tmp = f"{target}.{os.getpid()}.tmp"
+    try:
+        with open(path, "rb") as src, open(tmp, "wb") as raw:
+            if fmt == "zstd":
+                import zstandard
+
+                zstandard.ZstdCompressor().copy_stream(src, raw)
+            else:
+                import gzip
+                import shutil
+
+                with gzip.GzipFile(
+                    filename=os.path.basename(path), fileobj=raw, mode="wb", mtime=int(st.st_mtime)
+                ) as gz:
+                    shutil.copyfileobj(src, gz, 1024 * 1024)
+        os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp, target)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+    os.unlink(path)
+    return target, st.st_size, os.stat(target).st_size
+
+
+def _compress_old(
+    base_path: Path, days: int, fmt: str, extensions: frozenset[str] | None, recursive: bool, pass_: _Pass
+) -> None:
+    """
+    compress_after_days : compresse en parallèle (CLEANUP_COMPRESS_WORKERS process) les fichiers plus vieux
+    que `days` jours. Les fichiers déjà compressés (.gz, .zst) ne sont pas retouchés.
+
+    Budget de temps épuisé : les compressions pas encore démarrées sont abandonnées (reprises au passage suivant).
+    """
+    if fmt == "zstd" and importlib.util.find_spec("zstandard") is None:
+        logger.warning("⚠️ %s : module zstandard absent → compression gzip", base_path)
+        fmt = "gzip"
+    cutoff = time.time() - days * 86400
+    compressed = tuple(COMPRESSED_SUFFIXES.values())
+    candidates: list[str] = []
+    for entry in iter_files(base_path, recursive, extensions):
+        if entry.name.endswith(compressed):
+            continue
+        mtime = _mtime(entry)
+        if mtime is not None and mtime < cutoff:
+            candidates.append(entry.path)
+    if not candidates:
+        return
+    if pass_.dry_run:
+        for path in candidates:
+            logger.info("🧪 [Dry run] Compression prévue (%s) : %s", fmt, path)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+    import multiprocessing
+
+    done = before = after = 0
+    # forkserver : pas de fork d'un process multi-thread (pool de cleanup, supervisor)
+    context = multiprocessing.get_context("forkserver")
+    with ProcessPoolExecutor(
+        max(1, CLEANUP_COMPRESS_WORKERS), mp_context=context, initializer=_init_worker
+    ) as executor:
+        futures = {executor.submit(compress_file, path, fmt): path for path in candidates}
+        for future, path in futures.items():
+            if pass_.expired():
+                executor.shutdown(wait=False, cancel_futures=True)  # les compressions démarrées se terminent
+            try:
+                _target, size_in, size_out = future.result()
+            except CancelledError:
+                continue
+            except Exception as exc:  # pylint: disable=broad-except
+                logger.warning("❌ Erreur compression %s : %s", path, exc)
+                continue
+            done += 1
+            before += size_in
+            after += size_out
+    logger.info(
+        "🗜️ %s : compress_after_days=%s → %s fichier(s) compressé(s) en %s (%s → %s octets)",
+        base_path,
+        days,
+        done,
+        fmt,
+        before,
+        after,
+    )
+    if done < len(candidates) and pass_.expired():
+        logger.info(
+            "⏳ %s : budget de %ss atteint → %s compression(s) reportée(s)",
+            base_path,
+            pass_.budget,
+            len(candidates) - done,
+        )
+
+
+def _apply_retention(
+    base_path: Path,
+    rule: CleanupRule,
+    extensions: frozenset[str] | None,
+    recursive: bool,
+    pass_: _Pass,
+) -> tuple[str, int, int]:
+    """
+    keep_last (prioritaire) ou keep_days, en un seul passage.
+
+    Avec un budget de temps, le parcours s'arrête à échéance et reprend au passage suivant là où il s'était
+    arrêté (point de reprise dans CLEANUP_STATE_DIR). Pour keep_last, la reprise est conservatrice : les fichiers
+    vus lors des passes précédentes ne comptent plus parmi les N plus récents, on supprime donc moins, jamais plus.
+
+    :return: (libellé de la stratégie, fichiers supprimés, fichiers examinés).
+    """
+    keep_last = rule.get("keep_last")
+    keep_days = rule.get("keep_days")
+    checkpoint = pass_.deadline is not None and not pass_.dry_run
+    resumed = _load_checkpoint(base_path, rule) if checkpoint else None
+    pending = resumed or [os.fspath(base_path)]
+    if resumed:
+        logger.info("⏯️ %s : reprise de la passe précédente (%s dossier(s) restant(s))", base_path, len(resumed))
+
+    scanned = deleted = 0
+    interrupted = False
+    newest: list[tuple[float, str, int]] = []
+    cutoff = time.time() - keep_days * 86400 if keep_days is not None and keep_days >= 0 else None
+    for entry in iter_files(base_path, recursive, extensions, pending):
+        if pass_.expired():
+            interrupted = True
+            break
+        try:
+            st = entry.stat()  # mis en cache par le DirEntry : un seul appel système par fichier
+        except OSError:
+            continue
+        scanned += 1
+        if keep_last is not None:
+            # Tas min des `keep_last` fichiers les plus récents : tout fichier qui en sort (ou n'y entre pas)
+            # est plus ancien que N fichiers déjà vus → supprimable immédiatement
+            if keep_last < 0:
+                continue
+            if len(newest) < keep_last:
+                heapq.heappush(newest, (st.st_mtime, entry.path, st.st_size))
+                continue
+            _, oldest, size = heapq.heappushpop(newest, (st.st_mtime, entry.path, st.st_size))
+            deleted += pass_.delete(oldest, size)
+        elif cutoff is not None and st.st_mtime < cutoff:
+            deleted += pass_.delete(entry.path, st.st_size)
+
+    if checkpoint:
+        _save_checkpoint(base_path, rule, pending if interrupted else None)
+    if interrupted:
+        logger.info(
+            "⏳ %s : budget de %ss atteint → reprise au prochain passage (%s dossier(s) restant(s))",
+            base_path,
+            pass_.budget,
+            len(pending),
+        )
+    label = f"keep_last={keep_last}" if keep_last is not None else f"keep_days={keep_days}"
+    return label, deleted, scanned
+
+
+def _enforce_quota(
+    base_path: Path, max_total_size: int, extensions: frozenset[str] | None, recursive: bool, pass_: _Pass
+) -> tuple[str, int, int]:
+    """
+    max_total_size : supprime les fichiers les plus anciens jusqu'à ce que leur taille totale tienne dans le quota.
+
+    Budget de temps épuisé : les suppressions s'arrêtent (le quota est recalculé au passage suivant).
+
+    :return: (libellé de la stratégie, fichiers supprimés, fichiers examinés).
+    """
+    files: list[tuple[float, str, int]] = []
+    total = 0
+    for entry in iter_files(base_path, recursive, extensions):
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, entry.path, st.st_size))
+        total += st.st_size
+
+    deleted = 0
+    if total > max_total_size:
+        heapq.heapify(files)  # O(n), puis on ne dépile que les fichiers à supprimer
+        while files and total > max_total_size:
+            if pass_.expired():
+                logger.info("⏳ %s : budget de %ss atteint → quota repris au prochain passage", base_path, pass_.budget)
+                break
+            _, path, size = heapq.heappop(files)
+            if pass_.delete(path, size):
+                deleted += 1
+                total -= size
+    return f"max_total_size={max_total_size} (reste {total} octets)", deleted, deleted + len(files)
+
 
 def cleanup_multiple(paths: Sequence[str | Path], rule: CleanupRule) -> None:
     """
-    Supprime des fichiers dans un ou plusieurs dossiers selon des règles simples.
+    Supprime (ou compresse) des fichiers dans un ou plusieurs dossiers selon des règles simples.
 
-    Stratégies supportées (priorisées) :
-      1) keep_last: garder les N fichiers les plus récents, supprimer le reste
-      2) keep_days: supprimer les fichiers plus vieux que N jours
+    Stratégies supportées, appliquées dans cet ordre :
+      1) compress_after_days: compresser (gzip/zstd, `compress_format`) les fichiers plus vieux que N jours
+      2) keep_last: garder les N fichiers les plus récents, supprimer le reste
+         sinon keep_days: supprimer les fichiers plus vieux que N jours
+      3) max_total_size: supprimer les plus anciens jusqu'à tenir dans le quota (octets)
 
     Filtrage :
       - extensions: "all" (tous fichiers) ou liste d'extensions [".log", ".gz", ...]
-      - recursive: True/False (utilise rglob ou glob)
-      - dry_run: True/False (logge sans supprimer)
+        (les archives produites en 1) ne sont concernées par 2) et 3) que si ".gz"/".zst" sont listés)
+      - recursive: True/False (descend ou non dans les sous-dossiers)
+      - dry_run: True/False (logge sans supprimer ni compresser)
+
+    Ménagement des I/O :
+      - max_files_per_second / max_bytes_per_second: débit max des suppressions (par lots, pauses >= 50 ms)
+      - time_budget_seconds: durée max de la passe sur un dossier ; keep_last/keep_days reprennent au passage
+        suivant là où ils s'étaient arrêtés (point de reprise persisté)
+
+    Parcours en flux (os.scandir, un stat par fichier) et suppressions au fil de l'eau :
+    keep_last ne garde en mémoire que les N fichiers les plus récents vus (tas borné).
 
     :param paths: Dossiers à nettoyer.
     :param rule: Règles de nettoyage (voir utils.types.CleanupRule).
@@ -29,69 +440,126 @@ def cleanup_multiple(paths: Sequence[str | Path], rule: CleanupRule) -> None:
     # --- Lecture/normalisation des options ---
     keep_last: int | None = rule.get("keep_last")
     keep_days: int | None = rule.get("keep_days")
-    extensions = rule.get("extensions", [".log"])
+    max_total_size: int | None = rule.get("max_total_size")
+    compress_after_days: int | None = rule.get("compress_after_days")
+    extensions = _normalize_extensions(rule.get("extensions", [".log"]))
     recursive: bool = bool(rule.get("recursive", False))
     dry_run: bool = bool(rule.get("dry_run", False))
 
-    if keep_last is None and keep_days is None:
-        logger.info("🧹 Aucune règle (keep_last/keep_days) fournie → aucune suppression effectuée.")
+    if keep_last is None and keep_days is None and max_total_size is None and compress_after_days is None:
+        logger.info("🧹 Aucune règle (keep_last/keep_days/max_total_size/compress_after_days) fournie → rien à faire.")
         return
 
-    # Priorité : keep_last > keep_days
-    strategy = "keep_last" if keep_last is not None else "keep_days"
-    now = time.time()
-    cutoff: float | None = None
-    if strategy == "keep_days" and isinstance(keep_days, int) and keep_days >= 0:
-        cutoff = now - (keep_days * 86400)
-
     for base in list(paths):
         base_path = Path(base)
-        if not base_path.exists() or not base_path.is_dir():
+        if not base_path.is_dir():
             logger.warning("⚠️ Chemin ignoré (inexistant/non-dossier) : %s", base_path)
             continue
 
-        # --- Collecte des fichiers cibles ---
-        it = base_path.rglob("*") if recursive else base_path.glob("*")
-
-        files: list[Path] = []
-        if extensions == "all":
-            files = [p for p in it if p.is_file()]
-        else:
-            # Normalise extensions (ajoute le "." si oublié)
-            normalized_exts = []
-            for ext in extensions:
-                if not ext:
-                    continue
-                normalized_exts.append(ext if ext.startswith(".") else f".{ext}")
-            files = [p for p in it if p.is_file() and any(p.name.endswith(ext) for ext in normalized_exts)]
+        pass_ = _Pass(rule)
+        if compress_after_days is not None:
+            fmt = rule.get("compress_format", "gzip")
+            _compress_old(base_path, compress_after_days, fmt, extensions, recursive, pass_)
 
-        if not files:
-            logger.info("📂 %s : aucun fichier à traiter (filtre=%s, recursive=%s)", base_path, extensions, recursive)
-            continue
+        passes: list[tuple[str, int, int]] = []
+        if (keep_last is not None or keep_days is not None) and not pass_.expired():
+            passes.append(_apply_retention(base_path, rule, extensions, recursive, pass_))
+        if max_total_size is not None and not pass_.expired():
+            passes.append(_enforce_quota(base_path, max_total_size, extensions, recursive, pass_))
 
-        # --- Application de la stratégie ---
-        to_delete: list[Path] = []
-        if strategy == "keep_last" and keep_last is not None:
-            # Trie par date de modification (plus récents d'abord)
-            files_sorted = sorted(files, key=lambda f: f.stat().st_mtime, reverse=True)
-            to_delete = files_sorted[keep_last:] if keep_last >= 0 else []
+        for label, deleted, scanned in passes:
+            if not scanned:
+                logger.info(
+                    "📂 %s : aucun fichier à traiter (filtre=%s, recursive=%s)",
+                    base_path,
+                    rule.get("extensions", [".log"]),
+                    recursive,
+                )
+                continue
             logger.info(
-                "📂 %s : stratégie keep_last=%s → suppression de %s fichiers", base_path, keep_last, len(to_delete)
+                "📂 %s : stratégie %s → %s fichier(s) %s sur %s",
+                base_path,
+                label,
+                deleted,
+                "à supprimer (dry run)" if dry_run else "supprimé(s)",
+                scanned,
             )
 
-        elif strategy == "keep_days" and cutoff is not None:
-            to_delete = [f for f in files if f.stat().st_mtime < cutoff]
-            logger.info(
-                "📂 %s : stratégie keep_days=%s → suppression de %s fichiers", base_path, keep_days, len(to_delete)
-            )
 
-        # --- Exécution / Dry-run ---
-        for f in to_delete:
-            try:
-                if dry_run:
-                    logger.info("🧪 [Dry run] Suppression prévue : %s", f)
-                else:
-                    logger.info("🧹 Suppression : %s", f)
-                    f.unlink()
-            except Exception as exc:  # pylint: disable=broad-except
-                logger.warning("❌ Erreur suppression %s : %s", f, exc)
+def merge_cleanups(cleanups: Iterable[CleanupCfg]) -> dict[CleanupKey, tuple[str, CleanupRule]]:
+    """
+    Fusionne les nettoyages déclarés par plusieurs tâches : une seule passe par paire (dossier, règle) identique.
+
+    :param cleanups: Blocs `cleanup` des tâches dues.
+    :return: Clé (dossier absolu, règle sérialisée) -> (dossier, règle), dans l'ordre de déclaration.
+    """
+    merged: dict[CleanupKey, tuple[str, CleanupRule]] = {}
+    for cleanup in cleanups:
+        rule = cleanup.get("rule")
+        if not rule:
+            continue
+        rule_key = json.dumps(rule, sort_keys=True)
+        for path in cleanup.get("paths", []):
+            merged.setdefault((os.path.abspath(path), rule_key), (path, rule))
+    return merged
+
+
+class CleanupPool:
+    """
+    Exécute les nettoyages en arrière-plan (threads), sans retarder le lancement des tâches.
+
+    Une paire (dossier, règle) déclarée par plusieurs tâches n'est nettoyée qu'une fois, et n'est pas
+    resoumise tant que la passe précédente n'est pas terminée.
+    """
+
+    def __init__(self, workers: int = CLEANUP_WORKERS) -> None:
+        """
+        :param workers: Nombre de threads (CLEANUP_WORKERS, min 1).
+        """
+        self.workers = max(1, workers)
+        self._executor: ThreadPoolExecutor | None = None  # créé à la première soumission
+        self._pending: dict[CleanupKey, Future[None]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, cleanups: Iterable[CleanupCfg]) -> int:
+        """
+        Soumet les nettoyages (fusionnés) au pool, sans attendre.
+
+        :param cleanups: Blocs `cleanup` des tâches dues.
+        :return: Nombre de passes effectivement soumises.
+        """
+        submitted = 0
+        for key, (path, rule) in merge_cleanups(cleanups).items():
+            with self._lock:
+                if key in self._pending:
+                    logger.debug("🧹 %s : nettoyage déjà en cours, ignoré", path)
+                    continue
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix="cleanup", initializer=_init_worker
+                    )
+                future = self._executor.submit(cleanup_multiple, [path], rule)
+                self._pending[key] = future
+            future.add_done_callback(functools.partial(self._done, key, path))
+            submitted += 1
+        return submitted
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        """
+        Arrête le pool.
+
+        Sans `wait`, l'executor est conservé : un second appel attend les nettoyages déjà démarrés.
+
+        :param wait: Attendre la fin des nettoyages en cours.
+        :param cancel_pending: Abandonner les nettoyages pas encore démarrés.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=cancel_pending)
+            if wait:
+                self._executor = None
+
+    def _done(self, key: CleanupKey, path: str, future: Future[None]) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("❌ Nettoyage %s en échec : %s", path, future.exception())
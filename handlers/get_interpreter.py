@@ -1,46 +1,51 @@
 # handlers/get_interpreter.py
 from __future__ import annotations
 
+import os
 from pathlib import Path
+import pickle
+import shutil
+import time
 from typing import Any
 
-import yaml
-
-from utils.config import INTERPRETERS_PATH, PROJECT_ROOT_FOLDERS
+from utils.config import DEFAULT_VENV, INTERPRETERS_PATH, PROJECT_ROOT_FOLDERS, TASKS_CACHE_DIR
 from utils.logger import get_logger
-from utils.types import InterpretersMap
+from utils.types import InterpretersMap, Resolution
+from utils.yaml_cache import load_compiled, write_cache
 
 logger = get_logger("CronBoss")
 
+RESOLUTIONS_FILE = "resolutions.pickle"
+RESOLUTION_MAX_AGE = 3600  # s : un .env ajouté ou supprimé est pris en compte au plus tard après ce délai
+
+
+def _compile_interpreters(data: Any, path: Path) -> InterpretersMap:
+    if not isinstance(data, dict):
+        logger.warning("⚠️ venvs.yaml vide ou non dict: %r", type(data).__name__)
+        return {}
+    # Filtre: on ne garde que les paires str->str
+    out: dict[str, str] = {}
+    for k, v in data.items():
+        if isinstance(k, str) and isinstance(v, str) and k and v:
+            out[k] = v
+        else:
+            logger.debug("Entrée ignorée dans venvs.yaml: %r -> %r", k, v)
+    return out
+
 
 def load_interpreters_map(path: str | Path = INTERPRETERS_PATH) -> InterpretersMap:
     """
-    Charge le mapping des interpréteurs Python depuis un YAML (ex: venvs.yaml).
+    Charge le mapping des interpréteurs Python depuis un YAML (ex: venvs.yaml), via le cache compilé.
 
     Format attendu:
         project_name: /chemin/vers/venv/bin/python
     """
     p = Path(path)
     try:
-        with p.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
-        if not isinstance(data, dict):
-            logger.warning("⚠️ venvs.yaml vide ou non dict: %r", type(data).__name__)
-            return {}
-        # Filtre: on ne garde que les paires str->str
-        out: dict[str, str] = {}
-        for k, v in data.items():
-            if isinstance(k, str) and isinstance(v, str) and k and v:
-                out[k] = v
-            else:
-                logger.debug("Entrée ignorée dans venvs.yaml: %r -> %r", k, v)
-        return out
+        return load_compiled(p, _compile_interpreters) or {}
     except FileNotFoundError:
         logger.warning("⚠️ Fichier venvs.yaml introuvable: %s", p)
         return {}
-    except yaml.YAMLError as exc:
-        logger.warning("⚠️ YAML invalide dans venvs.yaml: %s", exc)
-        return {}
     except Exception as exc:  # pylint: disable=broad-except
         logger.exception("⚠️ Impossible de charger venvs.yaml (%s): %s", p, exc)
         return {}
@@ -87,6 +92,145 @@ def get_interpreter_from_project(
     return None
 
 
+def find_cwd(script_dir: Path, ttype: str) -> str:
+    """
+    Détermine le répertoire de travail d'un script.
+
+    - Si Bash : dossier du script
+    - Si Python : cherche un .env en remontant jusqu'à 3 niveaux
+
+    :param script_dir: Dossier (résolu) du script.
+    :param ttype: Type de tâche ("python" | "bash").
+    """
+    if ttype == "bash":
+        return str(script_dir)
+
+    if ttype == "python":
+        current = script_dir
+        for _ in range(3):  # on check max 3 niveaux
+            env_file = current / ".env"
+            if env_file.exists():
+                return str(current)
+            current = current.parent
+        # fallback : dossier du script
+        return str(script_dir)
+
+    # fallback pour types inconnus
+    return str(Path.cwd())
+
+
+class Resolver:
+    """
+    Résolution (interpréteur, chemin absolu, cwd) des scripts, calculée une fois par script.
+
+    Persistée entre deux ticks dans TASKS_CACHE_DIR : invalidée si venvs.yaml (mtime) ou DEFAULT_VENV change,
+    et chaque entrée est recalculée après RESOLUTION_MAX_AGE (apparition d'un .env). Chaque interpréteur est
+    vérifié une fois par process (présent et exécutable), y compris pour une résolution lue du cache ; une
+    résolution en erreur n'est jamais mise en cache.
+    """
+
+    def __init__(self, interpreters: InterpretersMap, venvs_path: str | Path = INTERPRETERS_PATH, persist: bool = True):
+        """
+        :param interpreters: Mapping projet -> interpréteur (venvs.yaml déjà chargé).
+        :param venvs_path: venvs.yaml, dont le mtime valide le cache persisté.
+        :param persist: False = cache en mémoire uniquement (aucune lecture/écriture disque).
+        """
+        self.interpreters = interpreters
+        self._path = Path(TASKS_CACHE_DIR) / RESOLUTIONS_FILE if persist and TASKS_CACHE_DIR else None
+        self._key: tuple[int, str] = (0, DEFAULT_VENV)
+        self._entries: dict[tuple[str, str, str, str], Resolution] = {}
+        self._checked: dict[str, str | None] = {}  # interpréteur -> erreur (None = OK)
+        self._dirty = False
+        if self._path is not None:
+            try:
+                self._key = (os.stat(venvs_path).st_mtime_ns, DEFAULT_VENV)
+            except OSError:
+                pass
+            self._entries = self._load()
+
+    def _load(self) -> dict[tuple[str, str, str, str], Resolution]:
+        assert self._path is not None
+        try:
+            with self._path.open("rb") as fh:
+                data: dict[str, Any] = pickle.load(fh)
+        except FileNotFoundError:
+            return {}
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.debug("Cache des résolutions illisible (%s) : %s", self._path, exc)
+            return {}
+        if data.get("key") != self._key:
+            return {}  # venvs.yaml ou DEFAULT_VENV modifié
+        entries: dict[tuple[str, str, str, str], Resolution] = data.get("entries", {})
+        return entries
+
+    def resolve(self, ttype: str, script: str, source_file: str, interpreter: str | None = None) -> Resolution:
+        """
+        Résout un script (depuis le cache si possible).
+
+        :param ttype: Type de tâche ("python" | "bash").
+        :param script: Script tel que déclaré dans le YAML.
+        :param source_file: Nom du YAML (projet par défaut).
+        :param interpreter: Interpréteur explicite (YAML `interpreter`), prioritaire.
+        """
+        key = (ttype, script, source_file, interpreter or "")
+        now = time.time()
+        cached = self._entries.get(key)
+        if cached is not None and now - cached["resolved_at"] < RESOLUTION_MAX_AGE:
+            # Seules la résolution du script et du cwd sont réutilisées : le venv peut avoir été supprimé
+            # depuis la mise en cache (vérifié une fois par process)
+            error = self.check_interpreter(cached["interpreter"]) if cached["interpreter"] else None
+            if error is None:
+                return cached
+            del self._entries[key]
+            self._dirty = True
+            return {**cached, "error": error}
+
+        if ttype == "python":
+            interpreter = (
+                interpreter or get_interpreter_from_project(script, source_file, self.interpreters) or DEFAULT_VENV
+            )
+        else:
+            interpreter = None
+        resolution: Resolution = {
+            "interpreter": interpreter,
+            "script": str(Path(script).resolve()),
+            "cwd": find_cwd(Path(script).parent.resolve(), ttype),
+            "error": self.check_interpreter(interpreter) if interpreter else None,
+            "resolved_at": now,
+        }
+        if resolution["error"] is None:
+            self._entries[key] = resolution
+            self._dirty = True
+        return resolution
+
+    def check_interpreter(self, interpreter: str) -> str | None:
+        """
+        Vérifie (une fois par interpréteur) qu'un interpréteur existe et est exécutable.
+
+        :return: Message d'erreur, ou None si l'interpréteur est utilisable.
+        """
+        if interpreter not in self._checked:
+            path = interpreter if os.sep in interpreter else shutil.which(interpreter)  # "python3" : via PATH
+            error = None
+            if path is None or not os.path.isfile(path):
+                error = f"interpréteur introuvable : {interpreter}"
+            elif not os.access(path, os.X_OK):
+                error = f"interpréteur non exécutable : {interpreter}"
+            if error:
+                logger.warning("⚠️ Venv cassé, tâches concernées non lancées — %s", error)
+            self._checked[interpreter] = error
+        return self._checked[interpreter]
+
+    def save(self) -> None:
+        """
+        Persiste les résolutions si de nouvelles ont été calculées.
+        """
+        if self._path is None or not self._dirty:
+            return
+        write_cache(self._path, {"key": self._key, "entries": self._entries})
+        self._dirty = False
+
+
 def check_missing_interpreters(tasks_dir: Path, interpreters: InterpretersMap) -> None:
     """
     Parcourt les fichiers YAML d'un répertoire et avertit si des tâches Python.
@@ -96,6 +240,8 @@ def check_missing_interpreters(tasks_dir: Path, interpreters: InterpretersMap) -
       - script: str
       - interpreter: str (optionnel)
     """
+    import yaml
+
     for yaml_file in tasks_dir.glob("*.yaml"):
         try:
             with yaml_file.open("r", encoding="utf-8") as f:
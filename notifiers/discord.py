@@ -1,8 +1,6 @@
 # notifiers/discord.py (extrait)
 from __future__ import annotations
 
-import requests
-
 from utils.config import DISCORD_WEBHOOK_URL
 from utils.logger import get_logger
 from utils.types import Status, TaskLike
@@ -52,10 +50,17 @@ class DiscordNotifier:
                 content = f"❌ **{task.script.name}** → FAILURE en {duration:.2f}s\n```{err_msg}```"
             else:
                 content = f"❌ **{task.script.name}** → FAILURE en {duration:.2f}s"
+        elif status == "slow":
+            regressions = kwargs.get("regressions")
+            content = f"🐢 **{task.script.name}** → SLOW en {duration:.2f}s"
+            if isinstance(regressions, str) and regressions:
+                content += f"\n{regressions}"
         else:
             # Cas "Non" (pas encore exécuté) ou autres → on reste factuel
             content = f"⚡ **{task.script.name}** → {status.upper()}"
 
+        import requests  # import différé : coûteux, inutile si aucune notif n'est envoyée
+
         try:
             resp = requests.post(DISCORD_WEBHOOK_URL, json={"content": content}, timeout=5)
             if resp.status_code != 204:
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
 from collections.abc import Iterable
+import time
 from typing import cast
 
 from notifiers.discord import DiscordNotifier
 from utils.config import DEFAULT_NOTIFY_ON, SEND_SUMMARY_DISCORD
 from utils.logger import get_logger
+from utils.metrics import metrics
 from utils.types import NotificationsCfg, Notifier, Status, SummaryPayload, TaskLike
 
 logger = get_logger("CronBoss")
@@ -47,10 +49,14 @@ class NotifierManager:
             return
 
         for notifier in self.notifiers:
+            started = time.perf_counter()
             try:
                 notifier.send(task, status, **kwargs)
             except Exception as exc:  # pylint: disable=broad-except
                 logger.exception("Notifier %s a échoué: %s", type(notifier).__name__, exc)
+            metrics.observe(
+                "cronboss_notifier_latency_seconds", time.perf_counter() - started, notifier=type(notifier).__name__
+            )
 
     def notify_summary(self, summary: SummaryPayload) -> None:
         """
@@ -66,8 +72,14 @@ class NotifierManager:
             f"❌ {summary['failure']} échecs\n"
             f"⏱️ Durée totale : {summary['total_duration']:.2f}s"
         )
+        if summary["trends"]:
+            content += "\n\n" + "\n".join(summary["trends"])
         for notifier in self.notifiers:
+            started = time.perf_counter()
             try:
                 notifier.send_summary(content)
             except Exception as exc:  # pylint: disable=broad-except
                 logger.exception("Notifier %s (summary) a échoué: %s", type(notifier).__name__, exc)
+            metrics.observe(
+                "cronboss_notifier_latency_seconds", time.perf_counter() - started, notifier=type(notifier).__name__
+            )
@@ -1,26 +1,342 @@
 # utils/audit.py
 from __future__ import annotations
 
+import atexit
+import datetime as dt
+import fcntl
 import json
+import os
 from pathlib import Path
+import threading
 import time
-from typing import TypedDict
+from typing import TYPE_CHECKING, TypedDict
+
+from utils.config import (
+    AUDIT_BACKEND,
+    AUDIT_BATCH_SIZE,
+    AUDIT_DB,
+    AUDIT_FLUSH_SECONDS,
+    AUDIT_FSYNC,
+    AUDIT_ROTATE_DAILY,
+    AUDIT_ROTATE_MB,
+)
+from utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from utils.history import HistoryStore
+
+logger = get_logger("CronBoss")
+
+SEGMENT_TIME_FORMAT = "%Y%m%d-%H%M%S"  # segments : runs.20250131-235959.jsonl.gz (date du dernier record)
 
 
 class RunRecord(TypedDict, total=False):
     ts: float
+    run_id: str
     script: str
     status: str
     duration: float
+    queue_wait: float
     returncode: int | None
     source_file: str
+    cpu_user: float
+    cpu_sys: float
+    max_rss_kb: int
+    io_read_bytes: int
+    io_write_bytes: int
+    timed_out: bool
+    leaked_pids: list[int]
+    limit: str  # "cpu" | "memory" | "nofile" (status "limit_exceeded")
+    slow: list[str]  # métriques en régression : "duration" | "cpu" | "rss"
     stdout_tail: str | None
     stderr_tail: str | None
 
 
+class AuditWriter:
+    """
+    Journal d'audit JSONL bufferisé : le fichier reste ouvert et les records sont écrits par lots.
+
+    - Écriture : un seul write() O_APPEND par lot, sous flock → sûr entre process CronBoss concurrents.
+    - Vidage : tous les `batch_size` records, quand le plus ancien a `flush_seconds`, et à la fermeture.
+    - fsync : "always" (chaque record, sans buffer), "batch" (chaque lot) ou "never" (laissé au noyau).
+    - Rotation par taille et/ou par jour en segments gzip, sous le même verrou ; un process qui garde un
+      descripteur sur un fichier déjà renommé le détecte (inode) et rouvre le fichier courant. Le segment est
+      compressé dans un thread dédié, hors de tout verrou (attendu à la fermeture).
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_seconds: float = AUDIT_FLUSH_SECONDS,
+        fsync: str = AUDIT_FSYNC,
+        rotate_bytes: int = AUDIT_ROTATE_MB * 1024 * 1024,
+        rotate_daily: bool = AUDIT_ROTATE_DAILY,
+    ) -> None:
+        """
+        :param path: Fichier JSONL (AUDIT_JSON).
+        :param batch_size: Records par lot (AUDIT_BATCH_SIZE).
+        :param flush_seconds: Âge max d'un record en mémoire (AUDIT_FLUSH_SECONDS).
+        :param fsync: Politique fsync (AUDIT_FSYNC).
+        :param rotate_bytes: Taille déclenchant une rotation (0 = jamais).
+        :param rotate_daily: Rotation au premier lot écrit un nouveau jour.
+        """
+        self.path = Path(path)
+        self.fsync = fsync if fsync in ("always", "batch", "never") else "batch"
+        self.batch_size = 1 if self.fsync == "always" else max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.rotate_bytes = rotate_bytes
+        self.rotate_daily = rotate_daily
+        self._buffer: list[str] = []
+        self._first_buffered = 0.0
+        self._fd: int | None = None
+        self._lock = threading.Lock()
+        self._compressions: list[threading.Thread] = []
+
+    def append(self, rec: RunRecord) -> None:
+        """
+        Ajoute un record au lot courant (vidé si plein ou trop ancien).
+        """
+        rec.setdefault("ts", time.time())
+        line = json.dumps(rec, ensure_ascii=False) + "\n"
+        with self._lock:
+            if not self._buffer:
+                self._first_buffered = time.monotonic()
+            self._buffer.append(line)
+            if len(self._buffer) >= self.batch_size or time.monotonic() - self._first_buffered >= self.flush_seconds:
+                self._flush_locked()
+
+    def flush(self, due_only: bool = False) -> None:
+        """
+        Écrit le lot en attente.
+
+        :param due_only: Seulement si le plus ancien record a atteint `flush_seconds`.
+        """
+        with self._lock:
+            if not due_only or (self._buffer and time.monotonic() - self._first_buffered >= self.flush_seconds):
+                self._flush_locked()
+
+    def flush_timeout(self) -> float | None:
+        """
+        Secondes avant que le lot en attente doive être écrit (None si rien en attente).
+        """
+        if not self._buffer:
+            return None
+        return max(0.0, self._first_buffered + self.flush_seconds - time.monotonic())
+
+    def close(self) -> None:
+        """
+        Écrit le lot en attente et ferme le fichier.
+        """
+        with self._lock:
+            self._flush_locked()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            compressions, self._compressions = self._compressions, []
+        for thread in compressions:
+            thread.join()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        data = "".join(self._buffer).encode("utf-8")
+        segment: Path | None = None
+        try:
+            fd = self._locked_fd()
+            try:
+                if self._should_rotate(fd, len(data)):
+                    fd, segment = self._rotate(fd)
+                os.write(fd, data)
+                if self.fsync != "never":
+                    os.fsync(fd)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        except OSError as exc:
+            logger.error("❌ Audit non écrit (%s, %s record(s)) : %s", self.path, len(self._buffer), exc)
+            self._close_fd()
+        self._buffer = []
+        if segment is not None:
+            # Plus personne n'écrit dans le segment (les writers vérifient l'inode sous verrou) : compression dans
+            # un thread, sans tenir self._lock ni bloquer l'appelant (jusqu'à AUDIT_ROTATE_MB à gzipper)
+            logger.info("🗂️ Audit : rotation de %s → %s.gz", self.path.name, segment.name)
+            thread = threading.Thread(target=_compress_segment, args=(segment,), name="audit-compress")
+            thread.start()
+            self._compressions = [t for t in self._compressions if t.is_alive()] + [thread]
+
+    def _locked_fd(self) -> int:
+        # Descripteur verrouillé sur le fichier courant (rouvert s'il a été renommé par une rotation)
+        while True:
+            if self._fd is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                current = os.stat(self.path)
+            except FileNotFoundError:
+                current = None
+            opened = os.fstat(self._fd)
+            if current is not None and (current.st_dev, current.st_ino) == (opened.st_dev, opened.st_ino):
+                return self._fd
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self._close_fd()
+
+    def _should_rotate(self, fd: int, incoming: int) -> bool:
+        st = os.fstat(fd)
+        if st.st_size == 0:
+            return False
+        if self.rotate_bytes > 0 and st.st_size + incoming > self.rotate_bytes:
+            return True
+        return self.rotate_daily and dt.date.fromtimestamp(st.st_mtime) != dt.date.today()
+
+    def _rotate(self, fd: int) -> tuple[int, Path]:
+        """
+        Renomme le fichier courant en segment et ouvre un nouveau fichier (verrouillé).
+
+        :return: (descripteur du nouveau fichier, segment à compresser).
+        """
+        st = os.fstat(fd)
+        stamp = time.strftime(SEGMENT_TIME_FORMAT, time.localtime(st.st_mtime))
+        segment = self.path.with_name(f"{self.path.stem}.{stamp}{self.path.suffix}")
+        n = 1
+        while segment.exists() or segment.with_name(segment.name + ".gz").exists():
+            segment = self.path.with_name(f"{self.path.stem}.{stamp}-{n}{self.path.suffix}")
+            n += 1
+        os.rename(self.path, segment)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+        return self._fd, segment
+
+    def _close_fd(self) -> None:
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = None
+
+
+def _compress_segment(segment: Path) -> None:
+    import gzip
+    import shutil
+
+    target = segment.with_name(segment.name + ".gz")
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    try:
+        with segment.open("rb") as src, gzip.open(tmp, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+        os.replace(tmp, target)
+        segment.unlink()
+    except OSError as exc:
+        logger.warning("⚠️ Segment d'audit non compressé (%s) : %s", segment, exc)
+        tmp.unlink(missing_ok=True)
+
+
+def audit_files(path: str | Path) -> list[Path]:
+    """
+    Segments d'audit (runs.<date>.jsonl[.gz]), du plus ancien au plus récent, puis le fichier courant s'il existe.
+    """
+    current = Path(path)
+    segments = sorted(
+        (
+            p
+            for p in current.parent.glob(f"{current.stem}.*{current.suffix}*")
+            if p.name.endswith((current.suffix, current.suffix + ".gz")) and p != current
+        ),
+        key=lambda p: _segment_order(p, current),
+    )
+    return [*segments, current] if current.exists() else segments
+
+
+def _segment_order(segment: Path, current: Path) -> tuple[str, int, str]:
+    # runs.<stamp>[-<n>].jsonl[.gz] -> (stamp, n) : un segment de collision (-1, -2...) suit celui sans suffixe
+    middle = segment.name.removesuffix(".gz").removesuffix(current.suffix).removeprefix(f"{current.stem}.")
+    stamp, _, n = middle.rpartition("-")
+    if stamp.count("-") == SEGMENT_TIME_FORMAT.count("-") and n.isdigit():
+        return stamp, int(n), segment.name
+    return middle, 0, segment.name
+
+
+_writers: dict[Path, AuditWriter] = {}
+_writers_lock = threading.Lock()
+_history: HistoryStore | None = None
+
+
+def get_audit_writer(path: str | Path) -> AuditWriter:
+    """
+    Writer partagé pour un fichier d'audit (vidé et fermé à la sortie du process).
+    """
+    key = Path(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = AuditWriter(key)
+        return writer
+
+
+def get_history_store() -> HistoryStore:
+    """
+    Historique SQLite partagé (AUDIT_DB), fermé à la sortie du process.
+    """
+    global _history
+    from utils.history import HistoryStore  # sqlite3 n'est importé que si le backend est utilisé
+
+    with _writers_lock:
+        if _history is None:
+            _history = HistoryStore(AUDIT_DB)
+        return _history
+
+
 def append_run_record(path: str | Path, rec: RunRecord) -> None:
-    p = Path(path)
-    p.parent.mkdir(parents=True, exist_ok=True)
+    """
+    Ajoute un record d'exécution à l'audit : JSONL bufferisé (voir AuditWriter) et/ou SQLite selon AUDIT_BACKEND.
+    """
     rec.setdefault("ts", time.time())
-    with p.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    if AUDIT_BACKEND in ("sqlite", "both"):
+        try:
+            get_history_store().append([rec])
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("❌ Historique SQLite non écrit (%s) : %s", AUDIT_DB, exc)
+    if AUDIT_BACKEND != "sqlite":
+        get_audit_writer(path).append(rec)
+
+
+def flush_audit(due_only: bool = False) -> None:
+    """
+    Écrit les records en attente de tous les journaux d'audit.
+
+    :param due_only: Seulement les lots ayant atteint AUDIT_FLUSH_SECONDS (boucle du daemon).
+    """
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        writer.flush(due_only)
+
+
+def audit_flush_timeout() -> float | None:
+    """
+    Secondes avant le prochain vidage dû d'un journal d'audit (None si rien en attente).
+    """
+    with _writers_lock:
+        timeouts = [t for writer in _writers.values() if (t := writer.flush_timeout()) is not None]
+    return min(timeouts, default=None)
+
+
+def close_audit_writers() -> None:
+    """
+    Vide et ferme tous les journaux d'audit (appelé à la sortie du process).
+    """
+    global _history
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+        history, _history = _history, None
+    for writer in writers:
+        writer.close()
+    if history is not None:
+        history.close()
+
+
+atexit.register(close_audit_writers)
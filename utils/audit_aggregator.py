@@ -0,0 +1,316 @@
+# utils/audit_aggregator.py
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from pathlib import Path
+import time
+from typing import IO, TYPE_CHECKING, Any
+
+from utils.audit import audit_files
+from utils.config import AUDIT_AGGREGATE_DAYS, AUDIT_AGGREGATE_PATH, AUDIT_BACKEND, AUDIT_JSON
+from utils.history import (
+    DurationProfile,
+    TaskStats,
+    duration_bucket,
+    duration_profile,
+    histogram_percentile,
+    window_days,
+)
+from utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from utils.history import HistoryStore
+
+logger = get_logger("CronBoss")
+
+CHECKPOINT_VERSION = 2
+HEAD_BYTES = 64  # début du fichier courant : reconnaît le segment qu'il est devenu après une rotation
+SUCCESS_STATUSES = ("success", "success_with_warnings")
+
+# Agrégat d'une tâche pour un jour :
+# [runs, échecs, durée totale, durée max, dernier ts, dernier statut, histogramme, histogramme des succès]
+DayAggregate = list[Any]
+
+
+class AuditAggregator:
+    """
+    Agrégats incrémentaux du journal d'audit JSONL (AUDIT_JSON et ses segments), sans base SQLite.
+
+    Par tâche et par jour : nombre d'exécutions, échecs, durées totale/max et histogramme log des durées
+    (mêmes buckets que l'historique SQLite). Les agrégats et la position de lecture (offset + début du
+    fichier courant) sont conservés dans un petit fichier de checkpoint JSON : chaque `update()` ne lit que
+    la fin du fichier courant (mmap) et les segments apparus depuis, jamais tout l'historique.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = AUDIT_JSON,
+        checkpoint: str | Path = AUDIT_AGGREGATE_PATH,
+        keep_days: int = AUDIT_AGGREGATE_DAYS,
+    ) -> None:
+        """
+        :param path: Journal d'audit courant (AUDIT_JSON).
+        :param checkpoint: Fichier de checkpoint (AUDIT_AGGREGATE_PATH).
+        :param keep_days: Jours d'agrégats conservés (AUDIT_AGGREGATE_DAYS).
+        """
+        self.path = Path(path)
+        self.checkpoint = Path(checkpoint)
+        self.keep_days = max(1, keep_days)
+        self.head = b""
+        self.offset = 0
+        self.segments: set[str] = set()
+        self.tasks: dict[tuple[str, str], dict[str, DayAggregate]] = {}
+        self._oldest_day = window_days(self.keep_days)[0]
+        self._load()
+
+    def update(self) -> int:
+        """
+        Intègre les records écrits depuis le dernier appel et enregistre le checkpoint.
+
+        :return: Nombre de records intégrés.
+        """
+        self._oldest_day = window_days(self.keep_days)[0]
+        position = (self.head, self.offset, frozenset(self.segments))
+        files = audit_files(self.path)
+        segments: dict[str, Path] = {}
+        for file in files[:-1] if files and files[-1] == self.path else files:
+            key = file.name.removesuffix(".gz")
+            if key not in segments or file.suffix == ".gz":
+                segments[key] = file  # segment plain en cours de compression : le .gz (complet) prime
+
+        added = 0
+        for key, file in segments.items():  # ordre chronologique d'audit_files
+            if key in self.segments:
+                continue
+            try:
+                added += self._read_file(file)
+            except OSError as exc:
+                logger.warning("⚠️ Segment d'audit illisible (%s) : %s", file, exc)
+                continue
+            self.segments.add(key)
+        self.segments &= segments.keys()  # segments supprimés : inutile de s'en souvenir
+
+        try:
+            added += self._read_file(self.path, current=True)
+        except FileNotFoundError:
+            self.head, self.offset = b"", 0
+        if added or position != (self.head, self.offset, frozenset(self.segments)):
+            self._prune()
+            self._save()
+        return added
+
+    def stats(
+        self, days: int = 30, script: str | None = None, source_file: str | None = None, offset_days: int = 0
+    ) -> list[TaskStats]:
+        """
+        Statistiques par tâche sur les `days` derniers jours (voir HistoryStore.stats), depuis les agrégats.
+
+        :param days: Fenêtre en jours (bornée par AUDIT_AGGREGATE_DAYS).
+        :param script: Filtre sur le script (chemin exact, nom ou nom sans extension).
+        :param source_file: Filtre sur le fichier YAML source.
+        :param offset_days: Décale la fenêtre dans le passé.
+        """
+        since, until = window_days(days, offset_days)
+        out: list[TaskStats] = []
+        for (name, src), per_day in self.tasks.items():
+            if source_file and src != source_file:
+                continue
+            if script and script not in {name, Path(name).name, Path(name).stem}:
+                continue
+            selected = [agg for day, agg in per_day.items() if since <= day <= until]
+            runs = sum(agg[0] for agg in selected)
+            if not runs:
+                continue
+            failures = sum(agg[1] for agg in selected)
+            max_duration = max(agg[3] for agg in selected)
+            last = max(selected, key=lambda agg: agg[4])
+            hist: dict[int, int] = {}
+            for agg in selected:
+                for bucket, n in agg[6].items():
+                    hist[bucket] = hist.get(bucket, 0) + n
+            buckets = sorted(hist.items())
+            out.append(
+                {
+                    "script": name,
+                    "source_file": src,
+                    "runs": runs,
+                    "failures": failures,
+                    "failure_rate": failures / runs,
+                    "avg": sum(agg[2] for agg in selected) / runs,
+                    "p50": min(histogram_percentile(buckets, runs, 0.50), max_duration),
+                    "p95": min(histogram_percentile(buckets, runs, 0.95), max_duration),
+                    "max": max_duration,
+                    "last_ts": last[4],
+                    "last_status": last[5],
+                }
+            )
+        return out
+
+    def duration_profiles(self, days: int, quantile: float) -> dict[tuple[str, str], DurationProfile]:
+        """
+        Durées des exécutions réussies par tâche (voir HistoryStore.duration_profiles), depuis les agrégats.
+        """
+        since, until = window_days(days)
+        profiles: dict[tuple[str, str], DurationProfile] = {}
+        for key, per_day in self.tasks.items():
+            hist: dict[int, int] = {}
+            for day, agg in per_day.items():
+                if since <= day <= until:
+                    for bucket, n in agg[7].items():
+                        hist[bucket] = hist.get(bucket, 0) + n
+            if hist:
+                profiles[key] = duration_profile(sorted(hist.items()), quantile)
+        return profiles
+
+    def _read_file(self, file: Path, current: bool = False) -> int:
+        """
+        Lit un fichier d'audit depuis la position du checkpoint s'il s'agit du fichier courant suivi
+        (ou du segment qu'il est devenu), depuis le début sinon.
+        """
+        with open(file, "rb") as fh:
+            head = _read_head(fh, file)
+            start = self.offset if self.offset and head.startswith(self.head) else 0
+            if file.suffix == ".gz":
+                added, end = self._read_gzip(fh, start)
+            else:
+                added, end = self._read_plain(fh, start)
+        if current:
+            self.head, self.offset = head, end
+        elif start:
+            self.head, self.offset = b"", 0  # reprise terminée dans le segment : le fichier courant est neuf
+        return added
+
+    def _read_plain(self, fh: IO[bytes], start: int) -> tuple[int, int]:
+        # mmap : pas de copie du fichier en mémoire, seules les pages de la fin sont lues
+        size = os.fstat(fh.fileno()).st_size
+        if size < start:
+            start = 0  # fichier tronqué
+        if size == start:
+            return 0, start
+        with mmap.mmap(fh.fileno(), size, access=mmap.ACCESS_READ) as buf:
+            end = buf.rfind(b"\n", start) + 1  # lignes complètes seulement (un writer peut être en train d'écrire)
+            if end <= start:
+                return 0, start
+            added = 0
+            pos = start
+            while pos < end:
+                nl = buf.find(b"\n", pos, end)
+                added += self._add(buf[pos:nl])
+                pos = nl + 1
+        return added, end
+
+    def _read_gzip(self, fh: IO[bytes], start: int) -> tuple[int, int]:
+        import gzip
+
+        added = 0
+        with gzip.GzipFile(fileobj=fh) as gz:
+            gz.seek(start)
+            for line in gz:
+                added += self._add(line)
+                start += len(line)
+        return added, start
+
+    def _add(self, line: bytes) -> int:
+        try:
+            rec = json.loads(line)
+            ts = float(rec["ts"])
+            duration = float(rec.get("duration") or 0.0)
+            key = (str(rec["script"]), str(rec.get("source_file") or ""))
+            status = str(rec["status"])
+        except (KeyError, TypeError, ValueError):
+            return 0  # ligne partielle ou record incomplet
+        day = time.strftime("%Y-%m-%d", time.localtime(ts))
+        if day < self._oldest_day:
+            return 0
+        agg = self.tasks.setdefault(key, {}).get(day)
+        if agg is None:
+            agg = self.tasks[key][day] = [0, 0, 0.0, 0.0, 0.0, "", {}, {}]
+        agg[0] += 1
+        success = status in SUCCESS_STATUSES
+        agg[1] += not success
+        agg[2] += duration
+        agg[3] = max(agg[3], duration)
+        if ts >= agg[4]:
+            agg[4], agg[5] = ts, status
+        bucket = duration_bucket(duration)
+        agg[6][bucket] = agg[6].get(bucket, 0) + 1
+        if success:
+            agg[7][bucket] = agg[7].get(bucket, 0) + 1
+        return 1
+
+    def _prune(self) -> None:
+        for key in list(self.tasks):
+            per_day = self.tasks[key]
+            for day in [d for d in per_day if d < self._oldest_day]:
+                del per_day[day]
+            if not per_day:
+                del self.tasks[key]
+
+    def _load(self) -> None:
+        try:
+            state = json.loads(self.checkpoint.read_bytes())
+            if state.get("version") != CHECKPOINT_VERSION:
+                return
+            head, offset = bytes.fromhex(state["head"]), int(state["offset"])
+            segments = set(state["segments"])
+            tasks = {
+                (entry["script"], entry["source_file"]): {
+                    day: [*agg[:6], *({int(b): n for b, n in hist.items()} for hist in agg[6:8])]
+                    for day, agg in entry["days"].items()
+                }
+                for entry in state["tasks"]
+            }
+        except FileNotFoundError:
+            return
+        except (OSError, KeyError, TypeError, ValueError, AttributeError) as exc:
+            logger.warning("⚠️ Checkpoint d'agrégats illisible (%s), audit relu en entier : %s", self.checkpoint, exc)
+            return
+        self.head, self.offset, self.segments, self.tasks = head, offset, segments, tasks
+
+    def _save(self) -> None:
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "head": self.head.hex(),
+            "offset": self.offset,
+            "segments": sorted(self.segments),
+            "tasks": [
+                {"script": name, "source_file": src, "days": per_day} for (name, src), per_day in self.tasks.items()
+            ],
+        }
+        tmp = self.checkpoint.with_name(f"{self.checkpoint.name}.{os.getpid()}.tmp")
+        try:
+            self.checkpoint.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(state, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, self.checkpoint)
+        except OSError as exc:
+            logger.warning("⚠️ Checkpoint d'agrégats non écrit (%s) : %s", self.checkpoint, exc)
+            tmp.unlink(missing_ok=True)
+
+
+def _read_head(fh: IO[bytes], file: Path) -> bytes:
+    # Premiers octets (décompressés pour un segment .gz), puis retour au début
+    if file.suffix == ".gz":
+        import gzip
+
+        with gzip.GzipFile(fileobj=fh) as gz:
+            head = gz.read(HEAD_BYTES)
+    else:
+        head = fh.read(HEAD_BYTES)
+    fh.seek(0)
+    return head
+
+
+def open_history() -> HistoryStore | AuditAggregator:
+    """
+    Source des statistiques d'exécution : l'historique SQLite si AUDIT_BACKEND=sqlite, sinon les agrégats
+    du journal JSONL mis à jour. L'audit doit être vidé sur disque avant l'appel.
+    """
+    if AUDIT_BACKEND == "sqlite":
+        from utils.audit import get_history_store
+
+        return get_history_store()
+    aggregator = AuditAggregator()
+    aggregator.update()
+    return aggregator
@@ -3,11 +3,12 @@ import os
 from pathlib import Path
 import sys
 
-from dotenv import load_dotenv
-
-# Chargement du .env à la racine du projet
+# Chargement du .env à la racine du projet (python-dotenv n'est importé que si le fichier existe)
 env_path = Path(__file__).resolve().parent.parent / ".env"
-load_dotenv(dotenv_path=env_path, override=True)
+if env_path.is_file():
+    from dotenv import load_dotenv
+
+    load_dotenv(dotenv_path=env_path, override=True)
 
 # --- Fonctions utilitaires ---
 
@@ -48,11 +49,85 @@ TASKS_DIR = get_str("TASKS_DIR", "./tasks")
 LOG_FILE_PATH = get_required("LOG_FILE_PATH")
 LOG_ROTATION_DAYS = get_int("LOG_ROTATION_DAYS", 100)
 
+# Cache compilé des YAML (tâches + venvs.yaml, un pickle par fichier, invalidé sur mtime/taille/contenu), "" = aucun
+TASKS_CACHE_DIR = get_str("TASKS_CACHE_DIR", os.path.join(LOG_FILE_PATH, "cache", "tasks"))
+
+# Sorties des tâches : fin du flux gardée en mémoire, sortie complète copiée par exécution dans OUTPUT_DIR
+OUTPUT_DIR = get_str("OUTPUT_DIR", os.path.join(LOG_FILE_PATH, "runs"))
+OUTPUT_TAIL_LINES = get_int("OUTPUT_TAIL_LINES", 20)
+OUTPUT_TAIL_KB = get_int("OUTPUT_TAIL_KB", 64)
+OUTPUT_SPILL_MAX_MB = get_int("OUTPUT_SPILL_MAX_MB", 50)  # par flux et par exécution (0 = pas de copie disque)
+OUTPUT_COMPRESSION = get_str("OUTPUT_COMPRESSION", "auto").lower()  # "auto" (zstd si installé) | "zstd" | "gzip"
+# Cadence d'échantillonnage (psutil) des ressources des tâches en cours (secondes) : RSS crête, et tout le relevé
+# pour le moteur asyncio ; 0 = désactivé (RSS crête non mesurée)
+RUSAGE_SAMPLE_INTERVAL = get_int("RUSAGE_SAMPLE_INTERVAL", 5)
+
 LOCK_ROOT = get_str("LOCK_ROOT", "./locks")
 
 AUDIT_JSON = get_str("AUDIT_JSON", "./logs/runs.jsonl")
+# Écriture de l'audit par lots : records par lot, âge max d'un record en mémoire (s)
+AUDIT_BATCH_SIZE = get_int("AUDIT_BATCH_SIZE", 50)
+AUDIT_FLUSH_SECONDS = get_int("AUDIT_FLUSH_SECONDS", 5)
+# fsync de l'audit : "always" (chaque record, sans lot) | "batch" (chaque lot) | "never"
+AUDIT_FSYNC = get_str("AUDIT_FSYNC", "batch").lower()
+# Rotation de l'audit en segments gzip : taille max (Mo, 0 = jamais) et/ou chaque jour
+AUDIT_ROTATE_MB = get_int("AUDIT_ROTATE_MB", 64)
+AUDIT_ROTATE_DAILY = get_str("AUDIT_ROTATE_DAILY", "false").lower() == "true"
+# Stockage de l'audit : "jsonl" (AUDIT_JSON, agrégats incrémentaux) | "sqlite" (AUDIT_DB) | "both"
+AUDIT_BACKEND = get_str("AUDIT_BACKEND", "jsonl").lower()
+AUDIT_DB = get_str("AUDIT_DB", os.path.join(LOG_FILE_PATH, "runs.sqlite3"))
+# Agrégats du journal JSONL (stats et tendances sans SQLite) : checkpoint et jours conservés
+AUDIT_AGGREGATE_PATH = get_str("AUDIT_AGGREGATE_PATH", os.path.join(LOG_FILE_PATH, "cache", "audit_aggregates.json"))
+AUDIT_AGGREGATE_DAYS = get_int("AUDIT_AGGREGATE_DAYS", 31)
+# Tendances du résumé : fenêtre (jours) comparée à la précédente, 0 = désactivé
+AUDIT_TREND_DAYS = get_int("AUDIT_TREND_DAYS", 7)
 
 CRON_INTERVAL_MINUTES = get_int("CRON_INTERVAL_MINUTES", 0)
+# Timeout strict : délai entre SIGTERM et SIGKILL du groupe de process (surchargeable par `timeout_grace`)
+TIMEOUT_GRACE_SECONDS = get_int("TIMEOUT_GRACE_SECONDS", 10)
+# Timeout soft : délai (plus long) avant SIGKILL d'une tâche qui ignore SIGTERM (surchargeable par `timeout_grace`)
+TIMEOUT_SOFT_GRACE_SECONDS = get_int("TIMEOUT_SOFT_GRACE_SECONDS", 300)
+# `timeout: auto` : quantile des durées réussies (%) des DURATION_HISTORY_DAYS derniers jours, majoré d'une marge (%),
+# au moins TIMEOUT_AUTO_MIN_SECONDS ; sous TIMEOUT_AUTO_MIN_RUNS exécutions connues : TIMEOUT_AUTO_DEFAULT (0 = aucun)
+TIMEOUT_AUTO_PERCENTILE = get_int("TIMEOUT_AUTO_PERCENTILE", 99)
+TIMEOUT_AUTO_MARGIN_PERCENT = get_int("TIMEOUT_AUTO_MARGIN_PERCENT", 50)
+TIMEOUT_AUTO_MIN_SECONDS = get_int("TIMEOUT_AUTO_MIN_SECONDS", 60)
+TIMEOUT_AUTO_MIN_RUNS = get_int("TIMEOUT_AUTO_MIN_RUNS", 5)
+TIMEOUT_AUTO_DEFAULT = get_int("TIMEOUT_AUTO_DEFAULT", 3600)
+DURATION_HISTORY_DAYS = get_int("DURATION_HISTORY_DAYS", 14)
+# Ordre de lancement des tâches dues (à priorité égale) : "yaml" (ordre des fichiers) | "longest_first" (historique)
+LAUNCH_ORDER = get_str("LAUNCH_ORDER", "yaml").lower()
+# Détection des régressions (statut de notification "slow") : fenêtre glissante des N derniers succès par tâche,
+# alerte au-delà de médiane + k × MAD et d'au moins +X % (et +S secondes pour durée et CPU) ; min. de runs connus
+REGRESSION_DETECTION = get_bool("REGRESSION_DETECTION", "true")
+REGRESSION_WINDOW = get_int("REGRESSION_WINDOW", 30)
+REGRESSION_MIN_RUNS = get_int("REGRESSION_MIN_RUNS", 10)
+REGRESSION_MAD_FACTOR = get_int("REGRESSION_MAD_FACTOR", 3)
+REGRESSION_MIN_INCREASE_PERCENT = get_int("REGRESSION_MIN_INCREASE_PERCENT", 50)
+REGRESSION_MIN_SECONDS = get_int("REGRESSION_MIN_SECONDS", 5)
+REGRESSION_STATE_DIR = get_str("REGRESSION_STATE_DIR", os.path.join(LOG_FILE_PATH, "cache", "baselines"))
+# Métriques Prometheus/OpenMetrics : fichier du textfile collector (réécrit à chaque run, vide = désactivé),
+# état cumulé entre runs, endpoint HTTP du mode daemon ("127.0.0.1:9464", vide = désactivé)
+METRICS_TEXTFILE = get_str("METRICS_TEXTFILE", "")
+METRICS_STATE_PATH = get_str("METRICS_STATE_PATH", os.path.join(LOG_FILE_PATH, "cache", "metrics_state.json"))
+METRICS_HTTP_ADDR = get_str("METRICS_HTTP_ADDR", "")
+# Moteur d'exécution des scripts : "threads" (2 threads lecteurs par tâche) ou "asyncio" (une seule boucle)
+EXECUTION_ENGINE = get_str("EXECUTION_ENGINE", "threads").lower()
+# Concurrence : plafond global et par projet (0 = illimité), projet = YAML (source_file) ou interpréteur
+MAX_PARALLEL = get_int("MAX_PARALLEL", 0)
+MAX_PARALLEL_PER_PROJECT = get_int("MAX_PARALLEL_PER_PROJECT", 0)
+PROJECT_MAX_PARALLEL = get_str("PROJECT_MAX_PARALLEL", "")  # ex: "projet1=2,projet2=1"
+PARALLEL_GROUP_BY = get_str("PARALLEL_GROUP_BY", "source_file")  # "source_file" | "interpreter"
+# Nettoyages (cleanup) exécutés en arrière-plan : nombre de threads du pool
+CLEANUP_WORKERS = get_int("CLEANUP_WORKERS", 2)
+# Cleanup `compress_after_days` : nombre de process de compression par passe
+CLEANUP_COMPRESS_WORKERS = get_int("CLEANUP_COMPRESS_WORKERS", 2)
+# Priorité I/O des threads/process de cleanup (idle, best-effort ; vide = inchangée)
+CLEANUP_IONICE_CLASS = get_str("CLEANUP_IONICE_CLASS", "idle")
+# Cleanup `time_budget_seconds` : points de reprise des passes interrompues
+CLEANUP_STATE_DIR = get_str("CLEANUP_STATE_DIR", os.path.join(LOG_FILE_PATH, "cache", "cleanup"))
+# Mode daemon : rechargement des seuls YAML modifiés (inotify, sinon polling toutes les N s ; 0 = désactivé)
+TASKS_WATCH_INTERVAL = get_int("TASKS_WATCH_INTERVAL", 5)
 
 WARNINGS_AS_FAILURE = get_str("WARNINGS_AS_FAILURE", "false")
 SEND_SUMMARY_DISCORD = get_str("SEND_SUMMARY_DISCORD", "false").lower() == "true"
@@ -0,0 +1,436 @@
+# utils/history.py
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+import contextlib
+import json
+import math
+from pathlib import Path
+import time
+from typing import TYPE_CHECKING, Any, TypedDict
+
+from utils.audit import RunRecord
+from utils.config import AUDIT_FSYNC
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# Histogramme des durées : buckets logarithmiques (8 par doublement, ~9 % de largeur) à partir de 1 ms
+BUCKET_MIN = 0.001
+BUCKETS_PER_DOUBLING = 8
+IMPORT_BATCH = 50000
+IMPORT_CACHE_KB = 256 * 1024
+SCHEMA_VERSION = 1  # PRAGMA user_version : migrations de données déjà appliquées (1 = daily_ok_hist rempli)
+
+_COLUMNS = (
+    "ts",
+    "run_id",
+    "script",
+    "source_file",
+    "status",
+    "duration",
+    "queue_wait",
+    "returncode",
+    "cpu_user",
+    "cpu_sys",
+    "max_rss_kb",
+    "io_read_bytes",
+    "io_write_bytes",
+    "timed_out",
+    "limit_hit",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    run_id TEXT NOT NULL,
+    script TEXT NOT NULL,
+    source_file TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL,
+    duration REAL NOT NULL DEFAULT 0,
+    queue_wait REAL,
+    returncode INTEGER,
+    cpu_user REAL,
+    cpu_sys REAL,
+    max_rss_kb INTEGER,
+    io_read_bytes INTEGER,
+    io_write_bytes INTEGER,
+    timed_out INTEGER NOT NULL DEFAULT 0,
+    limit_hit TEXT,
+    day TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS runs_run_ts ON runs (run_id, ts);
+CREATE INDEX IF NOT EXISTS runs_script_ts ON runs (script, ts);
+CREATE INDEX IF NOT EXISTS runs_source_ts ON runs (source_file, ts);
+CREATE INDEX IF NOT EXISTS runs_status_ts ON runs (status, ts);
+CREATE INDEX IF NOT EXISTS runs_ts ON runs (ts);
+
+-- Agrégats journaliers tenus à jour par trigger : `stats` ne lit jamais la table runs
+CREATE TABLE IF NOT EXISTS daily (
+    script TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    day TEXT NOT NULL,
+    runs INTEGER NOT NULL,
+    failures INTEGER NOT NULL,
+    total_duration REAL NOT NULL,
+    max_duration REAL NOT NULL,
+    last_ts REAL NOT NULL,
+    last_status TEXT NOT NULL,
+    PRIMARY KEY (script, source_file, day)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS daily_day ON daily (day);
+CREATE TABLE IF NOT EXISTS daily_hist (
+    script TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    day TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (script, source_file, day, bucket)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS runs_aggregate AFTER INSERT ON runs BEGIN
+    INSERT INTO daily VALUES (
+        NEW.script, NEW.source_file, NEW.day, 1, NEW.status NOT IN ('success', 'success_with_warnings'),  -- échec
+        NEW.duration, NEW.duration, NEW.ts, NEW.status
+    )
+    ON CONFLICT (script, source_file, day) DO UPDATE SET
+        runs = runs + 1,
+        failures = failures + excluded.failures,
+        total_duration = total_duration + excluded.total_duration,
+        max_duration = max(max_duration, excluded.max_duration),
+        last_status = CASE WHEN excluded.last_ts >= last_ts THEN excluded.last_status ELSE last_status END,
+        last_ts = max(last_ts, excluded.last_ts);
+    INSERT INTO daily_hist VALUES (NEW.script, NEW.source_file, NEW.day, NEW.bucket, 1)
+    ON CONFLICT (script, source_file, day, bucket) DO UPDATE SET n = n + 1;
+END;
+
+-- Histogramme des seules exécutions réussies : durées attendues (ordre de lancement, timeout: auto)
+CREATE TABLE IF NOT EXISTS daily_ok_hist (
+    script TEXT NOT NULL,
+    source_file TEXT NOT NULL,
+    day TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (script, source_file, day, bucket)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS runs_aggregate_ok AFTER INSERT ON runs
+WHEN NEW.status IN ('success', 'success_with_warnings') BEGIN
+    INSERT INTO daily_ok_hist VALUES (NEW.script, NEW.source_file, NEW.day, NEW.bucket, 1)
+    ON CONFLICT (script, source_file, day, bucket) DO UPDATE SET n = n + 1;
+END;
+"""
+
+
+class TaskStats(TypedDict):
+    script: str
+    source_file: str
+    runs: int
+    failures: int
+    failure_rate: float
+    avg: float
+    p50: float
+    p95: float
+    max: float
+    last_ts: float
+    last_status: str
+
+
+class DurationProfile(TypedDict):
+    runs: int  # exécutions réussies
+    p50: float
+    high: float  # quantile demandé (voir duration_profiles)
+
+
+def duration_bucket(duration: float) -> int:
+    """
+    Bucket logarithmique d'une durée (0 pour < 1 ms).
+    """
+    if duration <= BUCKET_MIN:
+        return 0
+    return 1 + int(math.log2(duration / BUCKET_MIN) * BUCKETS_PER_DOUBLING)
+
+
+def bucket_value(bucket: int) -> float:
+    """
+    Durée représentative d'un bucket (moyenne géométrique de ses bornes).
+    """
+    if bucket <= 0:
+        return 0.0
+    return BUCKET_MIN * 2 ** ((bucket - 0.5) / BUCKETS_PER_DOUBLING)
+
+
+def _row(rec: RunRecord | dict[str, Any], raw: str | None = None) -> tuple[Any, ...] | None:
+    # Record d'audit -> ligne de la table runs (None si incomplet) ; `raw` : ligne JSONL d'origine, si connue
+    try:
+        ts = float(rec["ts"])
+        duration = float(rec.get("duration") or 0.0)
+        values = {
+            **rec,
+            "ts": ts,
+            "duration": duration,
+            "source_file": rec.get("source_file") or "",
+            "timed_out": int(bool(rec.get("timed_out"))),
+            "limit_hit": rec.get("limit"),
+            "run_id": rec.get("run_id") or _legacy_run_id(rec),
+        }
+        return (
+            *(values.get(col) for col in _COLUMNS),
+            time.strftime("%Y-%m-%d", time.localtime(ts)),
+            duration_bucket(duration),
+            raw.rstrip("\n") if raw is not None else json.dumps(rec, ensure_ascii=False),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _legacy_run_id(rec: RunRecord | dict[str, Any]) -> str:
+    # Records écrits avant l'ajout de run_id : identifiant déterministe (réimporter ne crée pas de doublon)
+    import hashlib
+
+    digest = hashlib.sha1(json.dumps(rec, ensure_ascii=False, sort_keys=True).encode("utf-8"), usedforsecurity=False)
+    return f"legacy-{digest.hexdigest()[:16]}"
+
+
+class HistoryStore:
+    """
+    Historique des exécutions en SQLite (AUDIT_BACKEND=sqlite|both).
+
+    Table `runs` indexée sur script, source_file, status et ts ; des triggers tiennent à jour des agrégats
+    journaliers (compteurs, durée max, histogramme log des durées) pour que `cronboss stats` réponde en
+    quelques millisecondes, quel que soit le nombre d'exécutions. Mode WAL : plusieurs process CronBoss
+    peuvent écrire (busy_timeout) pendant qu'un autre lit.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        """
+        :param path: Base SQLite (AUDIT_DB), créée si absente.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        import sqlite3  # importé seulement quand l'historique SQLite est utilisé
+
+        self.conn: sqlite3.Connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        synchronous = {"always": "FULL", "batch": "NORMAL", "never": "OFF"}.get(AUDIT_FSYNC, "NORMAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.executescript(_SCHEMA)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            self._migrate()
+
+    def append(self, records: Iterable[RunRecord | dict[str, Any]]) -> int:
+        """
+        Insère des records d'audit en une transaction (doublons run_id/ts ignorés).
+
+        :return: Nombre de records insérés.
+        """
+        return self._insert([row for rec in records if (row := _row(rec)) is not None])
+
+    def _insert(self, rows: list[tuple[Any, ...]]) -> int:
+        if not rows:
+            return 0
+        placeholders = ", ".join("?" * (len(_COLUMNS) + 3))
+        with self._transaction():
+            # rowcount ne compte que les lignes de runs (pas celles écrites par les triggers)
+            cursor = self.conn.executemany(
+                f"INSERT OR IGNORE INTO runs ({', '.join(_COLUMNS)}, day, bucket, record) VALUES ({placeholders})",
+                rows,
+            )
+        return max(cursor.rowcount, 0)
+
+    def import_jsonl(self, files: Iterable[Path]) -> tuple[int, int]:
+        """
+        Importe des journaux d'audit JSONL (segments .gz compris) ; réimporter un fichier ne crée pas de doublon.
+        Les records antérieurs à run_id reçoivent un identifiant dérivé de leur contenu.
+
+        :return: (records lus, records insérés).
+        """
+        read = inserted = 0
+        batch: list[tuple[Any, ...]] = []
+        # Import ponctuel : gros cache de pages, pas de synchronisation disque par transaction
+        synchronous = self.conn.execute("PRAGMA synchronous").fetchone()[0]
+        self.conn.execute(f"PRAGMA cache_size=-{IMPORT_CACHE_KB}")
+        self.conn.execute("PRAGMA synchronous=OFF")
+        try:
+            for file in files:
+                for rec, line in _read_jsonl(file):
+                    read += 1
+                    row = _row(rec, line)
+                    if row is not None:
+                        batch.append(row)
+                    if len(batch) >= IMPORT_BATCH:
+                        inserted += self._insert(batch)
+                        batch = []
+            if batch:
+                inserted += self._insert(batch)
+        finally:
+            self.conn.execute(f"PRAGMA synchronous={synchronous}")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return read, inserted
+
+    def stats(
+        self, days: int = 30, script: str | None = None, source_file: str | None = None, offset_days: int = 0
+    ) -> list[TaskStats]:
+        """
+        Statistiques par tâche sur les `days` derniers jours (aujourd'hui inclus), depuis les agrégats journaliers.
+
+        Les percentiles viennent de l'histogramme des durées (précision ~5 %), bornés par la durée max.
+
+        :param days: Fenêtre en jours.
+        :param script: Filtre sur le script (chemin exact, nom ou nom sans extension).
+        :param source_file: Filtre sur le fichier YAML source.
+        :param offset_days: Décale la fenêtre dans le passé (7 = les `days` jours finissant il y a 7 jours).
+        """
+        since, until = window_days(days, offset_days)
+        where = ["day BETWEEN ? AND ?"]
+        params: list[Any] = [since, until]
+        if source_file:
+            where.append("source_file = ?")
+            params.append(source_file)
+        clause = " AND ".join(where)
+
+        totals = self.conn.execute(
+            f"""
+            SELECT script, source_file, sum(runs), sum(failures), sum(total_duration), max(max_duration), max(last_ts)
+            FROM daily WHERE {clause} GROUP BY script, source_file
+            """,
+            params,
+        ).fetchall()
+        hist: dict[tuple[str, str], list[tuple[int, int]]] = {}
+        for name, src, bucket, n in self.conn.execute(
+            f"""
+            SELECT script, source_file, bucket, sum(n) FROM daily_hist WHERE {clause}
+            GROUP BY script, source_file, bucket ORDER BY script, source_file, bucket
+            """,
+            params,
+        ):
+            hist.setdefault((name, src), []).append((bucket, n))
+
+        out: list[TaskStats] = []
+        for name, src, runs, failures, total, max_duration, last_ts in totals:
+            if script and script not in {name, Path(name).name, Path(name).stem}:
+                continue
+            last_status = self.conn.execute(
+                "SELECT last_status FROM daily WHERE script = ? AND source_file = ? AND last_ts = ?",
+                (name, src, last_ts),
+            ).fetchone()
+            buckets = hist.get((name, src), [])
+            out.append(
+                {
+                    "script": name,
+                    "source_file": src,
+                    "runs": runs,
+                    "failures": failures,
+                    "failure_rate": failures / runs if runs else 0.0,
+                    "avg": total / runs if runs else 0.0,
+                    "p50": min(histogram_percentile(buckets, runs, 0.50), max_duration),
+                    "p95": min(histogram_percentile(buckets, runs, 0.95), max_duration),
+                    "max": max_duration,
+                    "last_ts": last_ts,
+                    "last_status": last_status[0] if last_status else "",
+                }
+            )
+        return out
+
+    def duration_profiles(self, days: int, quantile: float) -> dict[tuple[str, str], DurationProfile]:
+        """
+        Durées des exécutions réussies par tâche (script, source_file) sur les `days` derniers jours.
+
+        :param days: Fenêtre en jours.
+        :param quantile: Quantile « haut » (0.99 = p99).
+        """
+        hist: dict[tuple[str, str], list[tuple[int, int]]] = {}
+        for name, src, bucket, n in self.conn.execute(
+            """
+            SELECT script, source_file, bucket, sum(n) FROM daily_ok_hist WHERE day BETWEEN ? AND ?
+            GROUP BY script, source_file, bucket ORDER BY script, source_file, bucket
+            """,
+            window_days(days),
+        ):
+            hist.setdefault((name, src), []).append((bucket, n))
+        return {key: duration_profile(buckets, quantile) for key, buckets in hist.items()}
+
+    def close(self) -> None:
+        """
+        Ferme la connexion.
+        """
+        self.conn.close()
+
+    def _migrate(self) -> None:
+        # Une seule fois par base (marqueur PRAGMA user_version, relu sous verrou : un autre process a pu migrer)
+        with self._transaction():
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < 1:
+                # Base créée avant daily_ok_hist : histogramme reconstruit depuis la table runs
+                self.conn.execute(
+                    """
+                    INSERT OR IGNORE INTO daily_ok_hist
+                    SELECT script, source_file, day, bucket, count(*) FROM runs
+                    WHERE status IN ('success', 'success_with_warnings') GROUP BY script, source_file, day, bucket
+                    """
+                )
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[None]:
+        # BEGIN IMMEDIATE : le verrou d'écriture est pris d'emblée (attente busy_timeout si un autre process écrit)
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+
+def window_days(days: int, offset_days: int = 0) -> tuple[str, str]:
+    """
+    Bornes (YYYY-MM-DD, incluses) d'une fenêtre de `days` jours finissant il y a `offset_days` jours.
+    """
+    now = time.time()
+    return (
+        time.strftime("%Y-%m-%d", time.localtime(now - (offset_days + days - 1) * 86400)),
+        time.strftime("%Y-%m-%d", time.localtime(now - offset_days * 86400)),
+    )
+
+
+def duration_profile(buckets: list[tuple[int, int]], quantile: float) -> DurationProfile:
+    """
+    Profil de durée (p50 et quantile haut) d'un histogramme de durées réussies (buckets triés).
+    """
+    runs = sum(n for _, n in buckets)
+    return {
+        "runs": runs,
+        "p50": histogram_percentile(buckets, runs, 0.50),
+        "high": histogram_percentile(buckets, runs, quantile),
+    }
+
+
+def histogram_percentile(buckets: list[tuple[int, int]], total: int, q: float) -> float:
+    """
+    Quantile `q` d'un histogramme (buckets triés) : premier bucket où l'effectif cumulé atteint q * total.
+    """
+    rank = max(1, math.ceil(q * total))
+    seen = 0
+    for bucket, n in buckets:
+        seen += n
+        if seen >= rank:
+            return bucket_value(bucket)
+    return bucket_value(buckets[-1][0]) if buckets else 0.0
+
+
+def _read_jsonl(file: Path) -> Iterator[tuple[dict[str, Any], str]]:
+    import gzip
+
+    opener = gzip.open if file.suffix == ".gz" else open
+    with opener(file, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # ligne partielle (écriture concurrente interrompue)
+            if isinstance(rec, dict):
+                yield rec, line
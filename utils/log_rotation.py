@@ -33,3 +33,32 @@ def rotate_logs(log_dir: str, keep_days: int = 30, logf: str | None = None) -> N
                     log(f"[LOG ROTATION] Supprimé : {filepath}")
                 except Exception as e:
                     log(f"[LOG ROTATION] Erreur suppression {filepath} : {e}")
+
+
+ROTATION_MARKER = ".last_rotation"
+
+
+def rotate_logs_daily(log_dir: str, keep_days: int = 30, logf: str | None = None) -> bool:
+    """
+    Comme rotate_logs, mais au plus une fois par jour et par dossier (fichier marqueur `.last_rotation`).
+
+    Évite de relister tout le dossier de logs à chaque démarrage / chaque logger.
+
+    :return: True si la rotation a été faite, False si elle avait déjà eu lieu aujourd'hui.
+    """
+    marker = os.path.join(log_dir, ROTATION_MARKER)
+    today = time.strftime("%Y-%m-%d")
+    try:
+        if time.strftime("%Y-%m-%d", time.localtime(os.path.getmtime(marker))) == today:
+            return False
+    except OSError:
+        pass  # premier passage (ou dossier absent : rotate_logs le signale)
+
+    rotate_logs(log_dir, keep_days, logf=logf)
+    try:
+        with open(marker, "a", encoding="utf-8"):
+            pass
+        os.utime(marker)
+    except OSError:
+        pass
+    return True
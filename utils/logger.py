@@ -3,20 +3,22 @@ import logging
 import os
 
 from utils.config import LOG_FILE_PATH, LOG_ROTATION_DAYS
-from utils.log_rotation import rotate_logs
+from utils.log_rotation import rotate_logs_daily
 
 
-def get_logger(name: str) -> logging.Logger:
-    rotation_days = int(LOG_ROTATION_DAYS)
-
-    os.makedirs(LOG_FILE_PATH, exist_ok=True)
-    log_file = os.path.join(LOG_FILE_PATH, f"{datetime.now().strftime('%Y-%m-%d')}_{name.split('.')[0]}.log")
+def _log_file_for(name: str) -> str:
+    return os.path.join(LOG_FILE_PATH, f"{datetime.now().strftime('%Y-%m-%d')}_{name.split('.')[0]}.log")
 
-    rotate_logs(LOG_FILE_PATH, rotation_days, logf=log_file)
 
+def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
 
     if not logger.handlers:
+        # Premier appel pour ce logger : les suivants (un par module importé) ne touchent pas au disque
+        os.makedirs(LOG_FILE_PATH, exist_ok=True)
+        log_file = _log_file_for(name)
+        rotate_logs_daily(LOG_FILE_PATH, int(LOG_ROTATION_DAYS), logf=log_file)
+
         logger.setLevel(logging.INFO)
 
         formatter = logging.Formatter("%(asctime)s - %(levelname)s - [%(name)s - PID:%(process)d] %(message)s")
@@ -32,3 +34,22 @@ def get_logger(name: str) -> logging.Logger:
         logger.addHandler(file_handler)
 
     return logger
+
+
+def roll_daily_file(name: str) -> None:
+    """
+    Rebascule le fichier de log d'un logger sur le fichier du jour (process longue durée).
+
+    Sans effet si le logger écrit déjà dans le fichier du jour.
+    """
+    logger = logging.getLogger(name)
+    log_file = os.path.abspath(_log_file_for(name))
+    for handler in list(logger.handlers):
+        if not isinstance(handler, logging.FileHandler) or handler.baseFilename == log_file:
+            continue
+        new_handler = logging.FileHandler(log_file, encoding="utf-8")
+        new_handler.setFormatter(handler.formatter)
+        logger.addHandler(new_handler)
+        logger.removeHandler(handler)
+        handler.close()
+        rotate_logs_daily(LOG_FILE_PATH, int(LOG_ROTATION_DAYS), logf=log_file)
@@ -0,0 +1,256 @@
+# utils/metrics.py
+from __future__ import annotations
+
+import bisect
+import fcntl
+import json
+import os
+from pathlib import Path
+import threading
+from typing import TYPE_CHECKING, Any
+
+from utils.config import METRICS_HTTP_ADDR, METRICS_STATE_PATH, METRICS_TEXTFILE
+from utils.logger import get_logger
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+logger = get_logger("CronBoss")
+
+DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0, 1800.0, 3600.0, 7200.0)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Nom -> (type, aide, buckets) ; les compteurs sont nommés sans le suffixe _total (ajouté au rendu)
+METRICS: dict[str, tuple[str, str, tuple[float, ...]]] = {
+    "cronboss_task_duration_seconds": ("histogram", "Durée des exécutions de tâche", DURATION_BUCKETS),
+    "cronboss_task_queue_wait_seconds": ("histogram", "Attente en file d'admission avant lancement", DURATION_BUCKETS),
+    "cronboss_task_launch_latency_seconds": ("histogram", "Délai entre l'échéance et le lancement", LATENCY_BUCKETS),
+    "cronboss_task_runs": ("counter", "Exécutions terminées, par statut", ()),
+    "cronboss_task_last_run_timestamp_seconds": ("gauge", "Fin de la dernière exécution", ()),
+    "cronboss_task_last_run_success": ("gauge", "Dernière exécution réussie (1) ou non (0)", ()),
+    "cronboss_lock_skips": ("counter", "Lancements abandonnés : lock d'exclusivité déjà pris", ()),
+    "cronboss_tick_duration_seconds": ("histogram", "Durée d'un tick jusqu'aux lancements", LATENCY_BUCKETS),
+    "cronboss_running_tasks": ("gauge", "Tâches en cours d'exécution", ()),
+    "cronboss_notifier_latency_seconds": ("histogram", "Durée d'envoi d'une notification", LATENCY_BUCKETS),
+}
+PROCESS_GAUGES = {"cronboss_running_tasks"}  # état du process : ni cumulé ni écrit dans le textfile
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """
+    Métriques du scheduler et des tâches (compteurs, jauges, histogrammes étiquetés), exposées au format
+    Prometheus/OpenMetrics.
+
+    Deux expositions : un fichier pour le textfile collector de node_exporter (METRICS_TEXTFILE), réécrit
+    atomiquement à la fin de chaque run en cumulant les runs précédents (état METRICS_STATE_PATH, sous flock),
+    et un endpoint HTTP local en mode daemon (METRICS_HTTP_ADDR). Sans l'un ni l'autre, rien n'est collecté.
+    """
+
+    def __init__(self, enabled: bool = bool(METRICS_TEXTFILE or METRICS_HTTP_ADDR)) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._values: dict[str, dict[Labels, Any]] = {}  # valeurs du process (endpoint HTTP)
+        self._pending: dict[str, dict[Labels, Any]] = {}  # depuis la dernière écriture du textfile
+        self._server: ThreadingHTTPServer | None = None
+
+    def inc(self, name: str, **labels: str) -> None:
+        """
+        Incrémente un compteur.
+        """
+        if self.enabled:
+            key = _labels(labels)
+            with self._lock:
+                for store in (self._values, self._pending):
+                    series = store.setdefault(name, {})
+                    series[key] = series.get(key, 0.0) + 1
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """
+        Fixe une jauge.
+        """
+        if self.enabled:
+            key = _labels(labels)
+            with self._lock:
+                for store in (self._values, self._pending):
+                    store.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """
+        Ajoute une observation à un histogramme.
+        """
+        if not self.enabled:
+            return
+        buckets = METRICS[name][2]
+        key = _labels(labels)
+        slot = bisect.bisect_left(buckets, value)  # bucket "le" le plus petit >= value (len = +Inf)
+        with self._lock:
+            for store in (self._values, self._pending):
+                hist = store.setdefault(name, {}).get(key)
+                if hist is None:
+                    hist = store[name][key] = {"counts": [0] * (len(buckets) + 1), "sum": 0.0}
+                hist["counts"][slot] += 1
+                hist["sum"] += value
+
+    def render(self, openmetrics: bool = False) -> str:
+        """
+        Exposition texte des métriques du process (format Prometheus 0.0.4, ou OpenMetrics 1.0).
+        """
+        with self._lock:
+            return _render(self._values, openmetrics)
+
+    def write_textfile(self, path: str | Path = METRICS_TEXTFILE, state_path: str | Path = METRICS_STATE_PATH) -> None:
+        """
+        Cumule les métriques depuis la dernière écriture dans l'état partagé, puis réécrit atomiquement le
+        fichier du textfile collector (plusieurs process CronBoss peuvent écrire : verrou sur l'état).
+        """
+        if not self.enabled or not path:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        state_file = Path(state_path)
+        target = Path(path)
+        tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+        try:
+            state_file.parent.mkdir(parents=True, exist_ok=True)
+            with os.fdopen(os.open(state_file, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644), "r+") as fh:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+                state = _load_state(fh.read(), state_file)
+                _merge(state, pending)
+                fh.seek(0)
+                fh.truncate()
+                json.dump({name: [[key, value] for key, value in series.items()] for name, series in state.items()}, fh)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp.write_text(_render(state, openmetrics=False), encoding="utf-8")
+                os.replace(tmp, target)
+        except OSError as exc:
+            logger.warning("⚠️ Métriques non écrites (%s) : %s", target, exc)
+            tmp.unlink(missing_ok=True)
+
+    def serve(self, address: str = METRICS_HTTP_ADDR) -> None:
+        """
+        Démarre l'endpoint HTTP /metrics (thread dédié) sur "hôte:port" (mode daemon).
+        """
+        if not address or self._server is not None:
+            return
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+                body = registry.render(openmetrics).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug("Métriques HTTP : " + format, *args)
+
+        host, _, port = address.rpartition(":")
+        try:
+            self._server = ThreadingHTTPServer((host or "127.0.0.1", int(port)), Handler)
+        except (OSError, ValueError) as exc:
+            logger.error("❌ Endpoint de métriques non démarré (%s) : %s", address, exc)
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        logger.info("📈 Métriques exposées sur http://%s:%s/metrics", host or "127.0.0.1", port)
+
+    def shutdown(self) -> None:
+        """
+        Arrête l'endpoint HTTP s'il tourne.
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _load_state(raw: str, path: Path) -> dict[str, dict[Labels, Any]]:
+    if not raw:
+        return {}
+    try:
+        return {
+            name: {tuple((k, v) for k, v in key): value for key, value in series}
+            for name, series in json.loads(raw).items()
+            if name in METRICS
+        }
+    except (ValueError, TypeError, AttributeError) as exc:
+        logger.warning("⚠️ État des métriques illisible (%s), compteurs remis à zéro : %s", path, exc)
+        return {}
+
+
+def _merge(state: dict[str, dict[Labels, Any]], pending: dict[str, dict[Labels, Any]]) -> None:
+    # Compteurs et histogrammes s'additionnent, les jauges sont remplacées
+    for name, series in pending.items():
+        kind = METRICS[name][0]
+        if name in PROCESS_GAUGES:
+            continue
+        target = state.setdefault(name, {})
+        for key, value in series.items():
+            previous = target.get(key)
+            if kind == "counter" and previous is not None:
+                target[key] = previous + value
+            elif kind == "histogram" and previous is not None and len(previous["counts"]) == len(value["counts"]):
+                previous["counts"] = [a + b for a, b in zip(previous["counts"], value["counts"], strict=True)]
+                previous["sum"] += value["sum"]
+            else:
+                target[key] = value
+
+
+def _render(values: dict[str, dict[Labels, Any]], openmetrics: bool) -> str:
+    lines: list[str] = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        series = values.get(name)
+        if not series:
+            continue
+        family = name if kind != "counter" or openmetrics else f"{name}_total"
+        lines.append(f"# HELP {family} {help_text}")
+        lines.append(f"# TYPE {family} {kind}")
+        for key, value in sorted(series.items()):
+            if kind == "counter":
+                lines.append(f"{name}_total{_format_labels(key)} {_number(value)}")
+            elif kind == "gauge":
+                lines.append(f"{name}{_format_labels(key)} {_number(value)}")
+            else:
+                cumulative = 0
+                for bound, count in zip((*buckets, float("inf")), value["counts"], strict=True):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _number(bound)
+                    lines.append(f"{name}_bucket{_format_labels((*key, ('le', le)))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(key)} {_number(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(key)} {cumulative}")
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def _format_labels(key: Labels) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+metrics = MetricsRegistry()
@@ -1,15 +1,19 @@
 # utils/normalizer.py
 from __future__ import annotations
 
-from typing import Any, Literal, cast
+import re
+from typing import Any, cast
 
 from utils.logger import get_logger
 from utils.types import (
     CleanupCfg,
     DaysField,
     HoursField,
+    LimitsCfg,
     MinutesField,
     NotificationsCfg,
+    NotifyOn,
+    ScheduleMasks,
     TaskWithSource,
     WeekdaySpec,
 )
@@ -34,6 +38,25 @@ def _as_bool(value: Any, default: bool) -> bool:
     return default
 
 
+_SIZE_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+
+
+def _parse_size(value: Any) -> int | None:
+    """
+    Taille en octets : entier, ou chaîne "500M", "10G", "1.5 GiB", "200kb" (unités binaires).
+
+    Valeurs non conformes -> None.
+    """
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value if value >= 0 else None
+    if not isinstance(value, str):
+        return None
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmgt]?)(?:i?b)?\s*", value.lower())
+    if match is None:
+        return None
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
 _warned_day_spec_once = False
 
 
@@ -123,14 +146,74 @@ def _normalize_days(value: Any) -> DaysField:
     return lst if lst else "any"
 
 
+ALL_MINUTES = (1 << 60) - 1
+ALL_HOURS = (1 << 24) - 1
+ALL_DAYS = (1 << 31) - 1
+ALL_WEEKDAYS = (1 << 7) - 1
+
+
+def _to_mask(values: list[int], low: int, high: int, field: str) -> int:
+    """
+    Convertit une liste d'entiers en masque de bits (bit 0 = valeur `low`).
+
+    Les valeurs hors [low, high] sont ignorées avec un warning.
+    """
+    mask = 0
+    for v in values:
+        if low <= v <= high:
+            mask |= 1 << (v - low)
+        else:
+            LOGGER.warning("%s hors plage [%s..%s]: %r (ignorée)", field, low, high, v)
+    return mask
+
+
+def compile_schedule(hours: HoursField, minutes: MinutesField, days: DaysField) -> ScheduleMasks:
+    """
+    Compile une planification normalisée en masques de bits.
+
+    - hours "any" / minutes [] → tous les bits
+    - days [..] → jours du mois (jours de semaine libres)
+    - days {"weekday": [..]} → jours de semaine (jours du mois libres)
+
+    :return: ScheduleMasks (minutes 60 bits, heures 24 bits, jours 31 bits, semaine 7 bits).
+    """
+    day_mask = ALL_DAYS
+    weekday_mask = ALL_WEEKDAYS
+    if isinstance(days, list):
+        day_mask = _to_mask(days, 1, 31, "days")
+    elif isinstance(days, dict):
+        weekday_mask = _to_mask(days.get("weekday", []), 0, 6, "days.weekday")
+    elif days != "any":
+        day_mask = 0
+
+    return {
+        "minutes": _to_mask(minutes, 0, 59, "minutes") if minutes else ALL_MINUTES,
+        "hours": ALL_HOURS if hours == "any" else _to_mask(hours, 0, 23, "hours"),
+        "days": day_mask,
+        "weekdays": weekday_mask,
+    }
+
+
 def _normalize_cleanup(value: Any) -> CleanupCfg | None:
     """
     cleanup:
       paths: [str]
       rule:
+        keep_last: int
         keep_days: int
-        extensions: [str]
+        extensions: "all" | [str]
         recursive: bool
+        dry_run: bool
+        max_total_size: int | "500M" | "10G"
+        compress_after_days: int
+        compress_format: "gzip" | "zstd"
+        max_files_per_second: int
+        max_bytes_per_second: int | "50M"
+        time_budget_seconds: int
+      schedule:            # optionnel, même syntaxe que la tâche (défaut : planification de la tâche)
+        hours: "any" | [int]
+        minutes: [int]
+        days: "any" | [int] | {"weekday": [int]}
     Valeurs invalides -> None ou champs ignorés.
     """
     if not isinstance(value, dict):
@@ -145,35 +228,107 @@ def _normalize_cleanup(value: Any) -> CleanupCfg | None:
     rule_val = value.get("rule")
     rule: dict[str, Any] = {}
     if isinstance(rule_val, dict):
-        if isinstance(rule_val.get("keep_days"), int):
-            rule["keep_days"] = rule_val["keep_days"]
+        for key in ("keep_last", "keep_days"):
+            if isinstance(rule_val.get(key), int) and not isinstance(rule_val.get(key), bool):
+                rule[key] = rule_val[key]
         ext_val = rule_val.get("extensions")
         if isinstance(ext_val, list):
             rule["extensions"] = [e for e in ext_val if isinstance(e, str)]
+        elif ext_val == "all":
+            rule["extensions"] = "all"
         rule["recursive"] = _as_bool(rule_val.get("recursive"), False)
+        rule["dry_run"] = _as_bool(rule_val.get("dry_run"), False)
+        if "max_total_size" in rule_val:
+            size = _parse_size(rule_val["max_total_size"])
+            if size is None:
+                LOGGER.warning("cleanup.rule.max_total_size invalide: %r (ignoré)", rule_val["max_total_size"])
+            else:
+                rule["max_total_size"] = size
+        for key in ("max_files_per_second", "time_budget_seconds"):
+            val = rule_val.get(key)
+            if isinstance(val, int) and not isinstance(val, bool) and val > 0:
+                rule[key] = val
+            elif val is not None:
+                LOGGER.warning("cleanup.rule.%s invalide: %r (ignoré)", key, val)
+        bytes_rate = rule_val.get("max_bytes_per_second")
+        if bytes_rate is not None:
+            rate = _parse_size(bytes_rate)
+            if rate:
+                rule["max_bytes_per_second"] = rate
+            else:
+                LOGGER.warning("cleanup.rule.max_bytes_per_second invalide: %r (ignoré)", bytes_rate)
+        compress_days = rule_val.get("compress_after_days")
+        if isinstance(compress_days, int) and not isinstance(compress_days, bool) and compress_days >= 0:
+            rule["compress_after_days"] = compress_days
+            fmt = str(rule_val.get("compress_format", "gzip")).strip().lower()
+            if fmt not in ("gzip", "zstd"):
+                LOGGER.warning("cleanup.rule.compress_format invalide: %r -> 'gzip'", fmt)
+                fmt = "gzip"
+            rule["compress_format"] = fmt
 
     cleanup: CleanupCfg = {}
     if paths:
         cleanup["paths"] = paths
     if rule:
         cleanup["rule"] = cast(Any, rule)  # champs validés ci-dessus
+    schedule_val = value.get("schedule")
+    if isinstance(schedule_val, dict):
+        cleanup["schedule"] = compile_schedule(
+            _normalize_hours(schedule_val.get("hours")),
+            _normalize_minutes(schedule_val.get("minutes")),
+            _normalize_days(schedule_val.get("days")),
+        )
+    elif schedule_val is not None:
+        LOGGER.warning("cleanup.schedule invalide: %r -> planification de la tâche", schedule_val)
     return cleanup or None
 
 
+def _normalize_limits(value: Any) -> LimitsCfg | None:
+    """
+    limits:
+      memory_mb: int (> 0)
+      cpu_seconds: int (> 0)
+      nofile: int (> 0)
+      nice: int (-20..19)
+      ionice_class: "realtime" | "best-effort" | "idle"
+    Valeurs invalides -> champs ignorés (avec warning).
+    """
+    if not isinstance(value, dict):
+        return None
+    limits: dict[str, Any] = {}
+    for key in ("memory_mb", "cpu_seconds", "nofile"):
+        raw = value.get(key)
+        if isinstance(raw, int) and not isinstance(raw, bool) and raw > 0:
+            limits[key] = raw
+        elif raw is not None:
+            LOGGER.warning("limits.%s invalide: %r (ignoré)", key, raw)
+    nice = value.get("nice")
+    if isinstance(nice, int) and not isinstance(nice, bool) and -20 <= nice <= 19:
+        limits["nice"] = nice
+    elif nice is not None:
+        LOGGER.warning("limits.nice invalide: %r (ignoré)", nice)
+    ionice = value.get("ionice_class")
+    if ionice in {"realtime", "best-effort", "idle"}:
+        limits["ionice_class"] = ionice
+    elif ionice is not None:
+        LOGGER.warning("limits.ionice_class invalide: %r (ignoré)", ionice)
+    return cast(LimitsCfg, limits) if limits else None  # champs validés ci-dessus
+
+
 def _normalize_notifications(value: Any) -> NotificationsCfg:
     """
     notifications:
-      notify_on: ["failure", "success", "success_with_warnings", "retry"]
+      notify_on: ["failure", "success", "success_with_warnings", "retry", "slow"]
       channels: [str]
     Valeurs invalides -> valeurs par défaut raisonnables.
     """
-    allowed = {"failure", "success", "success_with_warnings", "retry"}
+    allowed = {"failure", "success", "success_with_warnings", "retry", "slow"}
     out: NotificationsCfg = {}
     if isinstance(value, dict):
         raw_no = value.get("notify_on")
         if isinstance(raw_no, list):
             filtered = [v for v in raw_no if isinstance(v, str) and v in allowed]
-            out["notify_on"] = cast(list[Literal["failure", "success", "success_with_warnings", "retry"]], filtered)
+            out["notify_on"] = cast(list[NotifyOn], filtered)
         raw_ch = value.get("channels")
         if isinstance(raw_ch, list):
             out["channels"] = [v for v in raw_ch if isinstance(v, str) and v.strip()]
@@ -189,7 +344,8 @@ def normalize_task_dict(raw: dict[str, Any], source_file: str) -> TaskWithSource
     Valide et normalise un dict YAML en TaskWithSource typé.
 
     - Vérifie les champs obligatoires: type, script
-    - Normalise: hours, minutes, days, enabled, exclusive, cleanup, notifications
+    - Normalise: hours, minutes, days, enabled, exclusive, retries/backoff, cleanup, notifications, limits
+    - Compile la planification en masques de bits (schedule)
     - Injecte: source_file
     - Retourne None si la tâche est invalide (avec logs explicites)
 
@@ -226,20 +382,42 @@ def normalize_task_dict(raw: dict[str, Any], source_file: str) -> TaskWithSource
     if isinstance(raw.get("interpreter"), str) and raw["interpreter"].strip():
         task["interpreter"] = raw["interpreter"].strip()
 
+    if isinstance(raw.get("priority"), int):
+        task["priority"] = raw["priority"]
+
     # Retry/timeout
     if isinstance(raw.get("retries"), int):
         task["retries"] = raw["retries"]
     if isinstance(raw.get("retry_delay"), int):
         task["retry_delay"] = raw["retry_delay"]
+    if raw.get("retry_backoff") in {"fixed", "exponential"}:
+        task["retry_backoff"] = raw["retry_backoff"]
+    elif raw.get("retry_backoff") is not None:
+        LOGGER.warning("retry_backoff invalide %r -> 'fixed'", raw.get("retry_backoff"))
+    jitter = raw.get("retry_jitter")
+    if isinstance(jitter, int | float) and not isinstance(jitter, bool) and jitter >= 0:
+        task["retry_jitter"] = float(jitter)
+    if isinstance(raw.get("retry_max_delay"), int):
+        task["retry_max_delay"] = raw["retry_max_delay"]
+    codes = _coerce_int_list(raw.get("retry_on_exit_codes"))
+    if codes:
+        task["retry_on_exit_codes"] = codes
     if isinstance(raw.get("timeout"), int):
         task["timeout"] = raw["timeout"]
+    elif raw.get("timeout") == "auto":
+        task["timeout_auto"] = True
+    elif raw.get("timeout") is not None:
+        LOGGER.warning("timeout invalide %r -> pas de limite", raw.get("timeout"))
     if isinstance(raw.get("timeout_mode"), str) and raw["timeout_mode"] in {"strict", "soft"}:
         task["timeout_mode"] = raw["timeout_mode"]
+    if isinstance(raw.get("timeout_grace"), int) and raw["timeout_grace"] >= 0:
+        task["timeout_grace"] = raw["timeout_grace"]
 
     # Schedule
     task["hours"] = _normalize_hours(raw.get("hours"))
     task["minutes"] = _normalize_minutes(raw.get("minutes"))
     task["days"] = _normalize_days(raw.get("days"))
+    task["schedule"] = compile_schedule(task["hours"], task["minutes"], task["days"])
 
     # Cleanup / notifications
     cleanup = _normalize_cleanup(raw.get("cleanup"))
@@ -247,4 +425,8 @@ def normalize_task_dict(raw: dict[str, Any], source_file: str) -> TaskWithSource
         task["cleanup"] = cleanup
     task["notifications"] = _normalize_notifications(raw.get("notifications"))
 
+    limits = _normalize_limits(raw.get("limits"))
+    if limits is not None:
+        task["limits"] = limits
+
     return task
@@ -3,8 +3,10 @@ from __future__ import annotations
 
 from collections.abc import Mapping
 from pathlib import Path
-import subprocess
-from typing import Literal, Protocol, TypedDict
+from typing import IO, TYPE_CHECKING, Any, Literal, Protocol, TypedDict
+
+if TYPE_CHECKING:
+    from core.output import OutputCapture
 
 # ---------- Schedule ----------
 HoursField = Literal["any"] | list[int]
@@ -18,9 +20,23 @@ class WeekdaySpec(TypedDict):
 DaysField = Literal["any"] | list[int] | WeekdaySpec
 
 
+class ScheduleMasks(TypedDict):
+    """
+    Planification compilée en masques de bits (bit n = valeur n autorisée).
+    """
+
+    minutes: int  # 60 bits : minute 0..59
+    hours: int  # 24 bits : heure 0..23
+    days: int  # 31 bits : jour du mois 1..31 (bit 0 = jour 1)
+    weekdays: int  # 7 bits : 0=Mon .. 6=Sun
+
+
 # ---------- Notifications ----------
+NotifyOn = Literal["failure", "success", "success_with_warnings", "retry", "slow"]  # slow : régression de durée/CPU/RSS
+
+
 class NotificationsCfg(TypedDict, total=False):
-    notify_on: list[Literal["failure", "success", "success_with_warnings", "retry"]]
+    notify_on: list[NotifyOn]
     channels: list[str]
 
 
@@ -31,14 +47,29 @@ class CleanupRule(TypedDict, total=False):
     extensions: list[str] | Literal["all"]  # ["all"] ou liste d'extensions [".log", ".gz"]
     recursive: bool
     dry_run: bool
+    max_total_size: int  # quota en octets (YAML : 500M, 10G...) : supprime les plus anciens au-delà
+    compress_after_days: int  # compresse (au lieu de supprimer) les fichiers plus vieux que N jours
+    compress_format: Literal["gzip", "zstd"]
+    max_files_per_second: int  # débit max de suppressions
+    max_bytes_per_second: int  # débit max de suppressions (octets ; YAML : 50M...)
+    time_budget_seconds: int  # durée max d'une passe : reprise au passage suivant (point de reprise persisté)
 
 
 class CleanupCfg(TypedDict, total=False):
     paths: list[str]  # chemins de dossiers
     rule: CleanupRule
+    schedule: ScheduleMasks  # planification propre du nettoyage (défaut : celle de la tâche)
 
 
 # ---------- Task ----------
+class LimitsCfg(TypedDict, total=False):
+    memory_mb: int  # RLIMIT_AS
+    cpu_seconds: int  # RLIMIT_CPU (SIGXCPU)
+    nofile: int  # RLIMIT_NOFILE
+    nice: int  # priorité CPU absolue (-20..19)
+    ionice_class: Literal["realtime", "best-effort", "idle"]
+
+
 class TaskConfig(TypedDict, total=False):
     type: Literal["python", "bash"]
     script: str
@@ -46,26 +77,103 @@ class TaskConfig(TypedDict, total=False):
     hours: HoursField
     minutes: MinutesField
     days: DaysField
+    schedule: ScheduleMasks
     interpreter: str
     enabled: bool
     exclusive: bool
     cleanup: CleanupCfg
     notifications: NotificationsCfg
+    priority: int
     retries: int
     retry_delay: int
+    retry_backoff: Literal["fixed", "exponential"]
+    retry_jitter: float
+    retry_max_delay: int
+    retry_on_exit_codes: list[int]
     timeout: int
+    timeout_auto: bool  # `timeout: auto` : dérivé de l'historique (core/durations.py)
     timeout_mode: Literal["strict", "soft"]
+    timeout_grace: int
+    limits: LimitsCfg
 
 
 # ---------- Runtime ----------
 InterpretersMap = Mapping[str, str]
 
 
+class Resolution(TypedDict):
+    """
+    Résolution d'un script (handlers.get_interpreter.Resolver), calculée une fois puis mise en cache.
+    """
+
+    interpreter: str | None  # None pour Bash
+    script: str  # chemin absolu résolu
+    cwd: str
+    error: str | None  # interpréteur introuvable / non exécutable
+    resolved_at: float
+
+
+class ProcessLike(Protocol):
+    """
+    Sous-ensemble de l'API subprocess.Popen utilisé par Task/Supervisor.
+
+    Implémenté par Popen[str] (moteur threads) et core.async_runner.AsyncProcess (moteur asyncio).
+    """
+
+    pid: int
+    returncode: int | Any
+    stdout: IO[str] | None
+    stderr: IO[str] | None
+
+    def poll(self) -> int | None: ...
+    def wait(self, timeout: float | None = None) -> int: ...
+    def communicate(self, input: Any = None, timeout: float | None = None) -> tuple[Any, Any]: ...
+    def send_signal(self, sig: int) -> None: ...
+    def kill(self) -> None: ...
+
+
+class StreamSource(Protocol):
+    """
+    Flux déjà lus par le moteur d'exécution (pas de threads lecteurs côté Task).
+    """
+
+    stdout_capture: OutputCapture
+    stderr_capture: OutputCapture
+
+
+class ResourceUsage(TypedDict):
+    cpu_user: float  # secondes
+    cpu_sys: float  # secondes
+    max_rss_kb: int  # RSS crête
+    io_read_bytes: int  # I/O bloc (disque)
+    io_write_bytes: int
+
+
+class StreamSpan(TypedDict):
+    offset: int  # position (octets) du flux compressé dans l'archive
+    length: int  # taille compressée (0 = aucune sortie)
+    lines: int
+    truncated: bool
+
+
+class OutputIndexEntry(TypedDict):
+    run_id: str
+    attempt: int
+    script: str
+    source_file: str
+    ts: float
+    returncode: int | None
+    file: str | None  # archive dans OUTPUT_DIR (None si aucune sortie)
+    codec: str
+    stdout: StreamSpan
+    stderr: StreamSpan
+
+
 class StartHandle(TypedDict):
-    proc: subprocess.Popen[str]
+    proc: ProcessLike
 
 
-Status = Literal["success", "failure", "retry", "success_with_warnings", "Non"]
+Status = Literal["success", "failure", "retry", "success_with_warnings", "slow", "Non"]
 
 
 class TaskWithSource(TaskConfig, total=False):
@@ -75,6 +183,7 @@ class TaskWithSource(TaskConfig, total=False):
 class RunHandle(StartHandle, total=False):
     cmd: list[str]
     script: str
+    streams: StreamSource
 
 
 class TaskLike(Protocol):
@@ -100,3 +209,4 @@ class SummaryPayload(TypedDict):
     success_with_warnings: int
     failure: int
     total_duration: float
+    trends: list[str]  # une ligne par tâche exécutée (voir task_trends)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Sequence
+import functools
+import os
+from pathlib import Path
+import pickle
+import sys
+from typing import Any, TypeVar
+import zlib
+
+from utils.config import TASKS_CACHE_DIR
+from utils.logger import get_logger
+
+logger = get_logger("CronBoss")
+
+T = TypeVar("T")
+
+CACHE_VERSION = 2  # à incrémenter si le format des entrées change sans toucher aux fonctions de compilation
+
+
+@functools.cache
+def _safe_loader() -> Any:
+    # yaml n'est importé qu'en cas de cache absent ou périmé ; parseur C (libyaml) si disponible
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _schema(compile_fn: Callable[..., Any], depends: Sequence[str]) -> tuple[Any, ...]:
+    # Un cache produit par une autre version de la fonction de compilation (ou d'un module dont elle dépend,
+    # ex. le normalizer) est invalide
+    modules = (compile_fn.__module__, *depends)
+    mtimes = tuple(os.stat(sys.modules[name].__file__ or "").st_mtime_ns for name in modules)
+    return (CACHE_VERSION, compile_fn.__qualname__, *mtimes)
+
+
+def _cache_path(file: Path) -> Path:
+    digest = zlib.crc32(str(file.resolve()).encode("utf-8"))
+    return Path(TASKS_CACHE_DIR) / f"{file.stem}.{digest:08x}.pickle"
+
+
+def _read_cache(path: Path, schema: tuple[Any, ...]) -> dict[str, Any] | None:
+    try:
+        with path.open("rb") as fh:
+            entry: dict[str, Any] = pickle.load(fh)
+    except FileNotFoundError:
+        return None
+    except Exception as exc:  # pylint: disable=broad-except
+        logger.debug("Cache YAML illisible (%s) : %s", path, exc)
+        return None
+    return entry if entry.get("schema") == schema else None
+
+
+def write_cache(path: Path, entry: dict[str, Any]) -> None:
+    """
+    Écrit un cache pickle de façon atomique : un autre process ne lit jamais un cache à moitié écrit.
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("wb") as fh:
+            pickle.dump(entry, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError as exc:
+        logger.warning("⚠️ Cache non écrit (%s) : %s", path, exc)
+        tmp.unlink(missing_ok=True)
+
+
+def load_compiled(file: Path, compile_fn: Callable[[Any, Path], T | None], depends: Sequence[str] = ()) -> T | None:
+    """
+    Charge un YAML et le compile via `compile_fn`, en réutilisant le cache compilé (TASKS_CACHE_DIR) s'il est à jour.
+
+    Le cache est valide si mtime et taille sont inchangés, ou à défaut si le contenu (sha256) est identique ;
+    il est invalidé si le module de `compile_fn` ou l'un des modules `depends` change. Les avertissements de
+    compilation ne sont donc émis qu'au parsing, pas à chaque lecture du cache.
+
+    :param file: Fichier YAML.
+    :param compile_fn: (contenu YAML, fichier) -> valeur compilée, ou None si le contenu est invalide.
+    :param depends: Modules (déjà importés) utilisés par `compile_fn`, ex. "utils.normalizer".
+    :return: Valeur compilée, ou None si le YAML est invalide (erreur loggée).
+    :raises OSError: Fichier absent ou illisible.
+    """
+    st = file.stat()
+    schema = _schema(compile_fn, depends)
+    cache = _cache_path(file) if TASKS_CACHE_DIR else None
+    entry = _read_cache(cache, schema) if cache is not None else None
+    if entry is not None and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+        value: T = entry["value"]
+        return value
+
+    import hashlib
+
+    data = file.read_bytes()
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    if entry is not None and entry["sha256"] == sha256:
+        value = entry["value"]  # fichier touché mais contenu identique
+    else:
+        import yaml
+
+        try:
+            loaded: Any = yaml.load(data, Loader=_safe_loader())
+        except yaml.YAMLError as exc:
+            logger.error("❌ Erreur YAML dans %s : %s", file.name, exc)
+            return None
+        compiled = compile_fn(loaded, file)
+        if compiled is None:
+            return None
+        value = compiled
+
+    if cache is not None:
+        write_cache(
+            cache,
+            {
+                "schema": schema,
+                "path": str(file),
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "sha256": sha256,
+                "value": value,
+            },
+        )
+    return value